@@ -0,0 +1,398 @@
+"""
+HTTP/JSON API over the school management services, using only the standard library.
+
+A ThreadingHTTPServer handles each connection on its own thread with HTTP/1.1
+keep-alive. Requests lock only the services they touch, so a library query
+never waits behind an enrollment; writes also run as transactions, which
+take the container's write_lock only while they apply and commit. Every response carries an X-Response-Time
+header and is recorded in the metrics registry under api.<route>. Read-heavy
+queries are served from a QueryCache invalidated by the services' change
+events (--cache-ttl 0 turns it off). Usage:
+
+    python -m api.server --port 8000 --data-dir data
+    curl localhost:8000/students/S001
+    curl -X POST localhost:8000/payments -d '{"student_id": "S001", "amount": 45000}'
+
+With --campuses ROOT one server hosts every campus under ROOT (see
+services.tenancy), e.g. curl localhost:8000/campuses/main/students/S001
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from services.container import ServiceContainer, SERVICE_FACTORIES
+from services.commands import run_command
+from services.cascades import cascade_services
+from services.query_cache import QueryCache
+from services.tenancy import TenantManager
+from services.snapshots import SnapshotManager
+from utils.metrics import metrics
+
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class APIError(Exception):
+    """An error with an HTTP status, returned to the client as JSON"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _found(value, what):
+    """Return value, or raise a 404 naming what was missing (internal function)"""
+    if value is None:
+        raise APIError(404, f"{what} not found")
+    return value
+
+
+def _int(query, name, default):
+    """Read an integer query parameter (internal function)"""
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        raise APIError(400, f"'{name}' must be an integer")
+
+
+def _float(query, name, default):
+    """Read a number query parameter (internal function)"""
+    try:
+        return float(query.get(name, default))
+    except ValueError:
+        raise APIError(400, f"'{name}' must be a number")
+
+
+# Handlers take (container, path parameters, query dict, JSON body) and return (status, payload)
+
+def list_students(c, params, query, body):
+    return 200, [s.to_dict() for s in c.student_registry.search_students(query.get("name", ""))]
+
+def get_student(c, params, query, body):
+    return 200, _found(c.student_registry.get_student(params["student_id"]), "Student").to_dict()
+
+def add_student(c, params, query, body):
+    return 201, run_command(c, "add-student", **body)
+
+def remove_student(c, params, query, body):
+    return 200, run_command(c, "remove-student", student_id=params["student_id"])
+
+def list_courses(c, params, query, body):
+    return 200, [course.to_dict() for course in c.course_scheduler.get_all_courses()]
+
+def get_course(c, params, query, body):
+    return 200, _found(c.course_scheduler.get_course_status(params["course_id"]), "Course")
+
+def create_course(c, params, query, body):
+    return 201, run_command(c, "create-course", **body)
+
+def enroll(c, params, query, body):
+    return 200, run_command(c, "enroll", course_id=params["course_id"], **body)
+
+def drop(c, params, query, body):
+    return 200, run_command(c, "drop", **params)
+
+def get_payment(c, params, query, body):
+    return 200, _found(c.fee_tracker.get_transaction(params["transaction_id"]), "Transaction").to_dict()
+
+def student_payments(c, params, query, body):
+    return 200, [tx.to_dict() for tx in c.fee_tracker.get_student_transactions(params["student_id"])]
+
+def add_payment(c, params, query, body):
+    return 201, run_command(c, "pay", **body)
+
+def clearance_report(c, params, query, body):
+    return 200, c.fee_tracker.generate_clearance_report(_float(query, "required_amount", 40000))
+
+def search_books(c, params, query, body):
+    books = c.library_system.search_books(query.get("title", ""), query.get("author", ""))
+    return 200, [book.to_dict() for book in books]
+
+def get_book(c, params, query, body):
+    return 200, _found(c.library_system.get_book_status(params["isbn"]), "Book")
+
+def add_book(c, params, query, body):
+    return 201, run_command(c, "add-book", **body)
+
+def borrow(c, params, query, body):
+    return 200, run_command(c, "borrow", isbn=params["isbn"], **body)
+
+def give_back(c, params, query, body):
+    return 200, run_command(c, "return", **params)
+
+def add_grade(c, params, query, body):
+    return 201, run_command(c, "grade", **body)
+
+def student_ranking(c, params, query, body):
+    return 200, _found(c.analytics_engine.get_student_ranking(params["student_id"]), "Ranking")
+
+def top_performers(c, params, query, body):
+    return 200, c.analytics_engine.get_top_performers(_int(query, "n", 5))
+
+def performance_report(c, params, query, body):
+    return 200, c.analytics_engine.generate_performance_report()
+
+def health(c, params, query, body):
+    status = {"status": "ok", "loaded_services": c.loaded_services()}
+    if c.query_cache:
+        status["query_cache"] = c.query_cache.stats()
+    return 200, status
+
+def metrics_snapshot(c, params, query, body):
+    return 200, metrics.snapshot()
+
+
+# (method, path template, handler, services locked while handling)
+ROUTES = [
+    ("GET", "/health", health, []),
+    ("GET", "/metrics", metrics_snapshot, []),
+    ("GET", "/students", list_students, ["student_registry"]),
+    ("POST", "/students", add_student, ["student_registry"]),
+    ("GET", "/students/{student_id}", get_student, ["student_registry"]),
+    ("DELETE", "/students/{student_id}", remove_student, ["student_registry"]),
+    ("GET", "/students/{student_id}/payments", student_payments, ["fee_tracker"]),
+    ("GET", "/students/{student_id}/ranking", student_ranking, ["analytics_engine"]),
+    ("GET", "/courses", list_courses, ["course_scheduler"]),
+    ("POST", "/courses", create_course, ["course_scheduler"]),
+    ("GET", "/courses/{course_id}", get_course, ["course_scheduler"]),
+    ("POST", "/courses/{course_id}/enrollments", enroll, ["course_scheduler"]),
+    ("DELETE", "/courses/{course_id}/enrollments/{student_id}", drop, ["course_scheduler"]),
+    ("POST", "/payments", add_payment, ["fee_tracker", "student_registry"]),
+    ("GET", "/payments/{transaction_id}", get_payment, ["fee_tracker"]),
+    ("GET", "/reports/clearance", clearance_report, ["fee_tracker"]),
+    ("GET", "/books", search_books, ["library_system"]),
+    ("POST", "/books", add_book, ["library_system"]),
+    ("GET", "/books/{isbn}", get_book, ["library_system"]),
+    ("POST", "/books/{isbn}/loans", borrow, ["library_system"]),
+    ("DELETE", "/books/{isbn}/loans/{student_id}", give_back, ["library_system"]),
+    ("POST", "/grades", add_grade, ["analytics_engine"]),
+    ("GET", "/analytics/top-performers", top_performers, ["analytics_engine"]),
+    ("GET", "/analytics/report", performance_report, ["analytics_engine"]),
+]
+CAMPUS_PATH = re.compile(r"^/campuses/(?P<campus>[^/]+)(?P<path>/.*)?$")
+
+COMPILED_ROUTES = [
+    (method, template, re.compile(re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", template) + "/?$"),
+     # Writes also lock the services their change events cascade into
+     handler, sorted(locks if method == "GET" else cascade_services(locks)))
+    for method, template, handler, locks in ROUTES
+]
+
+
+class SchoolAPIServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the service container and one lock per service"""
+
+    daemon_threads = True
+
+    def __init__(self, address, container, verbose=False, tenants=None):
+        super().__init__(address, APIRequestHandler)
+        self.container = container
+        self.verbose = verbose
+        # Services aren't thread-safe; each request holds the locks of the services it uses
+        self.service_locks = {name: threading.RLock() for name in SERVICE_FACTORIES}
+        # Multi-campus mode: a TenantManager, with requests under /campuses/<campus>/...
+        self.tenants = tenants
+        self.campus_locks = {}  # campus -> {service name: lock}
+        self._campus_locks_lock = threading.Lock()
+
+    @contextmanager
+    def quiesce(self):
+        """Hold every service lock, pausing requests (e.g. while a snapshot is taken)"""
+        for name in sorted(self.service_locks):
+            self.service_locks[name].acquire()
+        try:
+            yield
+        finally:
+            for name in sorted(self.service_locks, reverse=True):
+                self.service_locks[name].release()
+
+    @contextmanager
+    def open_campus(self, campus):
+        """Get the container and service locks for a request's campus (None outside multi-campus mode)"""
+        if campus is None:
+            yield self.container, self.service_locks
+            return
+        try:
+            if not self.tenants.exists(campus):
+                raise APIError(404, f"Campus {campus} not found")
+        except ValueError as e:
+            raise APIError(404, str(e))
+        with self._campus_locks_lock:
+            locks = self.campus_locks.setdefault(
+                campus, {name: threading.RLock() for name in SERVICE_FACTORIES})
+        with self.tenants.use(campus) as container:
+            yield container, locks
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    """Routes JSON requests to the services"""
+
+    protocol_version = "HTTP/1.1"  # keep connections alive between requests
+    # Headers and body go out as separate writes; without this, Nagle's algorithm and
+    # delayed ACKs add ~40ms to every keep-alive response
+    disable_nagle_algorithm = True
+    server_version = "MeruSMS/1.0"
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _route(self, method, path):
+        """Find the handler for a request (internal method)"""
+        allowed = False
+        for route_method, template, pattern, handler, locks in COMPILED_ROUTES:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return template, handler, locks, match.groupdict()
+                allowed = True
+        raise APIError(405 if allowed else 404, "Method not allowed" if allowed else "Not found")
+
+    def _split_campus(self, path):
+        """Split /campuses/<campus>/<route> in multi-campus mode (internal method)"""
+        if self.server.tenants is None:
+            return None, path
+        match = CAMPUS_PATH.match(path)
+        if not match:
+            raise APIError(404, "Not found: requests go to /campuses/<campus>/...")
+        return match.group("campus"), match.group("path") or "/"
+
+    def _read_body(self):
+        """Parse the JSON request body, if any (internal method)"""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            # The unread body would corrupt the next request on this connection
+            self.close_connection = True
+            raise APIError(413, "Request body too large")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise APIError(400, f"Malformed JSON: {e}")
+        if not isinstance(body, dict):
+            raise APIError(400, "Request body must be a JSON object")
+        return body
+
+    def _handle(self, method):
+        """Dispatch one request and send a JSON response (internal method)"""
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        route = "unmatched"
+        try:
+            # Read the body first so the connection stays usable whatever the outcome
+            body = self._read_body()
+            campus, path = self._split_campus(url.path)
+            route, handler, locks, params = self._route(method, path)
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            with self.server.open_campus(campus) as (container, service_locks):
+                acquired = []
+                try:
+                    # Sorted lock order: requests spanning services can't deadlock
+                    for name in locks:
+                        service_locks[name].acquire()
+                        acquired.append(name)
+                    status, payload = handler(container, params, query, body)
+                finally:
+                    for name in reversed(acquired):
+                        service_locks[name].release()
+        except APIError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            # Service operations report failures (bad IDs, full saves, ...) as plain Exceptions
+            status, payload = 400, {"error": str(e)}
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if metrics.enabled:
+            metrics.timer(f"api.{method} {route}").observe(elapsed_ms)
+            metrics.counter(f"api.status.{status}").inc()
+        self._send(status, payload, elapsed_ms)
+
+    def _send(self, status, payload, elapsed_ms):
+        """Write a JSON response (internal method)"""
+        data = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Response-Time", f"{elapsed_ms:.3f}ms")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def create_server(container=None, host="127.0.0.1", port=8000, verbose=False, tenants=None):
+    """Create (but don't start) an API server; port 0 picks a free port
+
+    Pass tenants (a TenantManager) instead of a container to serve every
+    campus under /campuses/<campus>/...
+    """
+    if tenants is not None:
+        return SchoolAPIServer((host, port), None, verbose, tenants)
+    return SchoolAPIServer((host, port), container or ServiceContainer(), verbose)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Serve the school management services over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--campuses", metavar="ROOT",
+                        help="serve every campus under ROOT at /campuses/<campus>/... instead of --data-dir")
+    parser.add_argument("--max-open-campuses", type=int, default=8,
+                        help="campuses kept loaded before idle ones are unloaded")
+    parser.add_argument("--storage-format", choices=["json", "binary"], default="json")
+    parser.add_argument("--preload", action="store_true", help="load every service before serving")
+    parser.add_argument("--cache-ttl", type=float, default=30.0,
+                        help="seconds a cached query result stays valid; 0 disables the cache")
+    parser.add_argument("--cache-size", type=int, default=4096, help="maximum cached query results")
+    parser.add_argument("--snapshot-interval", type=float, metavar="SECONDS",
+                        help="journal changes and snapshot the data every SECONDS (see services.snapshots)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+    if args.snapshot_interval and args.campuses:
+        parser.error("--snapshot-interval works with --data-dir, not --campuses")
+
+    def make_cache():
+        return QueryCache(args.cache_size, args.cache_ttl) if args.cache_ttl > 0 else None
+
+    if args.campuses:
+        tenants = TenantManager(args.campuses, args.max_open_campuses, container_factory=lambda data_dir:
+                                ServiceContainer(data_dir, args.storage_format, make_cache()))
+        server = create_server(host=args.host, port=args.port, verbose=args.verbose, tenants=tenants)
+    else:
+        container = ServiceContainer(args.data_dir, args.storage_format, make_cache())
+        if args.preload:
+            container.preload(background=False)
+        server = create_server(container, args.host, args.port, args.verbose)
+    history = None
+    if args.snapshot_interval:
+        history = SnapshotManager(container)
+        history.start(args.snapshot_interval, quiesce=server.quiesce)
+    print(f"✓ Serving on http://{args.host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+        if history:
+            history.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
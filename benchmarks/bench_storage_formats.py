@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Compare the JSON and binary snapshot formats on a generated dataset.
+
+Reports file size plus save and load time for every data file in both
+formats, and writes the numbers as JSON. Usage:
+
+    python -m benchmarks.bench_storage_formats --students 10000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.generator import generate_dataset, data_files
+from utils.helpers import load_data, save_data
+from benchmarks.harness import summarize, time_calls, environment, save_results
+
+FORMATS = {"json": ".json", "binary": ".bin"}
+
+
+def run(students, repeats, seed):
+    """Measure size and save/load latency per data file and format"""
+    results = {"environment": environment(), "students": students, "files": {}}
+    root = tempfile.mkdtemp(prefix="sms-formats-")
+    try:
+        generate_dataset(root, "small", seed, students=students,
+                         courses=max(10, students // 50), books=max(10, students // 5))
+        for name, path in data_files(root).items():
+            data = load_data(path) or {}
+            entry = {"records": len(data)}
+            for format_name, extension in FORMATS.items():
+                target = os.path.join(root, f"{name}-bench{extension}")
+                save = summarize(time_calls(save_data, [(data, target)] * repeats))
+                load = summarize(time_calls(load_data, [(target,)] * repeats))
+                entry[format_name] = {
+                    "bytes": os.path.getsize(target),
+                    "save_p50_ms": save["p50_ms"],
+                    "load_p50_ms": load["p50_ms"]
+                }
+            results["files"][name] = entry
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Compare JSON and binary snapshot formats")
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmarks/results/storage_formats.json")
+    args = parser.parse_args(argv)
+
+    results = run(args.students, args.repeats, args.seed)
+    print(f"{'File':<12} {'Records':>9} {'Format':>7} {'Size KiB':>10} {'Save p50':>11} {'Load p50':>11}")
+    for name, entry in results["files"].items():
+        for format_name in FORMATS:
+            stats = entry[format_name]
+            print(f"{name:<12} {entry['records']:>9,} {format_name:>7} {stats['bytes'] / 1024:>10,.1f} "
+                  f"{stats['save_p50_ms']:>9.2f}ms {stats['load_p50_ms']:>9.2f}ms")
+    save_results(results, args.output)
+    print(f"\n✓ Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
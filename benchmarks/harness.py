@@ -0,0 +1,104 @@
+"""
+Timing helpers shared by the benchmark scripts.
+"""
+
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+
+def percentile(sorted_samples, percent):
+    """Get a percentile from pre-sorted samples (nearest-rank)"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples):
+    """Summarize per-operation latencies (seconds) into a result dict"""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "iterations": len(ordered),
+        "ops_per_sec": len(ordered) / total if total > 0 else 0.0,
+        "mean_ms": total / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p90_ms": percentile(ordered, 90) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0
+    }
+
+
+def time_calls(func, args_list):
+    """Call func once per args tuple, returning each call's latency in seconds"""
+    samples = []
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the services' load/progress printing"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def environment():
+    """Describe the machine the results were taken on"""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now().isoformat(timespec="seconds")
+    }
+
+
+def save_results(results, filename):
+    """Write benchmark results as JSON"""
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(filename):
+    """Load benchmark results, or None if the file doesn't exist"""
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=0.25, min_delta_ms=0.05):
+    """Compare p50 latencies against a baseline
+
+    Returns a list of regression dicts for every benchmark whose p50 grew by
+    more than the tolerance fraction and by at least min_delta_ms, so timer
+    noise on microsecond-scale operations isn't reported.
+    """
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or previous["p50_ms"] <= 0:
+            continue
+        change = current["p50_ms"] / previous["p50_ms"] - 1
+        if change > tolerance and current["p50_ms"] - previous["p50_ms"] >= min_delta_ms:
+            regressions.append({
+                "benchmark": name,
+                "baseline_p50_ms": previous["p50_ms"],
+                "current_p50_ms": current["p50_ms"],
+                "change": change
+            })
+    return regressions
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Load generator for the HTTP/JSON API.
+
+Each worker thread keeps one keep-alive connection open and sends a mix of
+portal reads and clerk writes, then the run reports requests/second and
+latency percentiles. Without --url an in-process server is started on a
+freshly generated dataset. Usage:
+
+    python -m benchmarks.load_generator --concurrency 8 --duration 10
+    python -m benchmarks.load_generator --url http://127.0.0.1:8000 --write-ratio 0.2
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.server import create_server
+from services.container import ServiceContainer
+from data.generator import generate_dataset
+from benchmarks.harness import summarize, quiet
+
+
+class Worker(threading.Thread):
+    """Sends requests over one persistent connection until the deadline"""
+
+    def __init__(self, host, port, deadline, write_ratio, student_ids, course_ids, isbns, seed):
+        super().__init__(daemon=True)
+        self.connection = http.client.HTTPConnection(host, port, timeout=30)
+        self.deadline = deadline
+        self.write_ratio = write_ratio
+        self.student_ids = student_ids
+        self.course_ids = course_ids
+        self.isbns = isbns
+        self.rng = random.Random(seed)
+        self.samples = []
+        self.statuses = {}
+
+    def _next_request(self):
+        """Pick a request: mostly portal reads, write_ratio clerk writes"""
+        student_id = self.rng.choice(self.student_ids)
+        if self.rng.random() < self.write_ratio:
+            return self.rng.choice([
+                ("POST", "/payments", {"student_id": student_id, "amount": self.rng.randint(1000, 50000)}),
+                ("POST", f"/courses/{self.rng.choice(self.course_ids)}/enrollments", {"student_id": student_id}),
+                ("POST", f"/books/{self.rng.choice(self.isbns)}/loans", {"student_id": student_id}),
+            ])
+        return self.rng.choice([
+            ("GET", f"/students/{student_id}", None),
+            ("GET", f"/students/{student_id}/payments", None),
+            ("GET", f"/students/{student_id}/ranking", None),
+            ("GET", f"/courses/{self.rng.choice(self.course_ids)}", None),
+            ("GET", f"/books/{self.rng.choice(self.isbns)}", None),
+            ("GET", "/analytics/top-performers?n=10", None),
+        ])
+
+    def run(self):
+        while time.perf_counter() < self.deadline:
+            method, path, body = self._next_request()
+            data = json.dumps(body).encode("utf-8") if body is not None else None
+            headers = {"Content-Type": "application/json"} if data else {}
+            started = time.perf_counter()
+            self.connection.request(method, path, body=data, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+            self.samples.append(time.perf_counter() - started)
+            self.statuses[response.status] = self.statuses.get(response.status, 0) + 1
+        self.connection.close()
+
+
+def _sample_ids(container):
+    """Get IDs to request from a local container (internal function)"""
+    with quiet():
+        return (list(container.student_registry.students) or ["S0001"],
+                list(container.course_scheduler.courses) or ["CS101"],
+                list(container.library_system.books) or ["9780000000000"])
+
+
+def run_load(host, port, concurrency, duration, write_ratio, ids, seed=42):
+    """Drive the API with concurrent workers and summarize the results"""
+    student_ids, course_ids, isbns = ids
+    deadline = time.perf_counter() + duration
+    workers = [Worker(host, port, deadline, write_ratio, student_ids, course_ids, isbns, seed + i)
+               for i in range(concurrency)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for worker in workers for sample in worker.samples]
+    statuses = {}
+    for worker in workers:
+        for status, count in worker.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    result = summarize(samples)
+    result["requests_per_sec"] = len(samples) / elapsed if elapsed else 0.0
+    result["statuses"] = statuses
+    return result
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Measure API requests/second")
+    parser.add_argument("--url", help="running server to target (default: start one in-process)")
+    parser.add_argument("--data-dir", help="data directory for the ID sample / in-process server")
+    parser.add_argument("--students", type=int, default=1000,
+                        help="students in the generated dataset when no --data-dir is given")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to run")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    temp_dir = None
+    server = None
+    data_dir = args.data_dir
+    if not data_dir:
+        temp_dir = tempfile.mkdtemp(prefix="sms-load-")
+        data_dir = temp_dir
+        generate_dataset(data_dir, "small", args.seed, students=args.students,
+                         courses=max(10, args.students // 50), books=max(10, args.students // 5))
+
+    try:
+        container = ServiceContainer(data_dir)
+        ids = _sample_ids(container)
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            with quiet():
+                container.preload(background=False)
+            server = create_server(container, port=0)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            host, port = server.server_address[:2]
+
+        print(f"Driving http://{host}:{port} with {args.concurrency} connections for {args.duration:.0f}s "
+              f"({args.write_ratio:.0%} writes)...")
+        result = run_load(host, port, args.concurrency, args.duration, args.write_ratio, ids, args.seed)
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print(f"  {result['iterations']:,} requests | {result['requests_per_sec']:,.1f} req/s | "
+          f"p50 {result['p50_ms']:.2f}ms | p90 {result['p90_ms']:.2f}ms | p99 {result['p99_ms']:.2f}ms")
+    print(f"  statuses: {', '.join(f'{status}: {count:,}' for status, count in sorted(result['statuses'].items()))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
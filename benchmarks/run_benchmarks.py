@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the service hot paths.
+
+Generates a synthetic dataset per size, runs every benchmark against a fresh
+copy of the data files, writes JSON results and flags p50 regressions
+against a stored baseline. Usage:
+
+    python -m benchmarks.run_benchmarks --sizes 1000,10000
+    python -m benchmarks.run_benchmarks --save-baseline
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.student_registry import StudentRegistry
+from services.course_scheduler import CourseScheduler
+from services.fee_tracker import FeeTracker
+from services.library_system import LibrarySystem
+from services.analytics_engine import AnalyticsEngine
+from services.container import ServiceContainer
+from services.payment_importer import import_payments
+from data.generator import generate_dataset, data_files, format_student_id
+from benchmarks.harness import (
+    summarize, time_calls, quiet, environment, save_results, load_results, compare
+)
+
+DEFAULT_RESULTS = "benchmarks/results/latest.json"
+DEFAULT_BASELINE = "benchmarks/results/baseline.json"
+
+
+class BenchmarkContext:
+    """A generated dataset plus helpers to open services on fresh copies of it"""
+
+    def __init__(self, source_dir, work_dir, size, seed):
+        self.source = data_files(source_dir)
+        self.work_dir = work_dir
+        self.size = size
+        self.rng = random.Random(seed)
+
+    def fresh_copy(self, name):
+        """Copy one data file into the work directory and return its path"""
+        target = os.path.join(self.work_dir, os.path.basename(self.source[name]))
+        shutil.copyfile(self.source[name], target)
+        return target
+
+    def open(self, service_class, name):
+        """Construct a service on a fresh copy of its data file"""
+        with quiet():
+            return service_class(self.fresh_copy(name))
+
+
+def bench_add_student(ctx, iterations):
+    registry = ctx.open(StudentRegistry, "students")
+    args = [(f"S8{i:08d}", "Bench Student", f"bench{i}@meru.edu", 1) for i in range(iterations)]
+    return {"add_student": time_calls(registry.add_student, args)}
+
+
+def bench_search_students(ctx, iterations):
+    registry = ctx.open(StudentRegistry, "students")
+    names = [ctx.rng.choice(["Alice", "Mwangi", "Joy", "Korir", "xyz"]) for _ in range(iterations)]
+    return {"search_students": time_calls(registry.search_students, [(n,) for n in names])}
+
+
+def bench_enroll_drop(ctx, iterations):
+    scheduler = ctx.open(CourseScheduler, "courses")
+    course_ids = list(scheduler.courses)
+    pairs = [(ctx.rng.choice(course_ids), f"S8{i:08d}") for i in range(iterations)]
+    return {
+        "enroll_student": time_calls(scheduler.enroll_student, pairs),
+        "drop_student": time_calls(scheduler.drop_student, pairs)
+    }
+
+
+def bench_add_payment(ctx, iterations):
+    tracker = ctx.open(FeeTracker, "transactions")
+    args = [(format_student_id(ctx.rng.randint(1, ctx.size), ctx.size), ctx.rng.randint(1000, 50000), "Bench Fee")
+            for _ in range(iterations)]
+    return {"add_payment": time_calls(tracker.add_payment, args)}
+
+
+def bench_import_payments(ctx, iterations):
+    tracker = ctx.open(FeeTracker, "transactions")
+    path = os.path.join(ctx.work_dir, "statement.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("student_id,amount,description,date,reference\n")
+        for i in range(iterations * 100):
+            f.write(f"{format_student_id(ctx.rng.randint(1, ctx.size), ctx.size)},{ctx.rng.randint(1000, 50000)},"
+                    f"Bench Fee,2024-01-15,BENCH{i:08d}\n")
+    started = time.perf_counter()
+    with quiet():
+        summary = import_payments(path, tracker, reject_file=path + ".rejects")
+    per_row = (time.perf_counter() - started) / max(1, summary["imported"])
+    return {"import_payments_per_row": [per_row]}
+
+
+def bench_clearance_report(ctx, iterations):
+    tracker = ctx.open(FeeTracker, "transactions")
+    return {"generate_clearance_report": time_calls(
+        tracker.generate_clearance_report, [(40000,)] * iterations)}
+
+
+def bench_borrow_return(ctx, iterations):
+    library = ctx.open(LibrarySystem, "books")
+    available = [isbn for isbn, book in library.books.items() if book.available_copies > 0]
+    pairs = [(ctx.rng.choice(available), f"S8{i:08d}") for i in range(iterations)]
+    borrow = []
+    give_back = []
+    for isbn, student_id in pairs:
+        started = time.perf_counter()
+        library.borrow_book(isbn, student_id)
+        borrow.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        library.return_book(isbn, student_id)
+        give_back.append(time.perf_counter() - started)
+    return {"borrow_book": borrow, "return_book": give_back}
+
+
+def bench_search_books(ctx, iterations):
+    library = ctx.open(LibrarySystem, "books")
+    queries = [(ctx.rng.choice(["Physics", "Volume 1", "Biology", ""]), ctx.rng.choice(["", "Korir"]))
+               for _ in range(iterations)]
+    return {"search_books": time_calls(library.search_books, queries)}
+
+
+def bench_analytics(ctx, iterations):
+    engine = ctx.open(AnalyticsEngine, "grades")
+    student_ids = list(engine.grades) or ["S0001"]
+    return {
+        "get_top_performers": time_calls(engine.get_top_performers, [(5,)] * iterations),
+        "get_student_ranking": time_calls(
+            engine.get_student_ranking, [(ctx.rng.choice(student_ids),) for _ in range(iterations)])
+    }
+
+
+def bench_cold_startup(ctx, iterations):
+    def start_all():
+        with quiet():
+            StudentRegistry(ctx.source["students"])
+            CourseScheduler(ctx.source["courses"])
+            FeeTracker(ctx.source["transactions"])
+            LibrarySystem(ctx.source["books"])
+            AnalyticsEngine(ctx.source["grades"])
+
+    def start_parallel():
+        with quiet():
+            ServiceContainer(os.path.dirname(ctx.source["students"])).load_parallel()
+
+    runs = [()] * max(1, iterations // 10)
+    return {
+        "cold_startup": time_calls(start_all, runs),
+        "cold_startup_parallel": time_calls(start_parallel, runs)
+    }
+
+
+BENCHMARKS = {
+    "add_student": bench_add_student,
+    "search_students": bench_search_students,
+    "enroll_drop": bench_enroll_drop,
+    "add_payment": bench_add_payment,
+    "import_payments": bench_import_payments,
+    "clearance_report": bench_clearance_report,
+    "borrow_return": bench_borrow_return,
+    "search_books": bench_search_books,
+    "analytics": bench_analytics,
+    "cold_startup": bench_cold_startup,
+}
+
+
+def run(sizes, iterations, seed, selected=None):
+    """Run the selected benchmarks at every size and return the results dict"""
+    results = {"environment": environment(), "seed": seed, "benchmarks": {}}
+    root = tempfile.mkdtemp(prefix="sms-bench-")
+    try:
+        for size in sizes:
+            source_dir = os.path.join(root, f"source-{size}")
+            work_dir = os.path.join(root, f"work-{size}")
+            os.makedirs(work_dir)
+            generate_dataset(source_dir, "small", seed, students=size,
+                             courses=max(10, size // 50), books=max(10, size // 5))
+
+            for group, bench in BENCHMARKS.items():
+                if selected and group not in selected:
+                    continue
+                ctx = BenchmarkContext(source_dir, work_dir, size, seed)
+                for name, samples in bench(ctx, iterations).items():
+                    key = f"{name}@{size}"
+                    results["benchmarks"][key] = summarize(samples)
+                    stats = results["benchmarks"][key]
+                    print(f"  {key:<36} {stats['ops_per_sec']:>12,.1f} ops/s  "
+                          f"p50 {stats['p50_ms']:>9.3f}ms  p99 {stats['p99_ms']:>9.3f}ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark service hot paths")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="comma-separated student counts (default: 1000,10000)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--output", default=DEFAULT_RESULTS)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p50 slowdown before flagging (default: 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    selected = set(args.only.split(",")) if args.only else None
+    results = run(sizes, args.iterations, args.seed, selected)
+    save_results(results, args.output)
+    print(f"\n✓ Results written to {args.output}")
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"✓ Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print("ℹ No baseline found; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if not regressions:
+        print("✓ No regressions against baseline")
+        return 0
+
+    print(f"\n✗ {len(regressions)} regression(s) against baseline:")
+    for r in regressions:
+        print(f"  {r['benchmark']}: p50 {r['baseline_p50_ms']:.3f}ms -> "
+              f"{r['current_p50_ms']:.3f}ms (+{r['change']:.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Scalable synthetic data generator for load testing and benchmarking.
+
+Produces deterministic (seeded) populations of students, courses with
+waitlist pressure, fee payments, library loans and grades, and streams them
+straight into the JSON snapshot files the services load from. Usage:
+
+    python -m data.generator --scale large --seed 42 --output data/benchmark
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+SCALES = {
+    "demo": {"students": 100, "courses": 12, "books": 50,
+             "payments_per_student": 3, "loans_per_student": 2},
+    "small": {"students": 1_000, "courses": 60, "books": 500,
+              "payments_per_student": 5, "loans_per_student": 3},
+    "medium": {"students": 10_000, "courses": 400, "books": 4_000,
+               "payments_per_student": 10, "loans_per_student": 5},
+    "large": {"students": 100_000, "courses": 2_000, "books": 20_000,
+              "payments_per_student": 20, "loans_per_student": 10},
+}
+
+FIRST_NAMES = [
+    "Alice", "Brian", "Carol", "David", "Eva", "Frank", "Grace", "Henry",
+    "Irene", "James", "Joy", "Kevin", "Lydia", "Moses", "Njeri", "Otieno",
+    "Purity", "Kamau", "Rose", "Samuel", "Tabitha", "Victor", "Wanjiku", "Zawadi"
+]
+LAST_NAMES = [
+    "Mwangi", "Kimani", "Wanjiru", "Ochieng", "Akinyi", "Otieno", "Wambui",
+    "Mutua", "Korir", "Kibe", "Bwari", "Njoroge", "Kiprop", "Achieng",
+    "Mwende", "Chebet", "Omondi", "Nyambura", "Kariuki", "Wekesa"
+]
+SUBJECTS = [
+    ("CS", "Computer Science"), ("MATH", "Mathematics"), ("PHY", "Physics"),
+    ("CHEM", "Chemistry"), ("BIO", "Biology"), ("ENG", "English"),
+    ("ECON", "Economics"), ("STAT", "Statistics"), ("AGR", "Agriculture"),
+    ("NUR", "Nursing")
+]
+PAYMENT_TYPES = [
+    ("Tuition Fee", 20000, 60000), ("Library Fee", 1000, 5000),
+    ("Exam Fee", 1500, 6000), ("Hostel Fee", 8000, 25000),
+    ("Activity Fee", 500, 3000)
+]
+TERM_START = date(2025, 1, 6)
+TERM_DAYS = 300
+
+
+class _JsonObjectWriter:
+    """Stream a top-level JSON object to disk one key at a time"""
+
+    def __init__(self, filename):
+        self.file = open(filename, 'w', encoding='utf-8')
+        self.file.write("{")
+        self.first = True
+
+    def write(self, key, value):
+        """Write one key/value pair"""
+        self.file.write("\n  " if self.first else ",\n  ")
+        self.file.write(json.dumps(key))
+        self.file.write(": ")
+        self.file.write(json.dumps(value, ensure_ascii=False))
+        self.first = False
+
+    def close(self):
+        """Finish the object and close the file"""
+        self.file.write("\n}" if not self.first else "}")
+        self.file.close()
+
+
+def _weighted_picker(rng, weights):
+    """Build a fast weighted sampler over indexes"""
+    cumulative = []
+    total = 0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+
+    def pick(k):
+        return rng.choices(range(len(weights)), cum_weights=cumulative, k=k)
+
+    return pick
+
+
+def format_student_id(number, students):
+    """Format the ID of the number-th (from 1) of a dataset's students, e.g. S0042
+
+    IDs are zero-padded to the width of the largest one, at least 4 digits.
+    """
+    return f"S{number:0{max(4, len(str(students)))}d}"
+
+
+def format_course_id(index):
+    """Format the ID of the index-th (from 0) generated course, e.g. CS101
+
+    Courses cycle through the subjects and four levels, then move to the
+    next section; from the 100th section on a -N suffix keeps IDs unique.
+    """
+    prefix = SUBJECTS[index % len(SUBJECTS)][0]
+    level = 100 * (1 + (index // len(SUBJECTS)) % 4)
+    section = index // (len(SUBJECTS) * 4)
+    suffix = f"-{section // 100}" if section >= 100 else ""
+    return f"{prefix}{level + section % 100}{suffix}"
+
+
+def resolve_scale(scale="small", **overrides):
+    """Get generator settings for a named scale with optional overrides"""
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale '{scale}'. Choose from: {', '.join(SCALES)}")
+    settings = dict(SCALES[scale])
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return settings
+
+
+def generate_dataset(output_dir, scale="small", seed=42, **overrides):
+    """Generate a synthetic dataset as JSON snapshot files in output_dir
+
+    Returns a summary dict with record counts and generation time. The same
+    seed and settings always produce byte-identical files.
+    """
+    settings = resolve_scale(scale, **overrides)
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+
+    num_students = settings["students"]
+    num_courses = settings["courses"]
+    num_books = settings["books"]
+
+    # Courses: popularity follows a long tail so the popular ones build waitlists
+    courses = []
+    for i in range(num_courses):
+        prefix, subject = SUBJECTS[i % len(SUBJECTS)]
+        code = format_course_id(i)
+        courses.append({
+            "course_id": code,
+            "name": f"{subject} {code[len(prefix):]}",
+            "capacity": rng.choice([30, 40, 60, 80, 120, 200]),
+            "enrolled_students": [],
+            "waitlist": []
+        })
+    pick_courses = _weighted_picker(rng, [1 / (rank + 1) ** 0.8 for rank in range(num_courses)])
+    course_difficulty = [rng.uniform(-8, 8) for _ in range(num_courses)]
+
+    # Books: copies are tracked so loans never exceed what's on the shelf
+    books = []
+    for i in range(num_books):
+        books.append({
+            "isbn": f"ISBN-{i // 1000:03d}-{i % 1000:03d}",
+            "title": f"{rng.choice(SUBJECTS)[1]} Volume {i + 1}",
+            "author": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "total_copies": rng.randint(1, 6),
+            "available_copies": 0,
+            "borrow_history": []
+        })
+    for book in books:
+        book["available_copies"] = book["total_copies"]
+    pick_books = _weighted_picker(rng, [1 / (rank + 1) ** 0.6 for rank in range(num_books)]) if books else None
+
+    students = []
+    counts = {"students": 0, "courses": num_courses, "books": num_books,
+              "enrollments": 0, "waitlisted": 0, "payments": 0, "loans": 0, "grades": 0}
+
+    transactions = _JsonObjectWriter(os.path.join(output_dir, "transactions.json"))
+    grades = _JsonObjectWriter(os.path.join(output_dir, "grades.json"))
+    tx_number = 0
+    try:
+        for n in range(1, num_students + 1):
+            student_id = format_student_id(n, num_students)
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            student = {
+                "student_id": student_id,
+                "name": f"{first} {last}",
+                "email": f"{first.lower()}.{last.lower()}{n}@meru.edu",
+                "year": rng.randint(1, 5),
+                "courses": [],
+                "fees_paid": 0
+            }
+            ability = rng.gauss(68, 10)
+
+            # Enrollments: first come, first served, overflow goes to the waitlist
+            student_grades = []
+            if courses:
+                for index in set(pick_courses(rng.randint(3, 6))):
+                    course = courses[index]
+                    if len(course["enrolled_students"]) < course["capacity"]:
+                        course["enrolled_students"].append(student_id)
+                        student["courses"].append(course["course_id"])
+                        counts["enrollments"] += 1
+                        score = rng.gauss(ability - course_difficulty[index], 9)
+                        student_grades.append({
+                            "course_id": course["course_id"],
+                            "score": round(min(max(score, 0), 100), 1)
+                        })
+                    else:
+                        course["waitlist"].append(student_id)
+                        counts["waitlisted"] += 1
+            if student_grades:
+                grades.write(student_id, student_grades)
+                counts["grades"] += len(student_grades)
+
+            # Payments: roughly Poisson around the configured mean
+            for _ in range(max(0, int(rng.gauss(settings["payments_per_student"], 2)))):
+                tx_number += 1
+                description, low, high = rng.choice(PAYMENT_TYPES)
+                amount = float(round(rng.uniform(low, high), -1))
+                transaction_id = f"T{str(tx_number).zfill(7)}"
+                transactions.write(transaction_id, {
+                    "transaction_id": transaction_id,
+                    "student_id": student_id,
+                    "amount": amount,
+                    "description": description,
+                    "date": (TERM_START + timedelta(days=rng.randrange(TERM_DAYS))).isoformat()
+                })
+                student["fees_paid"] += amount
+                counts["payments"] += 1
+
+            # Loans: most are returned, a few stay out while copies remain
+            if pick_books:
+                for index in pick_books(max(0, int(rng.gauss(settings["loans_per_student"], 1.5)))):
+                    book = books[index]
+                    borrowed_at = datetime.combine(TERM_START, datetime.min.time()) + timedelta(
+                        seconds=rng.randrange(TERM_DAYS * 86400))
+                    book["borrow_history"].append({
+                        "student_id": student_id,
+                        "action": "borrowed",
+                        "timestamp": borrowed_at.isoformat()
+                    })
+                    if book["available_copies"] > 1 and rng.random() < 0.1:
+                        book["available_copies"] -= 1
+                    else:
+                        book["borrow_history"].append({
+                            "student_id": student_id,
+                            "action": "returned",
+                            "timestamp": (borrowed_at + timedelta(days=rng.randint(1, 21))).isoformat()
+                        })
+                    counts["loans"] += 1
+
+            students.append(student)
+            counts["students"] += 1
+    finally:
+        transactions.close()
+        grades.close()
+
+    for filename, records, key in (("students.json", students, "student_id"),
+                                   ("courses.json", courses, "course_id"),
+                                   ("books.json", books, "isbn")):
+        writer = _JsonObjectWriter(os.path.join(output_dir, filename))
+        try:
+            for record in records:
+                writer.write(record[key], record)
+        finally:
+            writer.close()
+
+    counts["seconds"] = round(time.perf_counter() - started, 3)
+    counts["output_dir"] = output_dir
+    return counts
+
+
+def data_files(output_dir):
+    """Get the per-service data file paths inside a generated dataset"""
+    return {
+        "students": os.path.join(output_dir, "students.json"),
+        "courses": os.path.join(output_dir, "courses.json"),
+        "transactions": os.path.join(output_dir, "transactions.json"),
+        "books": os.path.join(output_dir, "books.json"),
+        "grades": os.path.join(output_dir, "grades.json"),
+    }
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic school dataset")
+    parser.add_argument("--scale", default="small", choices=sorted(SCALES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="data/generated")
+    parser.add_argument("--students", type=int)
+    parser.add_argument("--courses", type=int)
+    parser.add_argument("--books", type=int)
+    parser.add_argument("--payments-per-student", type=int, dest="payments_per_student")
+    parser.add_argument("--loans-per-student", type=int, dest="loans_per_student")
+    args = parser.parse_args(argv)
+
+    summary = generate_dataset(
+        args.output, args.scale, args.seed,
+        students=args.students, courses=args.courses, books=args.books,
+        payments_per_student=args.payments_per_student,
+        loans_per_student=args.loans_per_student
+    )
+    print(f"✓ Generated dataset in {summary['output_dir']} ({summary['seconds']}s)")
+    for key in ("students", "courses", "books", "enrollments", "waitlisted", "payments", "loans", "grades"):
+        print(f"  {key.capitalize()}: {summary[key]:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,31 +3,71 @@
 Main application for Meru University School Management System
 """
 
+import argparse
+import json
 import os
 import sys
-from services.student_registry import StudentRegistry
-from services.course_scheduler import CourseScheduler
-from services.fee_tracker import FeeTracker
-from services.library_system import LibrarySystem
-from services.analytics_engine import AnalyticsEngine
+from services.container import ServiceContainer
+from services.payment_importer import import_payments
+from services.exporter import EXPORTS, export
+from services.commands import COMMANDS, PARAMETER_TYPES, run_script, timed_command
+from services.tenancy import CAMPUS_NAME
+from services.snapshots import SnapshotManager
+from services.transactions import SaveError
 from data.sample_data import initialize_sample_data
+from utils.metrics import metrics
+from utils.profiling import ActionProfiler
 
-class SchoolManagementSystem:
-    def __init__(self):
-        """Initialize the school management system with all modules"""
+class SchoolManagementSystem(ServiceContainer):
+    def __init__(self, profile_dir=None, data_dir="data", preload=False, parallel_load=False,
+                 storage_format="json"):
+        """Initialize the school management system with all modules
+
+        Modules are loaded lazily on first use; preload=True warms them all
+        in background threads instead, and parallel_load=True loads them all
+        up front with a process pool, reporting per-file timings.
+
+        The data directory is shared: other terminals may use it at the same
+        time, and each action sees their latest saved changes.
+        """
         print("Initializing Meru University School Management System...")
         
         # Create data directory if it doesn't exist
-        os.makedirs("data", exist_ok=True)
+        os.makedirs(data_dir, exist_ok=True)
+        super().__init__(data_dir, storage_format, shared=True)
         
-        # Initialize all modules
-        self.student_registry = StudentRegistry()
-        self.course_scheduler = CourseScheduler()
-        self.fee_tracker = FeeTracker()
-        self.library_system = LibrarySystem()
-        self.analytics_engine = AnalyticsEngine()
+        # Optional per-action cProfile/tracemalloc profiling
+        self.profiler = ActionProfiler(profile_dir) if profile_dir else None
         
-        print("✓ All modules initialized successfully")
+        if parallel_load:
+            timings = self.load_parallel()
+            for name, timing in timings.items():
+                if name != "wall_seconds":
+                    print(f"  {name}: {timing['records']:,} records | parse {timing['parse_seconds']:.3f}s"
+                          f" | build {timing['materialize_seconds']:.3f}s ({timing['chunks']} chunk(s))"
+                          f" | populate {timing['populate_seconds']:.3f}s")
+            print(f"✓ All modules loaded in parallel in {timings['wall_seconds']:.3f}s")
+        elif preload:
+            self.preload()
+            print("✓ Modules loading in the background")
+        else:
+            print("✓ Modules will load on first use")
+    
+    def _run_action(self, name, action):
+        """Run a menu action on the latest data, profiling it when profiling mode is on"""
+        reloaded = self.refresh()
+        if reloaded:
+            print(f"ℹ Reloaded changes from another terminal: {', '.join(reloaded)}")
+        if self.profiler:
+            return self.profiler.profile(name, action)
+        return action()
+    
+    def finish_profiling(self):
+        """Write the profiling summary and report where it went"""
+        if self.profiler:
+            path = self.profiler.write_summary()
+            if path:
+                print(f"✓ Profiling summary written to {path}")
     
     def display_menu(self):
         """Display the main menu"""
@@ -40,7 +80,8 @@ class SchoolManagementSystem:
         print("4. Library Management")
         print("5. Analytics & Reports")
         print("6. System Demo")
-        print("7. Exit")
+        print("7. System Metrics")
+        print("8. Exit")
         print("="*60)
     
     def student_management_menu(self):
@@ -57,15 +98,15 @@ class SchoolManagementSystem:
             choice = input("\nEnter your choice (1-6): ").strip()
             
             if choice == '1':
-                self.add_student()
+                self._run_action("add_student", self.add_student)
             elif choice == '2':
-                self.find_student()
+                self._run_action("find_student", self.find_student)
             elif choice == '3':
-                self.remove_student()
+                self._run_action("remove_student", self.remove_student)
             elif choice == '4':
-                self.list_all_students()
+                self._run_action("list_all_students", self.list_all_students)
             elif choice == '5':
-                self.search_students()
+                self._run_action("search_students", self.search_students)
             elif choice == '6':
                 break
             else:
@@ -154,17 +195,17 @@ class SchoolManagementSystem:
             choice = input("\nEnter your choice (1-7): ").strip()
             
             if choice == '1':
-                self.create_course()
+                self._run_action("create_course", self.create_course)
             elif choice == '2':
-                self.enroll_student()
+                self._run_action("enroll_student", self.enroll_student)
             elif choice == '3':
-                self.drop_student()
+                self._run_action("drop_student", self.drop_student)
             elif choice == '4':
-                self.course_status()
+                self._run_action("course_status", self.course_status)
             elif choice == '5':
-                self.list_all_courses()
+                self._run_action("list_all_courses", self.list_all_courses)
             elif choice == '6':
-                self.process_waitlist()
+                self._run_action("process_waitlist", self.process_waitlist)
             elif choice == '7':
                 break
             else:
@@ -295,21 +336,24 @@ class SchoolManagementSystem:
             print("3. Student Payment History")
             print("4. Generate Clearance Report")
             print("5. View All Transactions")
-            print("6. Back to Main Menu")
+            print("6. Import Payments from File")
+            print("7. Back to Main Menu")
             
-            choice = input("\nEnter your choice (1-6): ").strip()
+            choice = input("\nEnter your choice (1-7): ").strip()
             
             if choice == '1':
-                self.add_payment()
+                self._run_action("add_payment", self.add_payment)
             elif choice == '2':
-                self.view_transaction()
+                self._run_action("view_transaction", self.view_transaction)
             elif choice == '3':
-                self.student_payment_history()
+                self._run_action("student_payment_history", self.student_payment_history)
             elif choice == '4':
-                self.generate_clearance_report()
+                self._run_action("generate_clearance_report", self.generate_clearance_report)
             elif choice == '5':
-                self.view_all_transactions()
+                self._run_action("view_all_transactions", self.view_all_transactions)
             elif choice == '6':
+                self._run_action("import_payments", self.import_payments)
+            elif choice == '7':
                 break
             else:
                 print("Invalid choice. Please try again.")
@@ -322,14 +366,9 @@ class SchoolManagementSystem:
             amount = float(input("Amount: ").strip())
             description = input("Description: ").strip() or "Tuition Fee"
             
+            # The student's total fees follow through the payment_added cascade
             transaction = self.fee_tracker.add_payment(student_id, amount, description)
             print(f"✓ Payment recorded: {transaction}")
-            
-            # Update student's total fees
-            student = self.student_registry.get_student(student_id)
-            if student:
-                student.add_payment(amount)
-                self.student_registry._save_data()
                 
         except ValueError as e:
             print(f"✗ Invalid input: {e}")
@@ -408,6 +447,24 @@ class SchoolManagementSystem:
         for tx in transactions:
             print(f"  Ksh.{tx.amount:>8,.2f} - {tx.student_id} - {tx.description}")
     
+    def import_payments(self):
+        """Import payments from a CSV or JSON-lines bank statement"""
+        print("\n--- IMPORT PAYMENTS ---")
+        path = input("File path (.csv or .jsonl): ").strip()
+        try:
+            summary = import_payments(path, self.fee_tracker, container=self)
+            print(f"✓ Imported {summary['imported']:,} payments in {summary['batches']} batch(es) "
+                  f"({summary['seconds']:.2f}s)")
+            if summary['rejected']:
+                print(f"⚠ {summary['rejected']:,} rows rejected; see {summary['reject_file']}")
+            if 'failed_batch' in summary:
+                print(f"✗ Batch {summary['failed_batch']} failed: {summary['error']}; "
+                      f"resume with: main.py import-payments {path} --resume-line {summary['resume_line']}")
+        except ValueError as e:
+            print(f"✗ {e}")
+        except Exception as e:
+            print(f"✗ Error importing payments: {e}")
+    
     def library_management_menu(self):
         """Library management submenu"""
         while True:
@@ -423,17 +480,17 @@ class SchoolManagementSystem:
             choice = input("\nEnter your choice (1-7): ").strip()
             
             if choice == '1':
-                self.add_book()
+                self._run_action("add_book", self.add_book)
             elif choice == '2':
-                self.borrow_book()
+                self._run_action("borrow_book", self.borrow_book)
             elif choice == '3':
-                self.return_book()
+                self._run_action("return_book", self.return_book)
             elif choice == '4':
-                self.search_books()
+                self._run_action("search_books", self.search_books)
             elif choice == '5':
-                self.book_status()
+                self._run_action("book_status", self.book_status)
             elif choice == '6':
-                self.available_books()
+                self._run_action("available_books", self.available_books)
             elif choice == '7':
                 break
             else:
@@ -545,21 +602,24 @@ class SchoolManagementSystem:
             print("3. Top Performers")
             print("4. Student Ranking")
             print("5. Comprehensive Report")
-            print("6. Back to Main Menu")
+            print("6. Export Data (CSV/JSONL)")
+            print("7. Back to Main Menu")
             
-            choice = input("\nEnter your choice (1-6): ").strip()
+            choice = input("\nEnter your choice (1-7): ").strip()
             
             if choice == '1':
-                self.student_performance()
+                self._run_action("student_performance", self.student_performance)
             elif choice == '2':
-                self.course_analytics()
+                self._run_action("course_analytics", self.course_analytics)
             elif choice == '3':
-                self.top_performers()
+                self._run_action("top_performers", self.top_performers)
             elif choice == '4':
-                self.student_ranking()
+                self._run_action("student_ranking", self.student_ranking)
             elif choice == '5':
-                self.comprehensive_report()
+                self._run_action("comprehensive_report", self.comprehensive_report)
             elif choice == '6':
+                self._run_action("export_data", self.export_data)
+            elif choice == '7':
                 break
             else:
                 print("Invalid choice. Please try again.")
@@ -599,8 +659,13 @@ class SchoolManagementSystem:
             print("No grades recorded for this course.")
             return
         
+        stats = self.analytics_engine.get_course_stats(course_id) or {}
+        percentiles = self.analytics_engine.get_score_percentiles((50,), course_id)
+
         print(f"\nAnalytics for {course_id}:")
         print(f"Average Score: {average:.2f}%")
+        print(f"Median Score: {percentiles.get(50, 0.0):.2f}%")
+        print(f"Std Deviation: {stats.get('std', 0.0):.2f}")
         print(f"Total Grades: {len(grades)}")
         
         if top_students:
@@ -638,9 +703,7 @@ class SchoolManagementSystem:
             print(f"Position: {ranking['rank']} out of {ranking['total_students']} students")
             print(f"Average Score: {ranking['average_score']:.2f}%")
             
-            # Calculate percentile
-            percentile = (ranking['total_students'] - ranking['rank']) / ranking['total_students'] * 100
-            print(f"Percentile: {percentile:.1f}%")
+            print(f"Percentile: {ranking['percentile']:.1f}%")
         else:
             print("No ranking data available for this student.")
     
@@ -667,7 +730,82 @@ class SchoolManagementSystem:
             print(f"    Average: {stats['average_score']:.2f}%")
             print(f"    Total Grades: {stats['total_grades']}")
             if stats['top_students']:
-                print(f"    Top Students: {', '.join([f'{s['student_id']}({s['score']:.1f}%)' for s in stats['top_students']])}")
+                top = ', '.join(f"{s['student_id']}({s['score']:.1f}%)" for s in stats['top_students'])
+                print(f"    Top Students: {top}")
+    
+    def export_data(self):
+        """Stream a dataset or report to a CSV or JSON-lines file"""
+        print("\n--- EXPORT DATA ---")
+        print(f"Exports: {', '.join(EXPORTS)}")
+        name = input("Export: ").strip().lower()
+        path = input("Output file (.csv or .jsonl): ").strip()
+        try:
+            options = {}
+            if name == "clearance":
+                options["required_amount"] = float(input("Required fee amount: ").strip())
+            elif name == "transactions":
+                options["sort_by_amount"] = input("Sort by amount? (y/n): ").strip().lower() == 'y'
+            summary = export(self, name, path, **options)
+            print(f"✓ Exported {summary['rows']:,} rows to {summary['path']} ({summary['seconds']:.2f}s)")
+        except ValueError as e:
+            print(f"✗ Invalid input: {e}")
+        except Exception as e:
+            print(f"✗ Error exporting data: {e}")
+    
+    def metrics_menu(self):
+        """System metrics submenu"""
+        while True:
+            print("\n--- SYSTEM METRICS ---")
+            print(f"Collection: {'ENABLED' if metrics.enabled else 'DISABLED'}")
+            print("1. View Operation Metrics")
+            print("2. Export Metrics to JSON")
+            print("3. Reset Metrics")
+            print("4. Toggle Collection")
+            print("5. Back to Main Menu")
+            
+            choice = input("\nEnter your choice (1-5): ").strip()
+            
+            if choice == '1':
+                self._run_action("view_metrics", self.view_metrics)
+            elif choice == '2':
+                self._run_action("export_metrics", self.export_metrics)
+            elif choice == '3':
+                metrics.reset()
+                print("✓ Metrics reset")
+            elif choice == '4':
+                metrics.enabled = not metrics.enabled
+                print(f"✓ Metrics collection {'enabled' if metrics.enabled else 'disabled'}")
+            elif choice == '5':
+                break
+            else:
+                print("Invalid choice. Please try again.")
+    
+    def view_metrics(self):
+        """Display per-operation latency and I/O metrics"""
+        snapshot = metrics.snapshot()
+        if not snapshot:
+            print("No metrics recorded yet.")
+            return
+        
+        print(f"\n{'Operation':<45} {'Calls':>7} {'Mean':>9} {'p50':>9} {'p99':>9} {'Max':>9}")
+        print("-" * 92)
+        for name, data in snapshot.items():
+            if data["type"] == "counter":
+                print(f"{name:<45} {data['value']:>7}")
+            else:
+                unit = "ms" if data["type"] == "timer" else ""
+                print(f"{name:<45} {data['count']:>7} "
+                      f"{data['mean']:>7.2f}{unit:<2} {data['p50']:>7.2f}{unit:<2} "
+                      f"{data['p99']:>7.2f}{unit:<2} {data['max']:>7.2f}{unit:<2}")
+    
+    def export_metrics(self):
+        """Write metrics snapshot to a JSON file"""
+        filename = input("Output file (default data/metrics.json): ").strip() or "data/metrics.json"
+        try:
+            metrics.dump(filename)
+            print(f"✓ Metrics written to {filename}")
+        except OSError as e:
+            print(f"✗ Error writing metrics: {e}")
     
     def run_demo(self):
         """Run a comprehensive system demo"""
@@ -728,7 +866,7 @@ class SchoolManagementSystem:
         
         while True:
             self.display_menu()
-            choice = input("\nEnter your choice (1-7): ").strip()
+            choice = input("\nEnter your choice (1-8): ").strip()
             
             if choice == '1':
                 self.student_management_menu()
@@ -741,24 +879,153 @@ class SchoolManagementSystem:
             elif choice == '5':
                 self.analytics_menu()
             elif choice == '6':
-                self.run_demo()
+                self._run_action("run_demo", self.run_demo)
             elif choice == '7':
+                self.metrics_menu()
+            elif choice == '8':
                 print("\nThank you for using Meru University School Management System!")
                 print("Goodbye! 👋")
                 break
             else:
                 print("Invalid choice. Please try again.")
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Meru University School Management System")
+    parser.add_argument(
+        "--data-dir", default="data",
+        help="directory holding the JSON data files (default: data)"
+    )
+    parser.add_argument(
+        "--campus", metavar="NAME",
+        help="use campus NAME's data in DATA_DIR/campuses/NAME (see services.tenancy)"
+    )
+    parser.add_argument(
+        "--journal", action="store_true",
+        help="journal every change for point-in-time restore (snapshots live in DATA_DIR/history; "
+             "see services.snapshots)"
+    )
+    parser.add_argument(
+        "--storage-format", choices=["json", "binary"], default="json",
+        help="data file format: pretty-printed JSON or compact binary snapshots (default: json)"
+    )
+    parser.add_argument(
+        "--preload", action="store_true",
+        help="load all modules in parallel background threads at startup"
+    )
+    parser.add_argument(
+        "--parallel-load", action="store_true",
+        help="parse and load all data files concurrently in a process pool at startup"
+    )
+    parser.add_argument(
+        "--profile", nargs="?", const="profiles", metavar="DIR",
+        default=os.environ.get("SMS_PROFILE_DIR") or None,
+        help="profile each menu action, command or script operation with cProfile/tracemalloc, "
+             "writing reports to DIR (default: profiles; also enabled by SMS_PROFILE_DIR)"
+    )
+    
+    # Non-interactive mode: run-script plus one subcommand per service operation
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND",
+                                       help="run operations directly instead of the interactive menu")
+    script = subparsers.add_parser("run-script", help="run a JSON-lines script with one storage flush")
+    script.add_argument("path", help="script with one {\"op\": ..., ...} operation per line")
+    script.add_argument("--atomic", action="store_true",
+                        help="all or nothing: stop at the first failure and undo the whole script")
+    for name, (_, required, optional) in COMMANDS.items():
+        command = subparsers.add_parser(name, help=f"{name} ({', '.join(required)})")
+        for param in required:
+            command.add_argument(param, type=PARAMETER_TYPES.get(param, str))
+        for param, default in optional.items():
+            flag = "--" + param.replace("_", "-")
+            if isinstance(default, bool):
+                command.add_argument(flag, dest=param, action="store_true")
+            else:
+                command.add_argument(flag, dest=param, default=default,
+                                     type=PARAMETER_TYPES.get(param, str))
+    args = parser.parse_args(argv)
+    if args.campus:
+        if not CAMPUS_NAME.match(args.campus):
+            parser.error("campus name must be letters, digits, '-' or '_'")
+        args.data_dir = os.path.join(args.data_dir, "campuses", args.campus)
+    return args
+
+def print_outcome(outcome):
+    """Print one command outcome with its timing"""
+    where = f"line {outcome['line']}: " if outcome.get('line') else ""
+    if outcome['ok']:
+        print(f"✓ {where}{outcome['op']} ({outcome['ms']:.2f}ms) {json.dumps(outcome['result'], default=str)}")
+    else:
+        print(f"✗ {where}{outcome['op']} ({outcome['ms']:.2f}ms) {outcome['error']}")
+
+def run_commands(args):
+    """Run a script or a single subcommand without the interactive menu; returns the exit code"""
+    os.makedirs(args.data_dir, exist_ok=True)
+    container = ServiceContainer(args.data_dir, args.storage_format, shared=True)
+    history = SnapshotManager(container) if args.journal else None
+    profiler = ActionProfiler(args.profile) if args.profile else None
+    try:
+        return _run_command_args(args, container, profiler)
+    finally:
+        if profiler:
+            path = profiler.write_summary()
+            if path:
+                print(f"✓ Profiling summary written to {path}")
+        if history:
+            history.stop()
+
+def _run_command_args(args, container, profiler=None):
+    """Run the script or subcommand named by args against a container, profiling each operation if asked"""
+    if args.command == "run-script":
+        try:
+            summary = run_script(container, args.path, on_outcome=print_outcome, atomic=args.atomic,
+                                 profiler=profiler)
+        except (OSError, SaveError) as e:
+            print(f"✗ {e}")
+            return 1
+        flushed = ', '.join(f"{name}{'' if saved else ' (FAILED)'}"
+                            for name, saved in summary['flushed'].items()) or 'nothing'
+        if summary['rolled_back']:
+            flushed += " (script rolled back)"
+        print(f"\n{summary['succeeded']} succeeded, {summary['failed']} failed in "
+              f"{summary['command_seconds']:.3f}s; flushed {flushed} in {summary['flush_seconds']:.3f}s")
+        return 0 if not summary['failed'] and all(summary['flushed'].values()) else 1
+
+    _, required, optional = COMMANDS[args.command]
+    params = {name: getattr(args, name) for name in [*required, *optional]}
+    try:
+        # The command and its cascades into other services are saved together or not at all
+        with container.transaction():
+            outcome = timed_command(container, args.command, params, profiler=profiler)
+    except Exception as e:  # a cascade or the commit failed
+        print(f"✗ {args.command}: {e}; nothing was changed")
+        return 1
+    print_outcome(outcome)
+    return 0 if outcome['ok'] else 1
+
+def main(argv=None):
     """Main entry point"""
+    args = parse_args(argv)
+    if args.command:
+        return run_commands(args)
+    system = None
+    history = None
     try:
-        system = SchoolManagementSystem()
+        system = SchoolManagementSystem(profile_dir=args.profile, data_dir=args.data_dir,
+                                        preload=args.preload, parallel_load=args.parallel_load,
+                                        storage_format=args.storage_format)
+        if args.journal:
+            history = SnapshotManager(system)
         system.run()
     except KeyboardInterrupt:
         print("\n\nProgram interrupted by user. Goodbye!")
     except Exception as e:
         print(f"\nAn unexpected error occurred: {e}")
         print("Please check the system configuration and try again.")
+    finally:
+        if system:
+            system.finish_profiling()
+        if history:
+            history.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
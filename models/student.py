@@ -36,6 +36,13 @@ class Student:
             return True
         return False
 
+    def drop_course(self, course_id):
+        """Remove course from student's course list"""
+        if course_id in self.courses:
+            self.courses.remove(course_id)
+            return True
+        return False
+
     def add_payment(self, amount):
         """Add payment to student's total fees paid"""
         if not isinstance(amount, (int, float)) or amount < 0:
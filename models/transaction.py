@@ -1,12 +1,13 @@
 from utils.validators import validate_amount, validate_date
 
 class Transaction:
-    def __init__(self, transaction_id, student_id, amount, description="", date=None):
+    def __init__(self, transaction_id, student_id, amount, description="", date=None, reference=None):
         self.transaction_id = transaction_id
         self.student_id = student_id
         self.amount = amount
         self.description = description
         self.date = date or self._get_current_date()
+        self.reference = reference  # External payment reference, e.g. a bank statement line
         self.left = None
         self.right = None
 
@@ -26,6 +27,9 @@ class Transaction:
         if not validate_date(self.date):
             raise ValueError("Invalid date format")
 
+        if self.reference is not None and (not self.reference or not isinstance(self.reference, str)):
+            raise ValueError("Reference must be a non-empty string")
+
     def _get_current_date(self):
         """Get current date (simplified)"""
         from datetime import datetime
@@ -38,7 +42,8 @@ class Transaction:
             'student_id': self.student_id,
             'amount': self.amount,
             'description': self.description,
-            'date': self.date
+            'date': self.date,
+            'reference': self.reference
         }
 
     @classmethod
@@ -49,7 +54,8 @@ class Transaction:
             data['student_id'],
             data['amount'],
             data.get('description', ''),
-            data.get('date')
+            data.get('date'),
+            data.get('reference')
         )
 
     def __str__(self):
@@ -3,11 +3,13 @@ from .course_scheduler import CourseScheduler
 from .fee_tracker import FeeTracker
 from .library_system import LibrarySystem
 from .analytics_engine import AnalyticsEngine
+from .container import ServiceContainer
 
 __all__ = [
     'StudentRegistry', 
     'CourseScheduler', 
     'FeeTracker', 
     'LibrarySystem', 
-    'AnalyticsEngine'
+    'AnalyticsEngine',
+    'ServiceContainer'
 ]
\ No newline at end of file
@@ -1,157 +1,359 @@
-import heapq
-from collections import defaultdict
+from utils.helpers import save_data, load_data
+from utils.rank_index import ScoreRankIndex
+from utils.top_k import TopK, top_n
+from utils.grade_store import ColumnarGradeStore
+from utils.metrics import timed
+from .transactions import change
+
+LEADERBOARD_SIZE = 10  # entries kept in each maintained top-k leaderboard
+REPORT_TOP_PERFORMERS = 5  # top performers listed in the performance report
+REPORT_TOP_STUDENTS = 3  # top students listed per course in the report
 
 class AnalyticsEngine:
-    def __init__(self):
-        self.grades = defaultdict(list)  # student_id -> list of (course_id, score)
-        self.course_grades = defaultdict(list)  # course_id -> list of (student_id, score)
+    def __init__(self, data_file="data/grades.json", autoload=True):
+        # Columnar store holding the one copy of every grade, for vectorized statistics
+        self.grade_store = ColumnarGradeStore()
+        # Read-only views built from its rows
+        self.grades = self.grade_store.by_student  # student_id -> list of (course_id, score)
+        self.course_grades = self.grade_store.by_course  # course_id -> list of (student_id, score)
 
-    def add_grade(self, student_id, course_id, score):
-        """Add a grade for analytics"""
-        try:
-            if not student_id or not isinstance(student_id, str):
-                raise ValueError("Invalid student ID")
+        # Running aggregates so averages are O(1): id -> [total_score, grade_count]
+        self.student_totals = {}
+        self.course_totals = {}
+        self.overall_total = 0
+        self.overall_count = 0
 
-            if not course_id or not isinstance(course_id, str):
-                raise ValueError("Invalid course ID")
+        # Fenwick tree over student averages for O(log n) ranking
+        self.rank_index = ScoreRankIndex()
 
-            if not isinstance(score, (int, float)) or score < 0 or score > 100:
-                raise ValueError("Score must be between 0 and 100")
+        # Bounded leaderboards maintained as grades arrive
+        self.top_students = TopK(LEADERBOARD_SIZE)
+        self.course_leaders = {}  # course_id -> TopK of (student_id, score)
 
-            # Add to student's grades
-            self.grades[student_id].append((course_id, score))
+        # Materialized performance report, refreshed section by section
+        self.report_course_sections = {}  # course_id -> course statistics section
+        self.report_top_performers = []
+        self.dirty_courses = set()
+        self.top_performers_dirty = True
 
-            # Add to course's grades
-            self.course_grades[course_id].append((student_id, score))
+        self.data_file = data_file
+        self.events = None  # EventBus notified of saved changes, attached by ServiceContainer
+        self.undo_journal = None  # UndoJournal of an open transaction, attached by ServiceContainer
+        if autoload:
+            self._load_data()
 
+    @timed()
+    def _load_data(self):
+        """Load grade data from storage"""
+        data = load_data(self.data_file)
+        if data:
+            for student_id, grade_list in data.items():
+                for grade_data in grade_list:
+                    try:
+                        self.validate_grade(student_id, grade_data['course_id'], grade_data['score'])
+                        self._record_grade(student_id, grade_data['course_id'], grade_data['score'])
+                    except Exception as e:
+                        print(f"Error loading grade for {student_id}: {e}")
+            print(f"✓ Loaded {self.overall_count} grades from storage")
+
+    def _populate(self, grades):
+        """Add already-validated (student_id, course_id, score) grades (used by the parallel loader)"""
+        for student_id, course_id, score in grades:
+            self._record_grade(student_id, course_id, score)
+        print(f"✓ Loaded {self.overall_count} grades from storage")
+
+    @timed()
+    def _save_data(self):
+        """Save grade data to storage"""
+        data = {
+            sid: [{'course_id': cid, 'score': score} for cid, score in grade_list]
+            for sid, grade_list in self.grades.items()
+        }
+        if save_data(data, self.data_file):
+            return True
+        return False
+
+    def _emit(self, event, **payload):
+        """Publish a change event if an event bus is attached"""
+        if self.events:
+            self.events.publish(event, **payload)
+
+    def _record_grade(self, student_id, course_id, score):
+        """Store a grade and update the running aggregates (internal method)"""
+        self.grade_store.append(student_id, course_id, score)
+
+        self._update_totals(self.student_totals, student_id, score, 1)
+        self._update_totals(self.course_totals, course_id, score, 1)
+        self.overall_total += score
+        self.overall_count += 1
+        self._update_rank(student_id)
+        self._mark_report_dirty(student_id, course_id)
+
+        if course_id not in self.course_leaders:
+            self.course_leaders[course_id] = TopK(LEADERBOARD_SIZE)
+        self.course_leaders[course_id].push(student_id, score)
+
+    def _unrecord_grade(self, student_id, course_id, score):
+        """Undo the most recent _record_grade call (undo step)"""
+        self.grade_store.pop()
+
+        self._update_totals(self.student_totals, student_id, -score, -1)
+        self._update_totals(self.course_totals, course_id, -score, -1)
+        self.overall_total -= score
+        self.overall_count -= 1
+        self._update_rank(student_id)
+        self._mark_report_dirty(student_id, course_id)
+
+        # The removed score may have been on the course leaderboard
+        if course_id in self.course_grades:
+            self.course_leaders[course_id].invalidate()
+        else:
+            self.course_leaders.pop(course_id, None)
+
+    def _mark_report_dirty(self, student_id, course_id):
+        """Flag the report sections affected by a grade change"""
+        self.dirty_courses.add(course_id)
+
+        if self.top_performers_dirty:
+            return
+        listed = self.report_top_performers
+        if (len(listed) < REPORT_TOP_PERFORMERS
+                or any(p["student_id"] == student_id for p in listed)
+                or self.get_student_average(student_id) >= listed[-1]["average_score"]):
+            self.top_performers_dirty = True
+
+    def _update_rank(self, student_id):
+        """Re-index a student's average after their grades change"""
+        if student_id in self.student_totals:
+            average = self.get_student_average(student_id)
+            self.rank_index.update(student_id, average)
+            self.top_students.update(student_id, average)
+        else:
+            self.rank_index.remove(student_id)
+            self.top_students.invalidate()
+
+    @staticmethod
+    def _update_totals(totals, key, score_delta, count_delta):
+        """Apply a delta to a [total_score, grade_count] aggregate"""
+        entry = totals.setdefault(key, [0, 0])
+        entry[0] += score_delta
+        entry[1] += count_delta
+        if entry[1] <= 0:
+            del totals[key]
+
+    @staticmethod
+    def validate_grade(student_id, course_id, score):
+        """Raise ValueError unless a grade is valid (also used when loading stored grades)"""
+        if not student_id or not isinstance(student_id, str):
+            raise ValueError("Invalid student ID")
+
+        if not course_id or not isinstance(course_id, str):
+            raise ValueError("Invalid course ID")
+
+        if not isinstance(score, (int, float)) or score < 0 or score > 100:
+            raise ValueError("Score must be between 0 and 100")
+
+    @timed()
+    def add_grade(self, student_id, course_id, score):
+        """Add a grade for analytics"""
+        try:
+            self.validate_grade(student_id, course_id, score)
+
+            # Add to student/course grades and update aggregates
+            with change(self, "Failed to save grade data") as undo:
+                self._record_grade(student_id, course_id, score)
+                undo(self._unrecord_grade, student_id, course_id, score)
+
+            self._emit("grade_added", student_id=student_id, course_id=course_id, score=score)
             return True
 
         except Exception as e:
             raise Exception(f"Failed to add grade: {e}")
 
+    @timed()
+    def remove_student_grades(self, student_id):
+        """Remove all of a student's grades and update the aggregates; returns the number removed"""
+        grades = self.grades.get(student_id)
+        if not grades:
+            return 0
+
+        with change(self, "Failed to save grade data") as undo:
+            self._unrecord_student(student_id)
+            undo(self._restore_grades, student_id, grades)
+        self._emit("grades_removed", student_id=student_id, count=len(grades))
+        return len(grades)
+
+    def _unrecord_student(self, student_id):
+        """Remove every grade of a student and update the aggregates (internal method)"""
+        grades = self.grades[student_id]
+        self.grade_store.remove_student(student_id)
+        self.student_totals.pop(student_id, None)
+        for course_id, score in grades:
+            if course_id in self.course_grades:
+                self.course_leaders[course_id].invalidate()
+            else:
+                self.course_leaders.pop(course_id, None)
+            self._update_totals(self.course_totals, course_id, -score, -1)
+            self.overall_total -= score
+            self.overall_count -= 1
+            self.dirty_courses.add(course_id)
+        self._update_rank(student_id)
+        self.top_performers_dirty = True
+
+    def _restore_grades(self, student_id, grades):
+        """Record a student's removed grades again (undo step)"""
+        for course_id, score in grades:
+            self._record_grade(student_id, course_id, score)
+
     def get_student_grades(self, student_id):
         """Get all grades for a student"""
-        return self.grades.get(student_id, [])
+        return self.grade_store.student_grades(student_id)
 
     def get_student_average(self, student_id):
-        """Calculate student's average grade"""
-        grades = self.get_student_grades(student_id)
-        if not grades:
+        """Calculate student's average grade - O(1) from running totals"""
+        totals = self.student_totals.get(student_id)
+        if not totals:
             return 0.0
-        return sum(score for _, score in grades) / len(grades)
+        return totals[0] / totals[1]
 
     def get_course_grades(self, course_id):
         """Get all grades for a course"""
-        return self.course_grades.get(course_id, [])
+        return self.grade_store.course_grades(course_id)
 
     def get_course_average(self, course_id):
-        """Calculate course average grade"""
-        grades = self.get_course_grades(course_id)
-        if not grades:
+        """Calculate course average grade - O(1) from running totals"""
+        totals = self.course_totals.get(course_id)
+        if not totals:
+            return 0.0
+        return totals[0] / totals[1]
+
+    def get_overall_average(self):
+        """Calculate average across all grades - O(1) from running totals"""
+        if self.overall_count == 0:
             return 0.0
-        return sum(score for _, score in grades) / len(grades)
+        return self.overall_total / self.overall_count
 
+    @timed()
     def get_top_performers(self, n=5):
-        """Get top n performers using max heap"""
-        # Create max heap using negative scores
-        performance_heap = []
-
-        for student_id, grades_list in self.grades.items():
-            if grades_list:
-                average = self.get_student_average(student_id)
-                # Use negative for max heap (Python has min heap by default)
-                heapq.heappush(performance_heap, (-average, student_id, grades_list))
-
-        # Extract top n performers
-        top_performers = []
-        for i in range(min(n, len(performance_heap))):
-            neg_avg, student_id, grades_list = heapq.heappop(performance_heap)
-            top_performers.append({
+        """Get top n performers from the maintained leaderboard - O(n)"""
+        if n <= self.top_students.k:
+            if self.top_students.stale:
+                self.top_students.rebuild(
+                    (sid, self.get_student_average(sid)) for sid in self.student_totals
+                )
+            leaders = self.top_students.top(n)
+        else:
+            # Larger requests fall back to partial selection over all averages
+            leaders = top_n(((sid, self.get_student_average(sid)) for sid in self.student_totals), n)
+
+        return [
+            {
                 "rank": i + 1,
                 "student_id": student_id,
-                "average_score": -neg_avg,
-                "grades": grades_list
-            })
-
-        return top_performers
+                "average_score": average,
+                "grades": list(self.get_student_grades(student_id))
+            }
+            for i, (student_id, average) in enumerate(leaders)
+        ]
 
+    @timed()
     def get_course_performance(self, course_id, n=3):
-        """Get top performers in a specific course"""
-        grades = self.get_course_grades(course_id)
-        if not grades:
+        """Get top performers in a specific course - O(n) from the course leaderboard"""
+        if course_id not in self.course_grades:
             return []
 
-        # Create max heap for course
-        course_heap = []
-        for student_id, score in grades:
-            heapq.heappush(course_heap, (-score, student_id))
+        leaderboard = self.course_leaders[course_id]
+        if n <= leaderboard.k:
+            if leaderboard.stale:
+                leaderboard.rebuild(self.get_course_grades(course_id))
+            leaders = leaderboard.top(n)
+        else:
+            leaders = top_n(self.get_course_grades(course_id), n)
 
-        # Extract top n
-        top_students = []
-        for i in range(min(n, len(course_heap))):
-            neg_score, student_id = heapq.heappop(course_heap)
-            top_students.append({
+        return [
+            {
                 "rank": i + 1,
                 "student_id": student_id,
-                "score": -neg_score
-            })
-
-        return top_students
+                "score": score
+            }
+            for i, (student_id, score) in enumerate(leaders)
+        ]
 
+    @timed()
     def get_student_ranking(self, student_id):
-        """Get student's ranking among all students"""
-        all_averages = []
-        for sid in self.grades.keys():
-            avg = self.get_student_average(sid)
-            all_averages.append((avg, sid))
-
-        # Sort by average (descending)
-        all_averages.sort(reverse=True)
-
-        # Find student's position
-        for rank, (avg, sid) in enumerate(all_averages, 1):
-            if sid == student_id:
-                return {
-                    "rank": rank,
-                    "total_students": len(all_averages),
-                    "average_score": avg
-                }
+        """Get student's ranking among all students - O(log n) via rank index
 
-        return None
+        Students with the same average (to 2 decimal places) share a rank.
+        """
+        rank = self.rank_index.rank(student_id)
+        if rank is None:
+            return None
 
-    def generate_performance_report(self):
-        """Generate comprehensive performance report"""
-        report = {
-            "total_students_with_grades": len(self.grades),
-            "total_courses_with_grades": len(self.course_grades),
-            "overall_average": 0.0,
-            "top_performers": self.get_top_performers(5),
-            "course_statistics": {}
+        return {
+            "rank": rank,
+            "total_students": len(self.rank_index),
+            "average_score": self.get_student_average(student_id),
+            "percentile": self.rank_index.percentile(student_id)
         }
 
-        # Calculate overall average
-        total_scores = 0
-        total_grades = 0
-        for grades_list in self.grades.values():
-            total_scores += sum(score for _, score in grades_list)
-            total_grades += len(grades_list)
-
-        if total_grades > 0:
-            report["overall_average"] = total_scores / total_grades
-
-        # Course statistics
-        for course_id in self.course_grades:
-            grades = self.get_course_grades(course_id)
-            if grades:
-                avg = self.get_course_average(course_id)
-                top_students = self.get_course_performance(course_id, 3)
-                report["course_statistics"][course_id] = {
-                    "average_score": avg,
-                    "total_grades": len(grades),
-                    "top_students": top_students
+    def get_student_statistics(self):
+        """Get grade count, mean and std deviation for every student"""
+        return self.grade_store.group_statistics("student")
+
+    def get_course_statistics(self):
+        """Get grade count, mean and std deviation for every course"""
+        return self.grade_store.group_statistics("course")
+
+    def get_course_stats(self, course_id):
+        """Get grade count, mean and std deviation for one course, or None if it has no grades
+
+        Reads only that course's rows, where get_course_statistics() scans every grade.
+        """
+        return self.grade_store.statistics(course_id)
+
+    def get_grade_distribution(self, bins=10, course_id=None):
+        """Get a histogram of scores, overall or for one course"""
+        counts, edges = self.grade_store.histogram(bins, (0, 100), course_id)
+        return [
+            {"range": (edges[i], edges[i + 1]), "count": count}
+            for i, count in enumerate(counts)
+        ]
+
+    def get_score_percentiles(self, percents=(25, 50, 75, 90), course_id=None):
+        """Get score percentiles, overall or for one course"""
+        return self.grade_store.percentiles(percents, course_id)
+
+    @timed()
+    def generate_performance_report(self):
+        """Generate comprehensive performance report
+
+        The report is materialized: only course sections and the top performers
+        list touched by grades added since the last call are recomputed.
+        """
+        for course_id in self.dirty_courses:
+            totals = self.course_totals.get(course_id)
+            if totals:
+                self.report_course_sections[course_id] = {
+                    "average_score": self.get_course_average(course_id),
+                    "total_grades": totals[1],
+                    "top_students": self.get_course_performance(course_id, REPORT_TOP_STUDENTS)
                 }
+            else:
+                self.report_course_sections.pop(course_id, None)
+        self.dirty_courses.clear()
+
+        if self.top_performers_dirty:
+            self.report_top_performers = self.get_top_performers(REPORT_TOP_PERFORMERS)
+            self.top_performers_dirty = False
 
-        return report
+        return {
+            "total_students_with_grades": len(self.grades),
+            "total_courses_with_grades": len(self.course_grades),
+            "overall_average": self.get_overall_average(),
+            "top_performers": [dict(performer, grades=list(performer["grades"]))
+                               for performer in self.report_top_performers],
+            "course_statistics": dict(self.report_course_sections)
+        }
 
     def __str__(self):
         return f"AnalyticsEngine({len(self.grades)} students with grades, {len(self.course_grades)} courses with grades)"
@@ -0,0 +1,240 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from .container import MUTATIONS, SERVICE_FACTORIES
+from .commands import COMMAND_SERVICES, BLOCKING_COMMANDS, run_command
+from .cascades import cascade_services
+from utils.metrics import metrics
+
+# Mutations that read or write files of their own; like BLOCKING_COMMANDS they run in the executor
+BLOCKING_MUTATIONS = {("fee_tracker", "archive_transactions")}
+
+
+class AsyncServiceProxy:
+    """Async versions of one service's public methods, e.g.
+
+        await facade.course_scheduler.enroll_student("CS101", "S001")
+
+    Queries run directly on the event loop against in-memory data; mutations
+    are applied in memory and resolve once a flush covering them has been
+    written to disk by the facade's executor. Mutations with file I/O of
+    their own (BLOCKING_MUTATIONS) run in the executor.
+    """
+
+    def __init__(self, facade, name):
+        self._facade = facade
+        self._name = name
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        service_class = SERVICE_FACTORIES[self._name][0]
+        if not callable(getattr(service_class, method, None)):
+            raise AttributeError(f"{service_class.__name__} has no method '{method}'")
+
+        async def call(*args, **kwargs):
+            if method in MUTATIONS[self._name]:
+                return await self._facade.mutate(self._name, method, *args, **kwargs)
+            return await self._facade.query(self._name, method, *args, **kwargs)
+
+        call.__name__ = method
+        return call
+
+
+class AsyncServiceFacade:
+    """asyncio front end over a ServiceContainer that never blocks the event loop on disk
+
+    Loading a service and writing its data file run in a thread pool. Saves
+    are group-committed: mutations made while a flush is pending share that
+    flush, so N concurrent writes to a service cost one file write, not N.
+    The container's saves stay deferred while the facade is open; its dirty
+    services are what the facade flushes. Operations with file I/O of their
+    own run in the executor with every service locked and queries held
+    back, so the loop never touches the container while another thread
+    changes it.
+    Use as ``async with AsyncServiceFacade(container) as facade: ...``.
+    """
+
+    def __init__(self, container, executor=None, flush_delay=0.0):
+        self.container = container
+        self.executor = executor or ThreadPoolExecutor(max_workers=len(SERVICE_FACTORIES),
+                                                       thread_name_prefix="sms-flush")
+        self._owns_executor = executor is None
+        # Seconds a flush waits to gather more writes; 0 still coalesces everything
+        # submitted in the same event loop iteration
+        self.flush_delay = flush_delay
+        self._locks = {}  # name -> asyncio.Lock held while mutating or writing a service
+        self._deferred = ExitStack()
+        self._deferred.enter_context(container._saves_deferred())
+        self._pending = {}  # name -> future resolved by the next flush of that service
+        self._tasks = set()
+        self._loading = {}  # name -> future of a load in progress
+        self._blocking = None  # future resolved when the running blocking operation finishes
+        self.flushes = {name: 0 for name in SERVICE_FACTORIES}
+        for name in SERVICE_FACTORIES:
+            setattr(self, name, AsyncServiceProxy(self, name))
+
+    def _lock(self, name):
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = self._locks[name] = asyncio.Lock()
+        return lock
+
+    @property
+    def _dirty(self):
+        """Services changed in memory but not yet written (the container's set; it is
+        replaced when a transaction rolls back, so never keep a reference)"""
+        return self.container._dirty
+
+    async def _service(self, name):
+        """Get a service, loading it in the executor if needed (internal method)"""
+        if not self.container.is_loaded(name):
+            # Concurrent callers share one load, so they all resume together
+            loading = self._loading.get(name)
+            if loading is None:
+                loop = asyncio.get_running_loop()
+                loading = self._loading[name] = loop.run_in_executor(
+                    self.executor, self.container.get_service, name)
+                loading.add_done_callback(lambda _: self._loading.pop(name, None))
+            await loading
+        return self.container.get_service(name)
+
+    async def query(self, name, method, *args, **kwargs):
+        """Run a read-only service method against in-memory data
+
+        A method missing from MUTATIONS that saves anyway is still flushed
+        before the call returns.
+        """
+        while self._blocking is not None:
+            await asyncio.shield(self._blocking)
+        service = await self._service(name)
+        result = getattr(service, method)(*args, **kwargs)
+        if self._dirty:
+            await self._flush_changes(sorted(self._dirty))
+        return result
+
+    async def mutate(self, name, method, *args, **kwargs):
+        """Run a service mutation and wait until it and its cascades are on disk"""
+        if (name, method) in BLOCKING_MUTATIONS:
+            return await self._run_blocking(
+                lambda: getattr(self.container.get_service(name), method)(*args, **kwargs))
+        names = sorted(cascade_services([name]))
+        await self._acquire(names)
+        try:
+            result = getattr(self.container.get_service(name), method)(*args, **kwargs)
+        finally:
+            self._release(names)
+        await self._flush_changes(names)
+        return result
+
+    async def _acquire(self, names):
+        """Load services and take their locks in sorted order, so operations
+        spanning services can't deadlock (internal method)"""
+        for name in names:
+            await self._service(name)
+        for name in names:
+            await self._lock(name).acquire()
+
+    def _release(self, names):
+        """Release locks taken by _acquire (internal method)"""
+        for name in reversed(names):
+            self._lock(name).release()
+
+    async def call(self, op, **params):
+        """Run a batch-runner command (see services.commands) and wait until it is on disk"""
+        if op not in COMMAND_SERVICES:
+            raise ValueError(f"Unknown command '{op}'")
+        if op in BLOCKING_COMMANDS:
+            return await self._run_blocking(lambda: run_command(self.container, op, **params))
+        names = sorted(cascade_services(COMMAND_SERVICES[op]))
+        await self._acquire(names)
+        try:
+            result = run_command(self.container, op, **params)
+        finally:
+            self._release(names)
+        await self._flush_changes(names)
+        return result
+
+    async def _run_blocking(self, function):
+        """Run an operation in the executor, then wait until its changes are on disk (internal method)
+
+        Every service lock is held and queries wait meanwhile, so nothing on
+        the loop reads or changes the container while the executor thread
+        does. The services the operation loads are loaded there as well.
+        """
+        names = sorted(SERVICE_FACTORIES)
+        for name in names:
+            await self._lock(name).acquire()
+        self._blocking = asyncio.get_running_loop().create_future()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, function)
+        finally:
+            self._blocking.set_result(None)
+            self._blocking = None
+            self._release(names)
+        await self._flush_changes(sorted(self._dirty))
+        return result
+
+    async def _flush_changes(self, names):
+        """Wait for flushes covering the changes just made to these services (internal method)"""
+        waits = []
+        for name in names:
+            if name not in self._dirty:
+                continue
+            self._dirty.discard(name)
+            future = self._pending.get(name)
+            if future is None:
+                future = self._pending[name] = asyncio.get_running_loop().create_future()
+                task = asyncio.ensure_future(self._flush(name, future))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            waits.append(future)
+        if waits:
+            await asyncio.gather(*waits)
+
+    async def _flush(self, name, future):
+        """Write one service's data file in the executor (internal method)"""
+        await asyncio.sleep(self.flush_delay)
+        async with self._lock(name):
+            # Writes made from here on need a new flush
+            self._pending.pop(name, None)
+            service = self.container.get_service(name)
+            loop = asyncio.get_running_loop()
+            try:
+                # Call the class method: the instance carries the deferred stub
+                saved = await loop.run_in_executor(self.executor, type(service)._save_data, service)
+            except Exception as e:
+                saved = e
+        self.flushes[name] += 1
+        if metrics.enabled:
+            metrics.counter(f"async_facade.flushes.{name}").inc()
+        if saved is True:
+            future.set_result(True)
+        else:
+            # Changes stay in memory; mark dirty so the next write retries the save
+            self._dirty.add(name)
+            error = saved if isinstance(saved, Exception) else None
+            future.set_exception(Exception(f"Failed to save {name} data" + (f": {error}" if error else "")))
+
+    async def drain(self):
+        """Wait for every pending flush"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def aclose(self):
+        """Finish pending flushes, write any changes still unflushed and restore the services' own saves"""
+        await self.drain()
+        try:
+            if self._dirty:
+                await self._flush_changes(sorted(self._dirty))
+                await self.drain()
+        finally:
+            self._deferred.close()
+            if self._owns_executor:
+                self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
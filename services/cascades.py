@@ -0,0 +1,85 @@
+"""
+Cross-service cascades driven by the services' change events.
+
+The services don't know about each other; a ServiceContainer subscribes
+Cascades to its EventBus so that a change saved by one service is carried
+into the data the others derive from it:
+
+- student_removed: the student is withdrawn from every course and waitlist
+  (promoting waitlisted students), their loans are returned and their
+  grades are removed from analytics. Payment history is kept.
+- enrolled / dropped: Student.courses follows enrollments, including
+  students promoted from a waitlist
+- payment_added: Student.fees_paid follows the fee tracker
+
+Cascades are batched subscribers: each batch of events costs one save per
+affected service, e.g. a script of 500 enrollments run inside
+deferred_saves() updates the student registry once.
+
+The container runs each mutation as a transaction, and the cascades are
+delivered before it commits: if a cascade fails, the change that triggered
+it is undone along with it and neither is saved.
+"""
+
+# Service whose events trigger cascades -> services the cascades change
+CASCADE_TARGETS = {
+    "student_registry": {"course_scheduler", "library_system", "analytics_engine"},
+    "course_scheduler": {"student_registry"},
+    "fee_tracker": {"student_registry"},
+}
+
+CASCADE_EVENTS = ["student_removed", "enrolled", "dropped", "payment_added"]
+
+
+def cascade_services(names):
+    """Get names plus every service a change to them can cascade into"""
+    services = set(names)
+    pending = list(services)
+    while pending:
+        for target in CASCADE_TARGETS.get(pending.pop(), ()):
+            if target not in services:
+                services.add(target)
+                pending.append(target)
+    return services
+
+
+class Cascades:
+    """Applies the cascades for one ServiceContainer's services"""
+
+    def __init__(self, container):
+        self.container = container
+
+    def subscribe(self, events):
+        """Receive the cascading events from an EventBus in batches"""
+        for event in CASCADE_EVENTS:
+            events.subscribe(event, self.apply, batched=True)
+
+    def apply(self, batch):
+        """Carry a batch of (event, payload) changes into the other services"""
+        removed = []
+        course_changes = []  # (student_id, course_id, enrolled)
+        payments = []  # (student_id, amount)
+        for event, payload in batch:
+            if event == "student_removed":
+                removed.append(payload["student_id"])
+            elif event == "enrolled":
+                if payload["status"] == "enrolled":
+                    course_changes.append((payload["student_id"], payload["course_id"], True))
+            elif event == "dropped":
+                course_changes.append((payload["student_id"], payload["course_id"], False))
+                course_changes.extend((student_id, payload["course_id"], True)
+                                      for student_id in payload["promoted"])
+            elif event == "payment_added":
+                payments.append((payload["student_id"], payload["amount"]))
+
+        container = self.container
+        for student_id in removed:
+            # Publishes "dropped" for each course, which the next batch turns into
+            # course list updates for any promoted students
+            container.course_scheduler.withdraw_student(student_id)
+            container.library_system.return_all_books(student_id)
+            container.analytics_engine.remove_student_grades(student_id)
+        if course_changes:
+            container.student_registry.apply_course_changes(course_changes)
+        if payments:
+            container.student_registry.apply_payments(payments)
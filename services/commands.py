@@ -0,0 +1,215 @@
+"""
+Non-interactive service operations for scripts, nightly jobs and benchmarks.
+
+Each command runs directly against a ServiceContainer's services and returns
+a JSON-serializable result. A script is a JSON-lines file with one operation
+per line, e.g.
+
+    {"op": "enroll", "course_id": "CS101", "student_id": "S001"}
+    {"op": "pay", "student_id": "S001", "amount": 45000}
+
+and is run with a single storage flush at the end (see run_script), or
+atomically: all of it or, if any operation fails, none of it.
+"""
+
+import json
+import time
+from .payment_importer import import_payments
+from .exporter import export
+from .transactions import Rollback
+
+
+def _add_student(container, student_id, name, email, year=1):
+    return container.student_registry.add_student(student_id, name, email, year).to_dict()
+
+
+def _remove_student(container, student_id):
+    return container.student_registry.remove_student(student_id).to_dict()
+
+
+def _create_course(container, course_id, name, capacity):
+    return container.course_scheduler.create_course(course_id, name, capacity).to_dict()
+
+
+def _enroll(container, course_id, student_id):
+    return container.course_scheduler.enroll_student(course_id, student_id)
+
+
+def _drop(container, course_id, student_id):
+    return container.course_scheduler.drop_student(course_id, student_id)
+
+
+def _pay(container, student_id, amount, description="Tuition Fee"):
+    # The container's payment_added cascade keeps the student's fees paid in step
+    return container.fee_tracker.add_payment(student_id, amount, description).to_dict()
+
+
+def _add_book(container, isbn, title, author, total_copies):
+    return container.library_system.add_book(isbn, title, author, total_copies).to_dict()
+
+
+def _borrow(container, isbn, student_id):
+    return container.library_system.borrow_book(isbn, student_id)
+
+
+def _return(container, isbn, student_id):
+    return container.library_system.return_book(isbn, student_id)
+
+
+def _grade(container, student_id, course_id, score):
+    container.analytics_engine.add_grade(student_id, course_id, score)
+    return container.analytics_engine.get_student_ranking(student_id)
+
+
+def _import_payments(container, path, reject_file=None, resume_line=None):
+    return import_payments(path, container.fee_tracker, reject_file, container=container,
+                           resume_line=resume_line)
+
+
+def _export(container, export_name, path, required_amount=None, sort_by_amount=False):
+    options = {}
+    if required_amount is not None:
+        options["required_amount"] = required_amount
+    if sort_by_amount:
+        options["sort_by_amount"] = True
+    return export(container, export_name, path, **options)
+
+
+# Command name -> (function, required parameters, optional parameters with defaults)
+COMMANDS = {
+    "add-student": (_add_student, ["student_id", "name", "email"], {"year": 1}),
+    "remove-student": (_remove_student, ["student_id"], {}),
+    "create-course": (_create_course, ["course_id", "name", "capacity"], {}),
+    "enroll": (_enroll, ["course_id", "student_id"], {}),
+    "drop": (_drop, ["course_id", "student_id"], {}),
+    "pay": (_pay, ["student_id", "amount"], {"description": "Tuition Fee"}),
+    "add-book": (_add_book, ["isbn", "title", "author", "total_copies"], {}),
+    "borrow": (_borrow, ["isbn", "student_id"], {}),
+    "return": (_return, ["isbn", "student_id"], {}),
+    "grade": (_grade, ["student_id", "course_id", "score"], {}),
+    "import-payments": (_import_payments, ["path"], {"reject_file": None, "resume_line": None}),
+    "export": (_export, ["export_name", "path"], {"required_amount": None, "sort_by_amount": False}),
+}
+
+# Command name -> services it reads or changes, for callers that lock per service
+COMMAND_SERVICES = {
+    "add-student": ["student_registry"],
+    "remove-student": ["student_registry"],
+    "create-course": ["course_scheduler"],
+    "enroll": ["course_scheduler"],
+    "drop": ["course_scheduler"],
+    "pay": ["fee_tracker", "student_registry"],
+    "add-book": ["library_system"],
+    "borrow": ["library_system"],
+    "return": ["library_system"],
+    "grade": ["analytics_engine"],
+    "import-payments": ["fee_tracker", "student_registry"],
+    "export": ["student_registry", "course_scheduler", "fee_tracker", "library_system", "analytics_engine"],
+}
+
+# Commands that read or write files beyond the services' own saves
+BLOCKING_COMMANDS = {"import-payments", "export"}
+
+# Parameters that arrive as strings (command line, hand-written scripts) and need converting
+PARAMETER_TYPES = {
+    "year": int, "capacity": int, "total_copies": int,
+    "amount": float, "score": float, "required_amount": float, "resume_line": int,
+}
+
+
+def run_command(container, op, **params):
+    """Run one command; returns its result or raises on failure"""
+    if op not in COMMANDS:
+        raise ValueError(f"Unknown command '{op}'")
+    func, required, optional = COMMANDS[op]
+    missing = [name for name in required if params.get(name) in (None, "")]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+    unknown = set(params) - set(required) - set(optional)
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) {', '.join(sorted(unknown))}")
+
+    for name, convert in PARAMETER_TYPES.items():
+        if isinstance(params.get(name), str):
+            params[name] = convert(params[name])
+    return func(container, **params)
+
+
+def timed_command(container, op, params, line=None, profiler=None):
+    """Run one command, returning an outcome dict with its timing instead of raising
+
+    With a profiler (utils.profiling.ActionProfiler) the command is profiled
+    as one action.
+    """
+    started = time.perf_counter()
+    outcome = {"line": line, "op": op}
+    try:
+        if profiler:
+            action = f"{op} line {line}" if line else op
+            outcome["result"] = profiler.profile(action, lambda: run_command(container, op, **params))
+        else:
+            outcome["result"] = run_command(container, op, **params)
+        outcome["ok"] = True
+    except Exception as e:
+        outcome["error"] = str(e)
+        outcome["ok"] = False
+    outcome["ms"] = (time.perf_counter() - started) * 1000
+    return outcome
+
+
+def read_script(path):
+    """Yield (line number, op, params) from a JSON-lines script"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                params = json.loads(line)
+                op = params.pop("op")
+            except (ValueError, KeyError, AttributeError) as e:
+                yield line_number, None, {"error": f"Malformed operation: {e}"}
+                continue
+            yield line_number, op, params
+
+
+def run_script(container, path, on_outcome=None, atomic=False, profiler=None):
+    """Run every operation in a JSON-lines script with one storage flush at the end
+
+    on_outcome, if given, is called with each command's outcome dict as it
+    completes. With atomic=True the script runs as one transaction: it stops
+    at the first failed operation and every change it made is undone. With
+    a profiler each operation is profiled as its own action.
+    Returns a summary of succeeded/failed counts and timings.
+    """
+    started = time.perf_counter()
+    succeeded = failed = 0
+    rolled_back = False
+    with container.transaction() if atomic else container.deferred_saves():
+        for line_number, op, params in read_script(path):
+            if op is None:
+                outcome = {"line": line_number, "op": None, "ok": False, "error": params["error"], "ms": 0.0}
+            else:
+                outcome = timed_command(container, op, params, line_number, profiler)
+            if outcome["ok"]:
+                succeeded += 1
+            else:
+                failed += 1
+            if on_outcome:
+                on_outcome(outcome)
+            if atomic and not outcome["ok"]:
+                rolled_back = True
+                break
+        commands_done = time.perf_counter()
+        if rolled_back:
+            raise Rollback()
+
+    return {
+        "succeeded": succeeded,
+        "failed": failed,
+        "rolled_back": rolled_back,
+        "flushed": container.last_flush,
+        "command_seconds": commands_done - started,
+        "flush_seconds": time.perf_counter() - commands_done,
+        "seconds": time.perf_counter() - started
+    }
@@ -0,0 +1,540 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from .student_registry import StudentRegistry
+from .course_scheduler import CourseScheduler
+from .fee_tracker import FeeTracker
+from .library_system import LibrarySystem
+from .analytics_engine import AnalyticsEngine
+from .parallel_loader import load_files
+from .cascades import Cascades
+from .transactions import COMMIT_FILE, Rollback, SaveError, UndoJournal, commit_files, recover_commit
+from utils.events import ANY_EVENT, EventBus
+from utils.file_lock import FileLock
+from utils.helpers import atomic_open, load_from_json
+from utils.metrics import metrics
+
+# Service attribute name -> (service class, data file name inside the data directory)
+SERVICE_FACTORIES = {
+    "student_registry": (StudentRegistry, "students.json"),
+    "course_scheduler": (CourseScheduler, "courses.json"),
+    "fee_tracker": (FeeTracker, "transactions.json"),
+    "library_system": (LibrarySystem, "books.json"),
+    "analytics_engine": (AnalyticsEngine, "grades.json"),
+}
+
+# Service name -> optional read-only record archive inside the data directory
+ARCHIVE_FILES = {
+    "fee_tracker": "transactions.rec",
+    "library_system": "books.rec",
+}
+
+# Service name -> methods that change its data; each runs as (or joins) a transaction with its cascades
+MUTATIONS = {
+    "student_registry": ["add_student", "remove_student", "update_student_email",
+                         "apply_course_changes", "apply_payments"],
+    "course_scheduler": ["create_course", "enroll_student", "drop_student", "withdraw_student"],
+    "fee_tracker": ["add_payment", "add_payments", "archive_transactions"],
+    "library_system": ["add_book", "borrow_book", "return_book", "return_all_books"],
+    "analytics_engine": ["add_grade", "remove_student_grades"],
+}
+
+LOCK_FILE = ".lock"
+# Per-service save counters, bumped by shared-mode writers so readers notice every save
+GENERATION_FILE = ".generations.json"
+
+
+def _file_stamp(path):
+    """Identify one version of a file: saves replace the file, so inode, mtime and size change"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class LazyService:
+    """Descriptor that constructs a container's service on first access"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, container, owner=None):
+        if container is None:
+            return self
+        return container.get_service(self.name)
+
+
+class ServiceContainer:
+    """Holds the five services for one data directory, loading each lazily.
+
+    A service (and its data file) is only loaded the first time it is used,
+    so startup cost is independent of dataset size and a command touching
+    one subsystem only pays for that subsystem. preload() can warm services
+    in background threads. Services publish change events on the container's
+    EventBus, which carries cascades between services (see services.cascades)
+    and invalidates the optional QueryCache of read-heavy queries.
+    transaction() makes a group of changes across services atomic; a single
+    mutation called outside one runs as its own transaction, so a cascade
+    that fails undoes the change that triggered it.
+
+    With shared=True several processes can use one data directory: every
+    mutation runs under an advisory lock on the directory, after reloading
+    any service another process has saved since it was loaded, so no
+    process overwrites changes it hasn't seen. refresh() does the same
+    reload for readers; it stats the loaded files and reloads only the
+    services whose files changed.
+    """
+
+    student_registry = LazyService("student_registry")
+    course_scheduler = LazyService("course_scheduler")
+    fee_tracker = LazyService("fee_tracker")
+    library_system = LazyService("library_system")
+    analytics_engine = LazyService("analytics_engine")
+
+    def __init__(self, data_dir="data", storage_format="json", query_cache=None, cascades=True,
+                 shared=False):
+        self.data_dir = data_dir
+        # "json" or "binary", for every service or per service name
+        self.storage_format = storage_format
+        self._services = {}  # name -> loaded service
+        self._service_locks = {name: threading.Lock() for name in SERVICE_FACTORIES}
+        self._preload_threads = []
+        self._deferring = 0  # nesting depth of deferred_saves() blocks
+        self._dirty = set()  # services saved while deferring, flushed on exit
+        self.last_flush = {}  # {name: saved} from the most recent deferred block
+        self.shared = shared
+        self.file_lock = FileLock(os.path.join(data_dir, LOCK_FILE))
+        self._stamps = {}  # name -> (generation, file stamps) the loaded service reflects
+        self._touched = set()  # services mutated while holding the lock
+        self._journal = None  # UndoJournal of the open transaction
+        # Held by the thread in a transaction or deferred block; other threads' changes wait for it
+        self.write_lock = threading.RLock()
+        if os.path.exists(os.path.join(data_dir, COMMIT_FILE)):
+            with self.file_lock:
+                recover_commit(data_dir)
+        self.events = EventBus()
+        if cascades:
+            Cascades(self).subscribe(self.events)
+        self.query_cache = query_cache
+        if query_cache:
+            query_cache.subscribe(self.events)
+
+    def data_file(self, name):
+        """Get the data file path for a service, using its configured storage format"""
+        filename = SERVICE_FACTORIES[name][1]
+        storage_format = self.storage_format
+        if isinstance(storage_format, dict):
+            storage_format = storage_format.get(name, "json")
+        if storage_format == "binary":
+            filename = os.path.splitext(filename)[0] + ".bin"
+        elif storage_format != "json":
+            raise ValueError(f"Unknown storage format '{storage_format}'")
+        return os.path.join(self.data_dir, filename)
+
+    def _service_options(self, name):
+        """Extra constructor arguments for a service, e.g. its record archive (internal method)"""
+        archive = ARCHIVE_FILES.get(name)
+        if archive and os.path.exists(os.path.join(self.data_dir, archive)):
+            return {"archive_file": os.path.join(self.data_dir, archive)}
+        return {}
+
+    def _create_service(self, name):
+        """Construct a service on its data file (internal method)"""
+        service_class, _ = SERVICE_FACTORIES[name]
+        if not metrics.enabled:
+            return service_class(self.data_file(name), **self._service_options(name))
+        with metrics.timer(f"ServiceContainer.load.{name}").time():
+            return service_class(self.data_file(name), **self._service_options(name))
+
+    def get_service(self, name):
+        """Get a service, loading it on first access"""
+        service = self._services.get(name)
+        if service is None:
+            if name not in SERVICE_FACTORIES:
+                raise ValueError(f"Unknown service '{name}'")
+            # Per-service lock: concurrent first accesses load the data only once
+            with self._service_locks[name]:
+                service = self._services.get(name)
+                if service is None:
+                    self._stamps[name] = self._stamp(name)
+                    service = self._create_service(name)
+                    self._register(name, service)
+        return service
+
+    def _register(self, name, service):
+        """Store a loaded service, attaching the event bus and query cache and
+        deferring its saves if a deferred block is open (internal method)"""
+        service.events = self.events
+        service.undo_journal = self._journal
+        if self.query_cache:
+            self.query_cache.attach(name, service)
+        self._guard(name, service)
+        if self._deferring:
+            self._defer(name, service)
+        self._services[name] = service
+
+    def _defer(self, name, service):
+        """Replace a service's save with one that just marks it dirty (internal method)"""
+        def deferred_save():
+            self._dirty.add(name)
+            return True
+        service._save_data = deferred_save
+
+    @contextmanager
+    def deferred_saves(self):
+        """Batch storage writes: saves inside the block are recorded, then
+        written once per changed service when the block exits
+
+        Operations that complete inside the block are flushed even if a later
+        one raises, since their in-memory changes have already been applied.
+        Cascades from the block's events are applied together at its end,
+        before the flush.
+
+        Other threads' changes wait until the block has been flushed. In
+        shared mode the data directory stays locked until then too.
+        """
+        with self.write_lock, self.exclusive() if self.shared else nullcontext():
+            try:
+                with self._saves_deferred():
+                    with self.events.batch():
+                        yield self
+                    self._deliver_cascades()
+            finally:
+                if not self._deferring:
+                    self.last_flush = self.flush()
+
+    @contextmanager
+    def _saves_deferred(self):
+        """Defer the services' saves for the block, leaving them dirty at exit (internal method)"""
+        if not self._deferring:
+            for name, service in self._services.items():
+                self._defer(name, service)
+        self._deferring += 1
+        try:
+            yield
+        finally:
+            self._deferring -= 1
+            if not self._deferring:
+                for service in self._services.values():
+                    service.__dict__.pop('_save_data', None)
+
+    @contextmanager
+    def transaction(self):
+        """Apply the block's changes across services, and their cascades, atomically
+
+        Saves are deferred and every change records its undo steps in one
+        journal. When the block exits the changed services are written in a
+        single commit: either every file changes or none does. If the block
+        raises or the commit fails, the journal is undone, restoring every
+        service's in-memory state, and the exception propagates (raise
+        Rollback to undo the block quietly). Subscribers are then sent a
+        rolled_back event listing the events of the undone changes, or after
+        a successful commit a committed event listing the events it covers.
+
+        The journal covers the whole container, so one thread's transaction
+        holds write_lock until it commits or is undone: changes from other
+        threads wait rather than join it. A nested transaction() in the same
+        thread joins the outer one. Inside deferred_saves() the changes are
+        still undone on failure, but writing them is left to the outer
+        block's flush.
+        """
+        with self.write_lock:
+            if self._journal is None:
+                with self._transaction():
+                    yield self
+            else:
+                yield self
+
+    @contextmanager
+    def _transaction(self):
+        """Run the outermost transaction, write_lock held (internal method)"""
+        with self.exclusive() if self.shared else nullcontext():
+            journal = self._journal = UndoJournal()
+            for service in self._services.values():
+                service.undo_journal = journal
+            published = []
+            record = lambda event, payload: published.append((event, payload))
+            self.events.subscribe(ANY_EVENT, record)
+            dirty = set(self._dirty)
+            undone = False
+            try:
+                with self._saves_deferred():
+                    with self.events.batch():
+                        yield self
+                    self._deliver_cascades()
+                if not self._deferring:
+                    self._commit()
+            except BaseException as e:
+                journal.rollback()
+                self._dirty = dirty
+                undone = True
+                if not isinstance(e, Rollback):
+                    raise
+            finally:
+                self.events.unsubscribe(ANY_EVENT, record)
+                self._journal = None
+                for service in self._services.values():
+                    service.undo_journal = None
+                if undone:
+                    self.last_flush = {}
+                    if metrics.enabled:
+                        metrics.counter("transactions.rolled_back").inc()
+                    if published:
+                        self.events.publish("rolled_back", events=published)
+                elif published:
+                    self.events.publish("committed", events=published)
+
+    def _deliver_cascades(self):
+        """Apply the outermost block's cascades while its thread still holds
+        write_lock, even if the event bus has a background dispatcher (internal method)
+        """
+        if self._deferring == 1:
+            self.events.deliver_pending()
+
+    def _commit(self):
+        """Write every service changed in a transaction as one commit (internal method)"""
+        names = sorted(self._dirty)
+        self.last_flush = {}
+        if not names:
+            return
+        services = [self._services[name] for name in names]
+        with self.file_lock:
+            if len(services) == 1:
+                committed = type(services[0])._save_data(services[0])
+            else:
+                committed = commit_files(self.data_dir, {
+                    service.data_file: (lambda path, service=service: self._save_as(service, path))
+                    for service in services})
+        if not committed:
+            raise SaveError(f"Failed to commit changes to {', '.join(names)}")
+        self._dirty = set()
+        self.last_flush = {name: True for name in names}
+        if metrics.enabled:
+            metrics.counter("transactions.committed").inc()
+
+    @staticmethod
+    def _save_as(service, path):
+        """Save a service's data to another file (internal method)"""
+        data_file = service.data_file
+        service.data_file = path
+        try:
+            return type(service)._save_data(service)
+        finally:
+            service.data_file = data_file
+
+    @property
+    def in_transaction(self):
+        """Whether a transaction() block is open"""
+        return self._journal is not None
+
+    def flush(self):
+        """Write every service changed inside deferred_saves(); returns {name: saved}
+
+        Not allowed inside a transaction, whose changes may still be undone:
+        they are written when it commits. Another thread's transaction is
+        waited for.
+        """
+        with self.write_lock:
+            if self.in_transaction:
+                raise RuntimeError("Can't flush while a transaction is open")
+            results = {}
+            for name in sorted(self._dirty):
+                service = self._services[name]
+                # Call the class method: the instance may still carry the deferred stub
+                results[name] = type(service)._save_data(service)
+            self._dirty = {name for name, saved in results.items() if not saved}
+            return results
+
+    def _generations(self):
+        """Read the per-service save generations (internal method)"""
+        return load_from_json(os.path.join(self.data_dir, GENERATION_FILE)) or {}
+
+    def _stamp(self, name, generations=None):
+        """Get a service's generation and the stamps of its data and archive files (internal method)"""
+        if generations is None:
+            generations = self._generations()
+        archive = ARCHIVE_FILES.get(name)
+        return (generations.get(name, 0), _file_stamp(self.data_file(name)),
+                _file_stamp(os.path.join(self.data_dir, archive)) if archive else None)
+
+    def _guard(self, name, service):
+        """Wrap a service's mutations to run as transactions (internal method)
+
+        The call goes to whichever instance is current once the transaction
+        has started, since in shared mode taking the lock can reload the
+        service.
+        """
+        for method in MUTATIONS.get(name, ()):
+            setattr(service, method, self._guarded(name, getattr(type(service), method)))
+
+    def _guarded(self, name, function):
+        """Build the transactional version of one mutation (internal method)
+
+        Its cascades are delivered before the transaction commits, so the
+        change and everything it cascades into are saved, or undone, together.
+        """
+        @wraps(function)
+        def guarded(*args, **kwargs):
+            with self.transaction():
+                if self.shared:
+                    self._touched.add(name)
+                return function(self.get_service(name), *args, **kwargs)
+        return guarded
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the data directory's cross-process lock for the block
+
+        Entering the outermost block reloads services other processes have
+        changed, so the block works on the latest data. Nested blocks share
+        the lock; other threads of this process wait for it. write_lock is
+        taken first, so the two locks are always acquired in the same order.
+        """
+        with self.write_lock:
+            outermost = self.file_lock.acquire()
+            try:
+                if outermost:
+                    self.refresh()
+                yield self
+            finally:
+                if self.file_lock.depth == 1:
+                    self._publish_changes()
+                self.file_lock.release()
+
+    def _publish_changes(self):
+        """Bump the generation of every service saved while locked, and record
+        the new stamps as this process's own (internal method, lock held)
+
+        File stamps alone can miss a save: timestamps are coarse and a
+        replaced file's inode can be reused, so the generation is what
+        readers rely on.
+        """
+        generations = self._generations()
+        changed = set(self._touched)
+        self._touched = set()
+        for name in self.loaded_services():
+            if self._stamp(name, generations)[1:] != self._stamps.get(name, (None,))[1:]:
+                changed.add(name)
+        if changed:
+            for name in changed:
+                generations[name] = generations.get(name, 0) + 1
+            with atomic_open(os.path.join(self.data_dir, GENERATION_FILE), 'w', encoding='utf-8') as f:
+                json.dump(generations, f)
+        for name in self.loaded_services():
+            self._stamps[name] = self._stamp(name, generations)
+
+    def changed_services(self):
+        """Get the loaded services whose files were saved since they were loaded"""
+        generations = self._generations()
+        return [name for name in self.loaded_services() if self._stamp(name, generations) != self._stamps.get(name)]
+
+    def refresh(self):
+        """Unload services whose files another process has saved; returns their names
+
+        They reload from the new files on next access. Services with a
+        pending deferred flush are kept.
+        """
+        changed = [name for name in self.changed_services() if name not in self._dirty]
+        for name in changed:
+            self.unload(name)
+        if changed and metrics.enabled:
+            metrics.counter("ServiceContainer.reloads").inc(len(changed))
+        return changed
+
+    def unload(self, name):
+        """Drop a loaded service (and its cached query results) so it reloads on next access"""
+        service = self._services.pop(name, None)
+        if service is None:
+            return
+        if getattr(service, "archive", None):
+            service.archive.close()
+        if self.query_cache:
+            self.query_cache.forget(name)
+
+    def is_loaded(self, name):
+        """Check whether a service has been loaded"""
+        return name in self._services
+
+    def loaded_services(self):
+        """Get the names of services loaded so far"""
+        return [name for name in SERVICE_FACTORIES if name in self._services]
+
+    def preload(self, names=None, background=True):
+        """Load services ahead of use, in parallel background threads by default"""
+        names = list(names or SERVICE_FACTORIES)
+        if not background:
+            for name in names:
+                self.get_service(name)
+            return []
+
+        threads = []
+        for name in names:
+            if self.is_loaded(name):
+                continue
+            thread = threading.Thread(target=self.get_service, args=(name,),
+                                      name=f"preload-{name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        self._preload_threads.extend(threads)
+        return threads
+
+    def load_parallel(self, names=None, max_workers=None, use_processes=True):
+        """Load services by parsing their data files concurrently in a worker pool
+
+        Returns per-file timings from the parallel loader, plus the time
+        spent populating each service; wall_seconds covers the whole load.
+        """
+        started = time.perf_counter()
+        names = [name for name in (names or SERVICE_FACTORIES) if not self.is_loaded(name)]
+        generations = self._generations()
+        stamps = {name: self._stamp(name, generations) for name in names}
+        results, timings = load_files({name: self.data_file(name) for name in names},
+                                      max_workers=max_workers, use_processes=use_processes)
+
+        for name in names:
+            objects, errors = results[name]
+            for error in errors:
+                print(error)
+            service_class, _ = SERVICE_FACTORIES[name]
+            populate_started = time.perf_counter()
+            service = service_class(self.data_file(name), autoload=False, **self._service_options(name))
+            if objects:
+                service._populate(objects)
+            timing = timings[name]
+            timing["populate_seconds"] = time.perf_counter() - populate_started
+            timing["total_seconds"] += timing["populate_seconds"]
+            with self._service_locks[name]:
+                if name not in self._services:
+                    self._stamps[name] = stamps[name]
+                    self._register(name, service)
+        timings["wall_seconds"] = time.perf_counter() - started
+        return timings
+
+    def wait_for_preload(self, timeout=None):
+        """Block until background preloading finishes"""
+        for thread in self._preload_threads:
+            thread.join(timeout)
+        self._preload_threads = [t for t in self._preload_threads if t.is_alive()]
+
+    def close(self):
+        """Unload every service, releasing archive memory maps
+
+        Changes are already on disk (each operation saves), apart from any
+        pending flush of a deferred block, which is written first. The
+        container can be used again afterwards and reloads on first access.
+        """
+        self.wait_for_preload()
+        if self._dirty:
+            self.flush()
+        for service in self._services.values():
+            if getattr(service, "archive", None):
+                service.archive.close()
+        self._services = {}
+
+    def __str__(self):
+        loaded =', '.join(self.loaded_services()) or 'none'
+        return f"ServiceContainer({self.data_dir}, loaded: {loaded})"
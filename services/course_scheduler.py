@@ -1,17 +1,24 @@
 import os
+from collections import deque
 from models.course import Course
-from utils.helpers import save_to_json, load_from_json
+from utils.helpers import save_data, load_data
 from utils.validators import validate_course_id
+from utils.metrics import timed
+from .transactions import change
 
 class CourseScheduler:
-    def __init__(self, data_file="data/courses.json"):
+    def __init__(self, data_file="data/courses.json", autoload=True):
         self.courses = {}  # course_id -> Course object
         self.data_file = data_file
-        self._load_data()
+        self.events = None  # EventBus notified of saved changes, attached by ServiceContainer
+        self.undo_journal = None  # UndoJournal of an open transaction, attached by ServiceContainer
+        if autoload:
+            self._load_data()
 
+    @timed()
     def _load_data(self):
-        """Load course data from JSON file"""
-        data = load_from_json(self.data_file)
+        """Load course data from storage"""
+        data = load_data(self.data_file)
         if data:
             for course_data in data.values():
                 try:
@@ -21,13 +28,26 @@ class CourseScheduler:
                     print(f"Error loading course {course_data.get('course_id')}: {e}")
             print(f"✓ Loaded {len(self.courses)} courses from storage")
 
+    def _populate(self, courses):
+        """Add already-validated Course objects (used by the parallel loader)"""
+        for course in courses:
+            self.courses[course.course_id] = course
+        print(f"✓ Loaded {len(self.courses)} courses from storage")
+
+    @timed()
     def _save_data(self):
-        """Save course data to JSON file"""
+        """Save course data to storage"""
         data = {cid: course.to_dict() for cid, course in self.courses.items()}
-        if save_to_json(data, self.data_file):
+        if save_data(data, self.data_file):
             return True
         return False
 
+    def _emit(self, event, **payload):
+        """Publish a change event if an event bus is attached"""
+        if self.events:
+            self.events.publish(event, **payload)
+
+    @timed()
     def create_course(self, course_id, name, capacity):
         """Create a new course"""
         try:
@@ -38,17 +58,17 @@ class CourseScheduler:
                 raise ValueError(f"Course {course_id} already exists")
 
             course = Course(course_id, name, capacity)
-            self.courses[course_id] = course
+            with change(self, "Failed to save course data") as undo:
+                self.courses[course_id] = course
+                undo(self.courses.pop, course_id)
 
-            if self._save_data():
-                return course
-            else:
-                del self.courses[course_id]
-                raise Exception("Failed to save course data")
+            self._emit("course_created", course_id=course_id)
+            return course
 
         except Exception as e:
             raise Exception(f"Failed to create course: {e}")
 
+    @timed()
     def enroll_student(self, course_id, student_id):
         """Enroll student in course with waitlist handling"""
         try:
@@ -63,27 +83,24 @@ class CourseScheduler:
 
             # Check capacity
             if not course.is_full():
-                course.enroll_student(student_id)
-                if self._save_data():
-                    return {"status": "enrolled", "position": 0}
-                else:
-                    # Rollback enrollment
-                    course.enrolled_students.remove(student_id)
-                    raise Exception("Failed to save enrollment data")
+                with change(self, "Failed to save enrollment data") as undo:
+                    course.enroll_student(student_id)
+                    undo(course.enrolled_students.remove, student_id)
+                self._emit("enrolled", course_id=course_id, student_id=student_id, status="enrolled")
+                return {"status": "enrolled", "position": 0}
             else:
                 # Add to waitlist
-                position = course.add_to_waitlist(student_id)
-                if self._save_data():
-                    return {"status": "waitlisted", "position": position}
-                else:
-                    # Rollback waitlist addition
-                    if student_id in course.waitlist:
-                        course.waitlist.remove(student_id)
-                    raise Exception("Failed to save waitlist data")
+                with change(self, "Failed to save waitlist data") as undo:
+                    position = course.add_to_waitlist(student_id)
+                    if position > 0:
+                        undo(course.waitlist.remove, student_id)
+                self._emit("enrolled", course_id=course_id, student_id=student_id, status="waitlisted")
+                return {"status": "waitlisted", "position": position}
 
         except Exception as e:
             raise Exception(f"Failed to enroll student: {e}")
 
+    @timed()
     def drop_student(self, course_id, student_id):
         """Drop student from course and process waitlist"""
         try:
@@ -99,26 +116,57 @@ class CourseScheduler:
 
             result = {"status": "dropped"}
 
-            if enrolled:
-                course.enrolled_students.remove(student_id)
-                result["was_enrolled"] = True
+            with change(self, "Failed to save data after drop") as undo:
+                undo(self._restore_course, course, list(course.enrolled_students), list(course.waitlist))
+                if enrolled:
+                    course.enrolled_students.remove(student_id)
+                    result["was_enrolled"] = True
 
-                # Process waitlist if there was a vacancy
-                newly_enrolled = self._process_waitlist(course_id)
-                result["newly_enrolled"] = newly_enrolled
+                    # Process waitlist if there was a vacancy
+                    newly_enrolled = self._process_waitlist(course_id)
+                    result["newly_enrolled"] = newly_enrolled
 
-            elif waitlisted:
-                course.waitlist.remove(student_id)
-                result["was_waitlisted"] = True
+                elif waitlisted:
+                    course.waitlist.remove(student_id)
+                    result["was_waitlisted"] = True
 
-            if self._save_data():
-                return result
-            else:
-                raise Exception("Failed to save data after drop")
+            self._emit("dropped", course_id=course_id, student_id=student_id,
+                       promoted=list(result.get("newly_enrolled") or []))
+            return result
 
         except Exception as e:
             raise Exception(f"Failed to drop student: {e}")
 
+    @timed()
+    def withdraw_student(self, student_id):
+        """Drop a student from every course and waitlist, saving once
+
+        Returns {course_id: students newly enrolled from its waitlist} for each
+        course the student was removed from.
+        """
+        withdrawn = {}
+        with change(self, "Failed to save data after withdrawal") as undo:
+            for course_id, course in self.courses.items():
+                if student_id not in course.enrolled_students and student_id not in course.waitlist:
+                    continue
+                undo(self._restore_course, course, list(course.enrolled_students), list(course.waitlist))
+                if student_id in course.enrolled_students:
+                    course.enrolled_students.remove(student_id)
+                    withdrawn[course_id] = self._process_waitlist(course_id)
+                else:
+                    course.waitlist.remove(student_id)
+                    withdrawn[course_id] = []
+
+        for course_id, promoted in withdrawn.items():
+            self._emit("dropped", course_id=course_id, student_id=student_id, promoted=list(promoted))
+        return withdrawn
+
+    @staticmethod
+    def _restore_course(course, enrolled_students, waitlist):
+        """Put back a course's enrollments and waitlist (undo step)"""
+        course.enrolled_students = enrolled_students
+        course.waitlist = deque(waitlist)
+
     def _process_waitlist(self, course_id):
         """Process waitlist for a course (internal method)"""
         course = self.courses[course_id]
@@ -131,6 +179,7 @@ class CourseScheduler:
 
         return newly_enrolled
 
+    @timed()
     def get_course_status(self, course_id):
         """Get detailed course status"""
         if course_id not in self.courses:
@@ -0,0 +1,227 @@
+"""
+Streaming CSV / JSON-lines exports of datasets and reports.
+
+Every export is a generator of row dicts written to disk one row at a time,
+so exporting a large ledger needs memory for one row, not the whole ledger.
+Usage:
+
+    python -m services.exporter transactions exports/ledger.csv
+    python -m services.exporter clearance exports/clearance.jsonl --required-amount 40000
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+import time
+from utils.helpers import atomic_open
+from utils.metrics import timed
+
+
+def iter_students(registry):
+    """Yield one row per student"""
+    for student in registry.students.values():
+        yield {
+            "student_id": student.student_id,
+            "name": student.name,
+            "email": student.email,
+            "year": student.year,
+            "fees_paid": student.fees_paid,
+            "courses": ";".join(student.courses)
+        }
+
+
+def iter_enrollments(scheduler):
+    """Yield one row per enrolled or waitlisted student per course"""
+    for course in scheduler.courses.values():
+        for student_id in course.enrolled_students:
+            yield {"course_id": course.course_id, "course_name": course.name,
+                   "student_id": student_id, "status": "enrolled", "waitlist_position": ""}
+        for position, student_id in enumerate(course.waitlist, 1):
+            yield {"course_id": course.course_id, "course_name": course.name,
+                   "student_id": student_id, "status": "waitlisted", "waitlist_position": position}
+
+
+def _iter_bst(node):
+    """Yield BST nodes in order without recursion or building a list (internal function)"""
+    stack = []
+    while stack or node:
+        while node:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node
+        node = node.right
+
+
+def _iter_payment_records(tracker, sort_by_amount=False):
+    """Yield raw transaction records, live and archived (internal function)"""
+    live = (tx.to_dict() for tx in (_iter_bst(tracker.root) if sort_by_amount
+                                    else tracker.transactions.values()))
+    archived = tracker._archived_records(by_amount=sort_by_amount)
+    if sort_by_amount:
+        return heapq.merge(live, archived, key=lambda record: record['amount'])
+    return (record for source in (live, archived) for record in source)
+
+
+def iter_transactions(tracker, sort_by_amount=False):
+    """Yield one row per transaction, optionally in amount order"""
+    for record in _iter_payment_records(tracker, sort_by_amount):
+        yield {
+            "transaction_id": record['transaction_id'],
+            "student_id": record['student_id'],
+            "amount": record['amount'],
+            "description": record.get('description', ''),
+            "date": record.get('date'),
+            "reference": record.get('reference') or ""
+        }
+
+
+def iter_clearance(tracker, required_amount):
+    """Yield one clearance row per student (memory grows with students, not payments)"""
+    totals = {}
+    for record in _iter_payment_records(tracker):
+        totals[record['student_id']] = totals.get(record['student_id'], 0) + record['amount']
+    for student_id, total_paid in totals.items():
+        yield {
+            "student_id": student_id,
+            "total_paid": total_paid,
+            "amount_owed": max(required_amount - total_paid, 0),
+            "status": "cleared" if total_paid >= required_amount else "pending"
+        }
+
+
+def iter_loans(library):
+    """Yield one row per borrow/return event, live and archived"""
+    books = ((book.isbn, book.title, book.borrow_history) for book in library.books.values())
+    archived = ((record['isbn'], record['title'], record.get('borrow_history', []))
+                for record in library._archived_records())
+    for source in (books, archived):
+        for isbn, title, history in source:
+            for event in history:
+                yield {"isbn": isbn, "title": title, "student_id": event['student_id'],
+                       "action": event['action'], "timestamp": event['timestamp']}
+
+
+def iter_grades(engine):
+    """Yield one row per recorded grade"""
+    for student_id, grade_list in engine.grades.items():
+        for course_id, score in grade_list:
+            yield {"student_id": student_id, "course_id": course_id, "score": score}
+
+
+def iter_student_performance(engine):
+    """Yield each student's grade count, average, rank and percentile"""
+    total_students = len(engine.rank_index)
+    for student_id, (score_sum, count) in engine.student_totals.items():
+        if not count:
+            continue
+        yield {
+            "student_id": student_id,
+            "grades": count,
+            "average_score": round(score_sum / count, 2),
+            "rank": engine.rank_index.rank(student_id),
+            "total_students": total_students,
+            "percentile": round(engine.rank_index.percentile(student_id), 2)
+        }
+
+
+# Export name -> (service attribute, row fields, row generator)
+EXPORTS = {
+    "students": ("student_registry",
+                 ["student_id", "name", "email", "year", "fees_paid", "courses"], iter_students),
+    "enrollments": ("course_scheduler",
+                    ["course_id", "course_name", "student_id", "status", "waitlist_position"],
+                    iter_enrollments),
+    "transactions": ("fee_tracker",
+                     ["transaction_id", "student_id", "amount", "description", "date", "reference"],
+                     iter_transactions),
+    "clearance": ("fee_tracker", ["student_id", "total_paid", "amount_owed", "status"], iter_clearance),
+    "loans": ("library_system", ["isbn", "title", "student_id", "action", "timestamp"], iter_loans),
+    "grades": ("analytics_engine", ["student_id", "course_id", "score"], iter_grades),
+    "performance": ("analytics_engine",
+                    ["student_id", "grades", "average_score", "rank", "total_students", "percentile"],
+                    iter_student_performance),
+}
+
+
+def export_format(path):
+    """Get the export format implied by a file extension"""
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    raise ValueError("Export file must end in .csv or .jsonl")
+
+
+def write_rows(rows, path, fields):
+    """Write row dicts to a CSV or JSON-lines file as they are produced; returns the row count"""
+    file_format = export_format(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    count = 0
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        if file_format == "csv":
+            writer = csv.DictWriter(f, fieldnames=fields, lineterminator="\n")
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+
+@timed("exporter.export")
+def export(container, name, path, **options):
+    """Stream one export from a ServiceContainer to path
+
+    options are passed to the row generator (e.g. required_amount for
+    clearance, sort_by_amount for transactions). Returns a summary dict.
+    """
+    if name not in EXPORTS:
+        raise ValueError(f"Unknown export '{name}'; choose from {', '.join(EXPORTS)}")
+    service_name, fields, rows = EXPORTS[name]
+    started = time.perf_counter()
+    count = write_rows(rows(container.get_service(service_name), **options), path, fields)
+    return {"export": name, "path": path, "rows": count, "seconds": time.perf_counter() - started}
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    from .container import ServiceContainer
+
+    parser = argparse.ArgumentParser(description="Stream a dataset or report to CSV / JSON lines")
+    parser.add_argument("export", choices=list(EXPORTS))
+    parser.add_argument("path", help="output file ending in .csv or .jsonl")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--storage-format", choices=["json", "binary"], default="json")
+    parser.add_argument("--required-amount", type=float, default=40000,
+                        help="fee required for clearance (clearance export only)")
+    parser.add_argument("--sort-by-amount", action="store_true",
+                        help="order transactions by amount (transactions export only)")
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.export == "clearance":
+        options["required_amount"] = args.required_amount
+    elif args.export == "transactions":
+        options["sort_by_amount"] = args.sort_by_amount
+
+    try:
+        summary = export(ServiceContainer(args.data_dir, args.storage_format), args.export, args.path, **options)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    print(f"✓ Exported {summary['rows']:,} rows to {summary['path']} ({summary['seconds']:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
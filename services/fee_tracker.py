@@ -1,33 +1,175 @@
+import heapq
 import os
+from itertools import chain
 from models.transaction import Transaction
-from utils.helpers import save_to_json, load_from_json, generate_id
+from utils.helpers import save_data, load_data, generate_id
+from utils.metrics import timed
+from utils.record_store import MappedRecordStore, build_record_file
+from .transactions import change
 
 class FeeTracker:
-    def __init__(self, data_file="data/transactions.json"):
+    def __init__(self, data_file="data/transactions.json", autoload=True, archive_file=None, cache_size=1024):
         self.root = None  # BST root
         self.transactions = {}  # Hash table for O(1) lookup: transaction_id -> Transaction
+        self.references = {}  # External payment reference -> transaction_id, for import dedupe
+        self._next_id_number = None  # Next numeric transaction ID, found once then counted up
         self.data_file = data_file
-        self._load_data()
+        self.events = None  # EventBus notified of saved changes, attached by ServiceContainer
+        self.undo_journal = None  # UndoJournal of an open transaction, attached by ServiceContainer
+        # Optional read-only record file of historical transactions in amount order,
+        # decoded on demand. Live transactions shadow archived ones with the same ID.
+        self.archive = None
+        self._archive_scan = None  # facts gathered by one pass over the archive, see _scan_archive
+        if archive_file and os.path.exists(archive_file):
+            self._open_archive(archive_file, cache_size)
+        if autoload:
+            self._load_data()
 
+    @timed()
     def _load_data(self):
-        """Load transaction data from JSON file"""
-        data = load_from_json(self.data_file)
+        """Load transaction data from storage"""
+        data = load_data(self.data_file)
         if data:
             for tx_data in data.values():
                 try:
                     transaction = Transaction.from_dict(tx_data)
-                    self.transactions[transaction.transaction_id] = transaction
-                    # Rebuild BST
-                    self.root = self._insert_bst(self.root, transaction)
+                    self._index_transaction(transaction)
                 except Exception as e:
                     print(f"Error loading transaction {tx_data.get('transaction_id')}: {e}")
             print(f"✓ Loaded {len(self.transactions)} transactions from storage")
 
+    def _populate(self, transactions):
+        """Add already-validated Transaction objects (used by the parallel loader)"""
+        for transaction in transactions:
+            self._index_transaction(transaction)
+        print(f"✓ Loaded {len(self.transactions)} transactions from storage")
+
+    @timed()
     def _save_data(self):
-        """Save transaction data to JSON file"""
+        """Save transaction data to storage"""
         data = {txid: tx.to_dict() for txid, tx in self.transactions.items()}
-        if save_to_json(data, self.data_file):
+        if save_data(data, self.data_file):
+            return True
+        return False
+
+    def _emit(self, event, **payload):
+        """Publish a change event if an event bus is attached"""
+        if self.events:
+            self.events.publish(event, **payload)
+
+    def _emit_payments(self, transactions):
+        """Publish payment_added for a saved batch, delivered to batched subscribers together"""
+        if self.events:
+            with self.events.batch():
+                for tx in transactions:
+                    self.events.publish("payment_added", transaction_id=tx.transaction_id,
+                                        student_id=tx.student_id, amount=tx.amount)
+
+    def _open_archive(self, archive_file, cache_size=1024):
+        """Map a transaction archive file (internal method)"""
+        if self.archive:
+            self.archive.close()
+        self.archive = MappedRecordStore(archive_file, Transaction.from_dict, cache_size,
+                                         name="transactions")
+        self._archive_scan = None
+
+    def _scan_archive(self):
+        """Read the archive once for its revenue, references, per-student index and
+        whether its records really are in amount order (internal method)
+
+        The archive is read-only, so the results hold until another is opened.
+        """
+        if self._archive_scan is None:
+            revenue = 0
+            references = set()
+            students = {}  # student_id -> archived transaction IDs
+            in_order = True
+            previous = None
+            for txid, record in self.archive.iter_records():
+                revenue += record['amount']
+                references.add(record.get('reference'))
+                students.setdefault(record['student_id'], []).append(txid)
+                if previous is not None and record['amount'] < previous:
+                    in_order = False
+                previous = record['amount']
+            self._archive_scan = {"revenue": revenue, "references": references,
+                                  "students": students, "in_order": in_order}
+        return self._archive_scan
+
+    def _archived_records(self, by_amount=True):
+        """Yield raw archived records, skipping those shadowed by live ones
+
+        With by_amount (as heapq.merge needs) the records are yielded in
+        amount order, sorting them if the archive file isn't.
+        """
+        if not self.archive:
+            return
+        records = self.archive.iter_records()
+        if by_amount and not self._scan_archive()["in_order"]:
+            records = sorted(records, key=lambda item: item[1]['amount'])
+        for txid, record in records:
+            if txid not in self.transactions:
+                yield record
+
+    @timed()
+    def archive_transactions(self, archive_file, before_date):
+        """Move transactions dated before before_date (YYYY-MM-DD) into the archive file
+
+        The archive is rewritten with its existing records plus the moved ones,
+        sorted by amount. Returns the number of transactions moved.
+        """
+        moved = [tx for tx in self.transactions.values() if tx.date < before_date]
+        records = [(tx.transaction_id, tx.to_dict()) for tx in moved]
+        if self.archive:
+            records.extend(self.archive.iter_records())
+        records.sort(key=lambda item: item[1]['amount'])
+        build_record_file(archive_file, records)
+        cache_size = self.archive.cache_size if self.archive else 1024
+        self._open_archive(archive_file, cache_size)
+
+        # If the save fails the archive already holds the moved records; they stay live as well
+        with change(self, "Failed to save transaction data") as undo:
+            self._unindex_transactions(moved)
+            undo(self._index_transactions, moved)
+        self._emit("transactions_archived", count=len(moved), before_date=before_date)
+        return len(moved)
+
+    def _index_transaction(self, transaction):
+        """Add a transaction to the hash table, BST and reference index (internal method)"""
+        self.transactions[transaction.transaction_id] = transaction
+        self.root = self._insert_bst(self.root, transaction)
+        if transaction.reference:
+            self.references[transaction.reference] = transaction.transaction_id
+
+    def _index_transactions(self, transactions):
+        """Add several transactions with _index_transaction (internal method)"""
+        for transaction in transactions:
+            self._index_transaction(transaction)
+
+    def _unindex_transactions(self, transactions):
+        """Remove transactions from the hash table, BST and reference index (internal method)"""
+        for transaction in transactions:
+            del self.transactions[transaction.transaction_id]
+            self.references.pop(transaction.reference, None)
+            self.root = self._delete_bst(self.root, transaction)
+
+    def _next_transaction_id(self):
+        """Get a new unique transaction ID without rescanning every existing ID"""
+        if self._next_id_number is None:
+            existing_ids = list(self.transactions.keys())
+            if self.archive:
+                existing_ids.extend(self.archive.keys())
+            self._next_id_number = int(generate_id("T", existing_ids)[1:])
+        transaction_id = f"T{self._next_id_number:04d}"
+        self._next_id_number += 1
+        return transaction_id
+
+    def has_reference(self, reference):
+        """Check whether a payment with this external reference is already recorded"""
+        if reference in self.references:
             return True
+        if self.archive:
+            return reference in self._scan_archive()["references"]
         return False
 
     def _insert_bst(self, node, transaction):
@@ -42,33 +184,90 @@ class FeeTracker:
 
         return node
 
+    def _delete_bst(self, node, transaction):
+        """Remove transaction from the BST; returns the subtree's new root"""
+        if node is None:
+            return None
+
+        if node is transaction:
+            if node.left is None:
+                replacement = node.right
+            elif node.right is None:
+                replacement = node.left
+            else:
+                # The smallest node of the right subtree takes its place
+                node.right, replacement = self._pop_min_bst(node.right)
+                replacement.left, replacement.right = node.left, node.right
+            node.left = node.right = None
+            return replacement
+
+        # Equal amounts are inserted to the right
+        if transaction.amount < node.amount:
+            node.left = self._delete_bst(node.left, transaction)
+        else:
+            node.right = self._delete_bst(node.right, transaction)
+
+        return node
+
+    def _pop_min_bst(self, node):
+        """Detach the smallest node of a BST; returns (the subtree's new root, that node)"""
+        if node.left is None:
+            return node.right, node
+        node.left, smallest = self._pop_min_bst(node.left)
+        return node, smallest
+
+    @timed()
     def add_payment(self, student_id, amount, description="Tuition Fee"):
         """Add a payment transaction"""
         try:
             # Generate unique transaction ID
-            existing_ids = list(self.transactions.keys())
-            transaction_id = generate_id("T", existing_ids)
+            transaction_id = self._next_transaction_id()
 
             # Create transaction
             transaction = Transaction(transaction_id, student_id, amount, description)
 
-            # Add to hash table for O(1) lookup
-            self.transactions[transaction_id] = transaction
+            # Add to hash table for O(1) lookup and BST for sorted reporting
+            with change(self, "Failed to save transaction data") as undo:
+                self._index_transaction(transaction)
+                undo(self._unindex_transactions, [transaction])
 
-            # Add to BST for sorted reporting
-            self.root = self._insert_bst(self.root, transaction)
-
-            if self._save_data():
-                return transaction
-            else:
-                # Rollback if save fails
-                del self.transactions[transaction_id]
-                self.root = self._rebuild_bst()  # Rebuild without the failed transaction
-                raise Exception("Failed to save transaction data")
+            self._emit("payment_added", transaction_id=transaction_id, student_id=student_id,
+                       amount=amount)
+            return transaction
 
         except Exception as e:
             raise Exception(f"Failed to add payment: {e}")
 
+    @timed()
+    def add_payments(self, payments):
+        """Add a batch of payments with a single save
+
+        payments is an iterable of dicts with student_id, amount and optional
+        description, date and reference. Either every payment is recorded or,
+        if validation or the save fails, none are.
+        """
+        added = []
+        try:
+            with change(self, "Failed to save transaction data") as undo:
+                # One step undoes the whole batch
+                undo(self._unindex_transactions, added)
+                for payment in payments:
+                    transaction = Transaction(
+                        self._next_transaction_id(),
+                        payment['student_id'],
+                        payment['amount'],
+                        payment.get('description', "Tuition Fee"),
+                        payment.get('date'),
+                        payment.get('reference')
+                    )
+                    self._index_transaction(transaction)
+                    added.append(transaction)
+        except Exception as e:
+            raise Exception(f"Failed to add payments: {e}")
+
+        self._emit_payments(added)
+        return added
+
     def _rebuild_bst(self):
         """Rebuild BST from transactions hash table"""
         root = None
@@ -78,17 +277,31 @@ class FeeTracker:
 
     def get_transaction(self, transaction_id):
         """Get transaction by ID - O(1) lookup"""
-        return self.transactions.get(transaction_id)
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None and self.archive:
+            transaction = self.archive.get(transaction_id)
+        return transaction
 
+    @timed()
     def get_student_transactions(self, student_id):
         """Get all transactions for a student"""
-        return [tx for tx in self.transactions.values()
-                if tx.student_id == student_id]
+        transactions = [tx for tx in self.transactions.values()
+                        if tx.student_id == student_id]
+        if self.archive:
+            transactions.extend(self.archive.get(txid)
+                                for txid in self._scan_archive()["students"].get(student_id, ())
+                                if txid not in self.transactions)
+        return transactions
 
+    @timed()
     def get_sorted_transactions(self):
         """Get all transactions sorted by amount (in-order traversal)"""
         transactions = []
         self._inorder_traversal(self.root, transactions)
+        if self.archive:
+            archived = (self.archive.get(record['transaction_id'])
+                        for record in self._archived_records())
+            transactions = list(heapq.merge(transactions, archived, key=lambda tx: tx.amount))
         return transactions
 
     def _inorder_traversal(self, node, result):
@@ -98,16 +311,24 @@ class FeeTracker:
             result.append(node)
             self._inorder_traversal(node.right, result)
 
+    @timed()
     def generate_clearance_report(self, required_amount):
         """Generate fee clearance report"""
-        all_transactions = self.get_sorted_transactions()
+        all_transactions = []
+        self._inorder_traversal(self.root, all_transactions)
+        payments = ((tx.student_id, tx.amount) for tx in all_transactions)
+        if self.archive:
+            # Stream archived amounts from raw records in file order, without decoding transactions
+            archived = ((record['student_id'], record['amount'])
+                        for record in self._archived_records(by_amount=False))
+            payments = chain(payments, archived)
 
         # Calculate total payments per student
         student_totals = {}
-        for tx in all_transactions:
-            if tx.student_id not in student_totals:
-                student_totals[tx.student_id] = 0
-            student_totals[tx.student_id] += tx.amount
+        for student_id, amount in payments:
+            if student_id not in student_totals:
+                student_totals[student_id] = 0
+            student_totals[student_id] += amount
 
         # Categorize students
         cleared = []
@@ -132,10 +353,18 @@ class FeeTracker:
 
     def get_total_revenue(self):
         """Calculate total revenue from all transactions"""
-        return sum(tx.amount for tx in self.transactions.values())
+        revenue = sum(tx.amount for tx in self.transactions.values())
+        if self.archive:
+            revenue += self._scan_archive()["revenue"]
+            # Archived records shadowed by a live copy are already counted above
+            revenue -= sum(self.archive.get_record(txid)['amount']
+                           for txid in self.transactions if txid in self.archive)
+        return revenue
 
     def __str__(self):
-        return f"FeeTracker({len(self.transactions)} transactions, Total: Ksh {self.get_total_revenue():,.2f})"
+        return f"FeeTracker({len(self)} transactions, Total: Ksh {self.get_total_revenue():,.2f})"
 
     def __len__(self):
-        return len(self.transactions)
+        if not self.archive:
+            return len(self.transactions)
+        return len(self.archive) + sum(1 for txid in self.transactions if txid not in self.archive)
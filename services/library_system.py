@@ -1,120 +1,236 @@
 import os
 from models.book import Book
-from utils.helpers import save_to_json, load_from_json
+from utils.helpers import save_data, load_data
 from utils.validators import validate_isbn
+from utils.metrics import timed
+from utils.record_store import MappedRecordStore
+from .transactions import SaveError, change
 
 class LibrarySystem:
-    def __init__(self, data_file="data/books.json"):
+    def __init__(self, data_file="data/books.json", autoload=True, archive_file=None, cache_size=1024):
         self.books = {}  # Hash table: isbn -> Book object
         self.data_file = data_file
-        self._load_data()
+        self.events = None  # EventBus notified of saved changes, attached by ServiceContainer
+        self.undo_journal = None  # UndoJournal of an open transaction, attached by ServiceContainer
+        self.loans = {}  # student_id -> {isbn: copies on loan}, kept from the books' history
+        self._archive_loans_indexed = False  # archived books' loans are indexed on first use
+        # Optional read-only record file of the bulk catalogue, decoded on demand.
+        # Books in self.books shadow archived copies and are the ones persisted.
+        self.archive = None
+        if archive_file and os.path.exists(archive_file):
+            self.archive = MappedRecordStore(archive_file, Book.from_dict, cache_size, name="books")
+        if autoload:
+            self._load_data()
 
+    @timed()
     def _load_data(self):
-        """Load book data from JSON file"""
-        data = load_from_json(self.data_file)
+        """Load book data from storage"""
+        data = load_data(self.data_file)
         if data:
             for book_data in data.values():
                 try:
                     book = Book.from_dict(book_data)
                     self.books[book.isbn] = book
+                    self._index_loans(book.isbn, book.borrow_history)
                 except Exception as e:
                     print(f"Error loading book {book_data.get('isbn')}: {e}")
             print(f"✓ Loaded {len(self.books)} books from storage")
 
+    def _populate(self, books):
+        """Add already-validated Book objects (used by the parallel loader)"""
+        for book in books:
+            self.books[book.isbn] = book
+            self._index_loans(book.isbn, book.borrow_history)
+        print(f"✓ Loaded {len(self.books)} books from storage")
+
+    @timed()
     def _save_data(self):
-        """Save book data to JSON file"""
+        """Save book data to storage"""
         data = {isbn: book.to_dict() for isbn, book in self.books.items()}
-        if save_to_json(data, self.data_file):
+        if save_data(data, self.data_file):
             return True
         return False
 
+    def _emit(self, event, **payload):
+        """Publish a change event if an event bus is attached"""
+        if self.events:
+            self.events.publish(event, **payload)
+
+    def _archived_records(self):
+        """Yield raw records of archived books not shadowed by a live copy"""
+        if self.archive:
+            for isbn, record in self.archive.iter_records():
+                if isbn not in self.books:
+                    yield record
+
+    def _index_loans(self, isbn, borrow_history):
+        """Add a book's outstanding loans to the loans index (internal method)"""
+        on_loan = {}
+        for entry in borrow_history:
+            delta = 1 if entry['action'] == 'borrowed' else -1
+            on_loan[entry['student_id']] = on_loan.get(entry['student_id'], 0) + delta
+        for student_id, copies in on_loan.items():
+            if copies > 0:
+                self._record_loan(student_id, isbn, copies)
+
+    def _loan_index(self):
+        """Get the loans index, adding the archived books' loans on first use (internal method)
+
+        Archived books are indexed from their raw records, without decoding
+        them into Book objects.
+        """
+        if not self._archive_loans_indexed:
+            self._archive_loans_indexed = True
+            for record in self._archived_records():
+                self._index_loans(record['isbn'], record.get('borrow_history', []))
+        return self.loans
+
+    def _record_loan(self, student_id, isbn, delta):
+        """Adjust the copies of a book a student has on loan (internal method)"""
+        loans = self.loans.setdefault(student_id, {})
+        copies = loans.get(isbn, 0) + delta
+        if copies > 0:
+            loans[isbn] = copies
+        else:
+            loans.pop(isbn, None)
+        if not loans:
+            del self.loans[student_id]
+
+    def _undo_activity(self, book, student_id, delta):
+        """Reverse the newest borrow (delta -1) or return (delta 1) of a book (undo step)"""
+        book.available_copies -= delta
+        book.borrow_history.pop()
+        self._record_loan(student_id, book.isbn, delta)
+
+    def _promote(self, book, undo):
+        """Move an archived book being modified into the live catalogue, as an
+        undo step of the change modifying it (internal method)"""
+        if book.isbn not in self.books:
+            self._loan_index()  # index its archived loans before the live copy shadows them
+            self.books[book.isbn] = book
+            undo(self.books.pop, book.isbn)
+
+    @timed()
     def add_book(self, isbn, title, author, total_copies):
         """Add a new book to the library"""
         try:
             if not validate_isbn(isbn):
                 raise ValueError("Invalid ISBN format")
 
-            if isbn in self.books:
+            if isbn in self.books or (self.archive and isbn in self.archive):
                 raise ValueError(f"Book with ISBN {isbn} already exists")
 
             book = Book(isbn, title, author, total_copies)
-            self.books[isbn] = book
+            with change(self, "Failed to save book data") as undo:
+                self.books[isbn] = book
+                undo(self.books.pop, isbn)
 
-            if self._save_data():
-                return book
-            else:
-                del self.books[isbn]
-                raise Exception("Failed to save book data")
+            self._emit("book_added", isbn=isbn)
+            return book
 
         except Exception as e:
             raise Exception(f"Failed to add book: {e}")
 
+    @timed()
     def borrow_book(self, isbn, student_id):
         """Borrow a book copy"""
         try:
-            if isbn not in self.books:
+            book = self.get_book(isbn)
+            if book is None:
                 raise ValueError("Book not found")
 
-            book = self.books[isbn]
-
             if book.available_copies <= 0:
                 return {"success": False, "message": "No copies available"}
 
-            success = book.borrow_book(student_id)
+            try:
+                with change(self, "Failed to save borrow data") as undo:
+                    self._promote(book, undo)
+                    success = book.borrow_book(student_id)
+                    if success:
+                        self._record_loan(student_id, isbn, 1)
+                        undo(self._undo_activity, book, student_id, -1)
+            except SaveError as e:
+                return {"success": False, "message": str(e)}
+
             if success:
-                if self._save_data():
-                    return {
-                        "success": True,
-                        "message": f"Successfully borrowed '{book.title}'",
-                        "available_copies": book.available_copies
-                    }
-                else:
-                    # Rollback borrow operation
-                    book.available_copies += 1
-                    if book.borrow_history and book.borrow_history[-1]['student_id'] == student_id:
-                        book.borrow_history.pop()
-                    return {"success": False, "message": "Failed to save borrow data"}
+                self._emit("book_borrowed", isbn=isbn, student_id=student_id)
+                return {
+                    "success": True,
+                    "message": f"Successfully borrowed '{book.title}'",
+                    "available_copies": book.available_copies
+                }
             else:
                 return {"success": False, "message": "Borrow operation failed"}
 
         except Exception as e:
             raise Exception(f"Failed to borrow book: {e}")
 
+    @timed()
     def return_book(self, isbn, student_id):
         """Return a book copy"""
         try:
-            if isbn not in self.books:
+            book = self.get_book(isbn)
+            if book is None:
                 raise ValueError("Book not found")
 
-            book = self.books[isbn]
-
             if book.available_copies >= book.total_copies:
                 return {"success": False, "message": "All copies are already available"}
 
-            success = book.return_book(student_id)
+            try:
+                with change(self, "Failed to save return data") as undo:
+                    self._promote(book, undo)
+                    success = book.return_book(student_id)
+                    if success:
+                        self._record_loan(student_id, isbn, -1)
+                        undo(self._undo_activity, book, student_id, 1)
+            except SaveError as e:
+                return {"success": False, "message": str(e)}
+
             if success:
-                if self._save_data():
-                    return {
-                        "success": True,
-                        "message": f"Successfully returned '{book.title}'",
-                        "available_copies": book.available_copies
-                    }
-                else:
-                    # Rollback return operation
-                    book.available_copies -= 1
-                    if book.borrow_history and book.borrow_history[-1]['student_id'] == student_id:
-                        book.borrow_history.pop()
-                    return {"success": False, "message": "Failed to save return data"}
+                self._emit("book_returned", isbn=isbn, student_id=student_id)
+                return {
+                    "success": True,
+                    "message": f"Successfully returned '{book.title}'",
+                    "available_copies": book.available_copies
+                }
             else:
                 return {"success": False, "message": "Return operation failed"}
 
         except Exception as e:
             raise Exception(f"Failed to return book: {e}")
 
+    @timed()
+    def return_all_books(self, student_id):
+        """Return every copy a student has on loan, saving once
+
+        Returns {isbn: copies returned}.
+        """
+        returned = {}
+        with change(self, "Failed to save data after returning loans") as undo:
+            for isbn, copies in self.get_student_loans(student_id).items():
+                book = self.get_book(isbn)
+                self._promote(book, undo)
+                for _ in range(copies):
+                    if book.return_book(student_id):
+                        self._record_loan(student_id, isbn, -1)
+                        undo(self._undo_activity, book, student_id, 1)
+                        returned[isbn] = returned.get(isbn, 0) + 1
+        for isbn in returned:
+            self._emit("book_returned", isbn=isbn, student_id=student_id)
+        return returned
+
+    def get_student_loans(self, student_id):
+        """Get {isbn: copies} a student has on loan"""
+        return dict(self._loan_index().get(student_id, {}))
+
     def get_book(self, isbn):
         """Get book by ISBN"""
-        return self.books.get(isbn)
+        book = self.books.get(isbn)
+        if book is None and self.archive:
+            book = self.archive.get(isbn)
+        return book
 
+    @timed()
     def search_books(self, title_filter="", author_filter=""):
         """Search books by title and/or author"""
         results = []
@@ -125,12 +241,29 @@ class LibrarySystem:
             if title_match and author_match:
                 results.append(book)
 
+        # Match archived books on their raw records; only matches are decoded
+        for record in self._archived_records():
+            title_match = not title_filter or title_filter.lower() in record['title'].lower()
+            author_match = not author_filter or author_filter.lower() in record['author'].lower()
+
+            if title_match and author_match:
+                results.append(self.archive.get(record['isbn']))
+
         return results
 
     def get_available_books(self):
         """Get all books with available copies"""
-        return [book for book in self.books.values() if book.available_copies > 0]
+        available = [book for book in self.books.values() if book.available_copies > 0]
+        available.extend(self.archive.get(record['isbn']) for record in self._archived_records()
+                         if self._record_available(record))
+        return available
+
+    @staticmethod
+    def _record_available(record):
+        """Check whether a raw archived record has copies available"""
+        return record.get('available_copies', record['total_copies']) > 0
 
+    @timed()
     def get_book_status(self, isbn):
         """Get detailed book status"""
         book = self.get_book(isbn)
@@ -148,8 +281,12 @@ class LibrarySystem:
         }
 
     def __str__(self):
-        available = len(self.get_available_books())
-        return f"LibrarySystem({len(self.books)} books, {available} available)"
+        # Count archived books from raw records rather than decoding them all
+        available = sum(1 for book in self.books.values() if book.available_copies > 0)
+        available += sum(1 for record in self._archived_records() if self._record_available(record))
+        return f"LibrarySystem({len(self)} books, {available} available)"
 
     def __len__(self):
-        return len(self.books)
+        if not self.archive:
+            return len(self.books)
+        return len(self.archive) + sum(1 for isbn in self.books if isbn not in self.archive)
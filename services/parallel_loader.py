@@ -0,0 +1,158 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from models.student import Student
+from models.course import Course
+from models.transaction import Transaction
+from models.book import Book
+from .analytics_engine import AnalyticsEngine
+from utils.helpers import load_data
+
+LARGE_FILE_BYTES = 4 * 1024 * 1024  # files above this are split across process workers
+# How save_to_json starts a non-empty file, and each top-level entry's line
+FILE_START = b'{\n  "'
+ENTRY_START = b'  "'
+
+
+def _build_grades(student_id, grade_list):
+    """Validate one student's stored grades into (student_id, course_id, score) tuples"""
+    grades = []
+    for grade in grade_list:
+        AnalyticsEngine.validate_grade(student_id, grade.get('course_id'), grade.get('score'))
+        grades.append((student_id, grade['course_id'], grade['score']))
+    return grades
+
+
+# Service name -> builder turning one (key, record) pair into a list of loaded objects
+BUILDERS = {
+    "student_registry": lambda key, record: [Student.from_dict(record)],
+    "course_scheduler": lambda key, record: [Course.from_dict(record)],
+    "fee_tracker": lambda key, record: [Transaction.from_dict(record)],
+    "library_system": lambda key, record: [Book.from_dict(record)],
+    "analytics_engine": _build_grades,
+}
+
+
+def _materialize(name, items):
+    """Build model objects for a range of records, collecting per-record errors"""
+    build = BUILDERS[name]
+    objects = []
+    errors = []
+    for key, record in items:
+        try:
+            objects.extend(build(key, record))
+        except Exception as e:
+            errors.append(f"Error loading {key}: {e}")
+    return objects, errors
+
+
+def _parse(path):
+    """Parse a JSON or binary data file into (key, record) pairs"""
+    started = time.perf_counter()
+    data = load_data(path) or {}
+    return list(data.items()), time.perf_counter() - started
+
+
+def _splittable(path):
+    """Check a data file is JSON laid out one top-level entry per line, as save_to_json writes it"""
+    with open(path, 'rb') as f:
+        return f.read(len(FILE_START)) == FILE_START
+
+
+def _parse_range(path, start, stop):
+    """Parse the top-level entries whose key lines begin in bytes [start, stop) of a JSON data file
+
+    save_to_json indents top-level keys by exactly two spaces, nested lines
+    by more, and strings can't span lines, so a worker finds its entries
+    by line and parses only those.
+    """
+    started = time.perf_counter()
+    lines = []
+    with open(path, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()  # skip to the next line start; a line starting exactly at start is kept
+        position = f.tell()
+        for line in f:
+            if line.startswith(ENTRY_START):
+                if position >= stop:
+                    break
+            elif line.rstrip() == b"}":
+                break  # end of the top-level object
+            if lines or line.startswith(ENTRY_START):
+                lines.append(line)
+            position += len(line)
+    body = b"".join(lines).rstrip().rstrip(b",")
+    data = json.loads(b"{" + body + b"}") if body else {}
+    return list(data.items()), time.perf_counter() - started
+
+
+def _load_part(name, path, start=0, stop=None):
+    """Worker task: parse and materialize the records of a data file, or of bytes [start, stop) of it
+
+    Each worker reads its own range of the file, so the records never travel
+    between processes; only the built objects are sent back, once.
+    """
+    if stop is None:
+        items, parse_seconds = _parse(path)
+    else:
+        items, parse_seconds = _parse_range(path, start, stop)
+    started = time.perf_counter()
+    objects, errors = _materialize(name, items)
+    return objects, errors, len(items), parse_seconds, time.perf_counter() - started
+
+
+def load_files(files, max_workers=None, use_processes=True, large_file_bytes=LARGE_FILE_BYTES):
+    """Parse and materialize several data files concurrently
+
+    files maps a service name (see BUILDERS) to its JSON path. Each file is
+    loaded by one worker. In a process pool, a JSON file larger than
+    large_file_bytes is split into one byte range per large_file_bytes (up
+    to one per worker), and each part's worker parses and builds only the
+    entries in its range. Threads share the GIL, so they always load whole
+    files, as do binary files.
+
+    Returns (results, timings): results maps each name to (objects, errors),
+    timings maps each name to a dict of records/parse/materialize/total seconds.
+    """
+    # A process pool only pays off with more than one core to spread work across
+    processes = use_processes and (os.cpu_count() or 1) > 1
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    workers = max_workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    results = {}
+    timings = {}
+
+    with executor_class(max_workers=max_workers) as pool:
+        futures = {}  # name -> futures of its parts, in record order
+        for name, path in files.items():
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            parts = min(workers, -(-size // large_file_bytes)) if processes and size > large_file_bytes else 1
+            if parts > 1 and _splittable(path):
+                offsets = [size * part // parts for part in range(parts + 1)]
+                futures[name] = [pool.submit(_load_part, name, path, offsets[part], offsets[part + 1])
+                                 for part in range(parts)]
+            else:
+                futures[name] = [pool.submit(_load_part, name, path)]
+
+        for name, parts in futures.items():
+            objects = []
+            errors = []
+            records = 0
+            parse_seconds = build_seconds = 0.0
+            for future in parts:
+                part_objects, part_errors, part_records, seconds, part_build_seconds = future.result()
+                objects.extend(part_objects)
+                errors.extend(part_errors)
+                records += part_records
+                parse_seconds = max(parse_seconds, seconds)  # the parts parse concurrently
+                build_seconds += part_build_seconds
+            results[name] = (objects, errors)
+            timings[name] = {"records": records, "parse_seconds": parse_seconds,
+                             "materialize_seconds": build_seconds, "chunks": len(parts)}
+
+    for timing in timings.values():
+        timing["total_seconds"] = timing["parse_seconds"] + timing["materialize_seconds"]
+    timings["wall_seconds"] = time.perf_counter() - started
+    return results, timings
@@ -0,0 +1,241 @@
+import csv
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from utils.metrics import timed
+from .transactions import SaveError
+
+BATCH_SIZE = 1000  # payments recorded per add_payments call
+
+# Column name -> payment field, so both our fee files and bank statements import
+COLUMN_ALIASES = {
+    "student_id": "student_id", "student": "student_id", "account": "student_id",
+    "amount": "amount", "credit": "amount",
+    "description": "description", "narration": "description", "details": "description",
+    "date": "date", "value_date": "date", "transaction_date": "date",
+    "reference": "reference", "ref": "reference", "bank_reference": "reference",
+}
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y")
+
+
+def read_rows(path):
+    """Yield (line number, row dict or None, error) from a CSV or JSON-lines file
+
+    Rows are read one at a time, so memory use does not grow with file size.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, {"raw": line.rstrip("\n")}, f"Malformed JSON: {e}"
+                    continue
+                if isinstance(row, dict):
+                    yield line_number, row, None
+                else:
+                    yield line_number, {"raw": row}, "Expected a JSON object"
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                # Header is line 1; report the physical line the row ended on
+                yield reader.line_num, row, None
+
+
+def _parse_amount(value):
+    """Parse an amount such as 45000, "45,000.00" or "Ksh 45,000" (internal function)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        amount = value
+    else:
+        amount = float(str(value).replace(",", "").replace("Ksh", "").strip())
+    # float() accepts "nan" and "inf", which would poison a batch or the saved totals
+    if not math.isfinite(amount):
+        raise ValueError(f"Amount must be a finite number, got {value!r}")
+    return amount
+
+
+def _parse_date(value):
+    """Normalize a date to YYYY-MM-DD (internal function)"""
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date '{value}'")
+
+
+def parse_payments(rows):
+    """Yield (line number, row, payment dict or None, error) for raw rows"""
+    for line_number, row, error in rows:
+        if error:
+            yield line_number, row, None, error
+            continue
+
+        fields = {}
+        for column, value in row.items():
+            field = COLUMN_ALIASES.get(str(column).strip().lower())
+            if field and value not in (None, ""):
+                fields[field] = value.strip() if isinstance(value, str) else value
+
+        try:
+            if not fields.get("student_id"):
+                raise ValueError("Missing student ID")
+            amount = _parse_amount(fields.get("amount", ""))
+            if amount <= 0:
+                raise ValueError("Amount must be positive")
+            payment = {"student_id": str(fields["student_id"]), "amount": amount,
+                       "description": str(fields.get("description", "Tuition Fee"))}
+            if "date" in fields:
+                payment["date"] = _parse_date(str(fields["date"]))
+            if "reference" in fields:
+                payment["reference"] = str(fields["reference"])
+        except (ValueError, TypeError) as e:
+            yield line_number, row, None, f"Invalid row: {e}"
+            continue
+
+        yield line_number, row, payment, None
+
+
+def dedupe_payments(items, fee_tracker):
+    """Reject payments whose reference is already recorded or repeated in the file"""
+    seen = set()
+    for line_number, row, payment, error in items:
+        reference = payment.get("reference") if payment else None
+        if reference and (reference in seen or fee_tracker.has_reference(reference)):
+            yield line_number, row, None, f"Duplicate reference {reference}"
+            continue
+        if reference:
+            seen.add(reference)
+        yield line_number, row, payment, error
+
+
+class _RejectWriter:
+    """Writes rejected rows as JSON lines, creating the file on the first reject"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.count = 0
+
+    def write(self, line_number, row, reason):
+        if self.path and self.file is None:
+            self.file = open(self.path, 'w', encoding='utf-8')
+        if self.file:
+            self.file.write(json.dumps({"line": line_number, "reason": reason, "row": row},
+                                       ensure_ascii=False, default=str) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+@contextmanager
+def _deferred_saves(services):
+    """Save each changed service once when the block exits, not on every change (internal function)
+
+    For services outside a ServiceContainer, whose deferred_saves() does
+    this for its own. Changes that completed are saved even if the block
+    raises; a failed save raises SaveError.
+    """
+    changed = []
+    previous = {}
+    for service in services:
+        previous[service] = service.__dict__.get('_save_data')
+        service._save_data = lambda service=service: changed.append(service) or True
+    try:
+        yield
+    finally:
+        failed = []
+        for service in services:
+            if previous[service] is None:
+                del service._save_data
+            else:
+                service._save_data = previous[service]
+            if service in changed and not service._save_data():
+                failed.append(type(service).__name__)
+        if failed:
+            raise SaveError(f"Failed to save {', '.join(failed)} data")
+
+
+@timed("payment_importer.import_payments")
+def import_payments(path, fee_tracker, reject_file=None, batch_size=BATCH_SIZE, student_registry=None,
+                    container=None, resume_line=None):
+    """Stream a CSV or JSON-lines payment file into a FeeTracker
+
+    Rows flow through parse -> validate -> dedupe -> batch insert, and the
+    data file is written once at the end rather than once per batch: pass
+    the ServiceContainer fee_tracker belongs to as container to use its
+    deferred_saves(). Bad and duplicate rows are written to reject_file
+    (default: <path>.rejects.jsonl) instead of stopping the import.
+    If student_registry is given, known students' fees paid are updated too;
+    leave it out with a container, whose payment_added cascade already does
+    this (once, at the end of the import).
+
+    If a batch fails (each batch is all or nothing) the import stops there:
+    the batches before it are kept and saved, and the summary's
+    failed_batch, resume_line and error say where to pick up. Rows before
+    resume_line are skipped, so passing it resumes a failed import.
+
+    Returns a summary dict of imported/rejected counts, batches and seconds.
+    """
+    if not os.path.exists(path):
+        raise ValueError(f"File {path} not found")
+
+    started = time.perf_counter()
+    rejects = _RejectWriter(reject_file or f"{path}.rejects.jsonl")
+    imported = 0
+    batches = 0
+    batch = []
+    batch_line = None  # line number of the current batch's first row
+    failure = {}
+
+    def flush():
+        """Record the batch; on failure note where it started and return False"""
+        nonlocal imported, batches
+        try:
+            transactions = fee_tracker.add_payments(batch)
+            if student_registry:
+                student_registry.apply_payments([(tx.student_id, tx.amount) for tx in transactions])
+        except Exception as e:
+            failure.update(failed_batch=batches + 1, resume_line=batch_line, error=str(e))
+            return False
+        imported += len(transactions)
+        batches += 1
+        batch.clear()
+        return True
+
+    rows = read_rows(path)
+    if resume_line:
+        rows = (item for item in rows if item[0] >= resume_line)
+    services = [fee_tracker] + ([student_registry] if student_registry else [])
+    try:
+        with container.deferred_saves() if container else _deferred_saves(services):
+            for line_number, row, payment, error in dedupe_payments(parse_payments(rows), fee_tracker):
+                if error:
+                    rejects.write(line_number, row, error)
+                    continue
+                if not batch:
+                    batch_line = line_number
+                batch.append(payment)
+                if len(batch) >= batch_size and not flush():
+                    break
+            else:
+                if batch:
+                    flush()
+    finally:
+        rejects.close()
+
+    return {
+        "imported": imported,
+        "rejected": rejects.count,
+        "batches": batches,
+        "reject_file": rejects.path if rejects.count else None,
+        "seconds": time.perf_counter() - started,
+        **failure
+    }
@@ -0,0 +1,98 @@
+from functools import wraps
+from utils.cache import TTLCache
+from utils.metrics import metrics
+
+# Service name -> {read method: function(*args) giving the tags its result depends on}
+CACHED_QUERIES = {
+    "course_scheduler": {
+        "get_course_status": lambda course_id: [("course", course_id)],
+    },
+    "library_system": {
+        "get_book_status": lambda isbn: [("book", isbn)],
+    },
+    "fee_tracker": {
+        "get_student_transactions": lambda student_id: [("payments", student_id), ("payments",)],
+    },
+    "analytics_engine": {
+        # Rankings and the report depend on every student's grades
+        "get_student_ranking": lambda student_id: [("grades",)],
+        "generate_performance_report": lambda: [("grades",)],
+    },
+}
+
+# Event -> function(payload) giving the tags it invalidates
+INVALIDATIONS = {
+    "course_created": lambda p: [("course", p["course_id"])],
+    "enrolled": lambda p: [("course", p["course_id"])],
+    "dropped": lambda p: [("course", p["course_id"])],
+    "book_added": lambda p: [("book", p["isbn"])],
+    "book_borrowed": lambda p: [("book", p["isbn"])],
+    "book_returned": lambda p: [("book", p["isbn"])],
+    "payment_added": lambda p: [("payments", p["student_id"])],
+    "transactions_archived": lambda p: [("payments",)],
+    "grade_added": lambda p: [("grades",)],
+    "grades_removed": lambda p: [("grades",)],
+    # A transaction was undone: whatever its events changed has changed back
+    "rolled_back": lambda p: [tag for event, payload in p["events"] if event in INVALIDATIONS
+                              for tag in INVALIDATIONS[event](payload)],
+}
+
+_MISSING = object()
+
+
+class QueryCache:
+    """Caches the results of read-heavy service queries (see CACHED_QUERIES)
+
+    Entries are keyed by service, method and arguments, expire after ttl
+    seconds, and are dropped as soon as the owning service publishes an
+    event that changes them. Cached results are shared between callers and
+    must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=1024, ttl=30.0):
+        self.cache = TTLCache(max_entries, ttl, name="query_cache")
+
+    def attach(self, name, service):
+        """Wrap a service's cached queries on the instance"""
+        for method, tags in CACHED_QUERIES.get(name, {}).items():
+            setattr(service, method, self._wrap(name, method, getattr(service, method), tags))
+
+    def _wrap(self, name, method, query, tags):
+        """Build the caching version of one bound query method (internal method)"""
+        label = f"query_cache.{name}.{method}"
+
+        @wraps(query)
+        def cached(*args, **kwargs):
+            if kwargs:
+                return query(*args, **kwargs)
+            key = (name, method) + args
+            result = self.cache.get(key, _MISSING)
+            hit = result is not _MISSING
+            if not hit:
+                result = query(*args)
+                self.cache.put(key, result, [("service", name), *tags(*args)])
+            if metrics.enabled:
+                metrics.counter(f"{label}.{'hits' if hit else 'misses'}").inc()
+            return result
+        return cached
+
+    def subscribe(self, events):
+        """Invalidate entries from an EventBus's change events"""
+        for event in INVALIDATIONS:
+            events.subscribe(event, self.on_event)
+
+    def on_event(self, event, payload):
+        """Drop the entries a change event affects"""
+        for tag in INVALIDATIONS[event](payload):
+            self.cache.invalidate(tag)
+
+    def forget(self, name):
+        """Drop every entry of one service, e.g. when it is reloaded"""
+        self.cache.invalidate(("service", name))
+
+    def stats(self):
+        """Get hit/miss counts and the current size"""
+        return self.cache.stats()
+
+    def __str__(self):
+        return f"QueryCache({self.cache})"
@@ -0,0 +1,363 @@
+"""
+Sharded deployment: student data partitioned across worker processes.
+
+Students, their payments and their grades are split by a stable hash of
+student_id into N shards. Each shard is a worker process owning a
+ServiceContainer over its own directory (<data_dir>/shards/shard-<i>), so
+per-student work runs on N cores instead of one GIL. Courses and the
+library stay global in the router's own container over <data_dir>, since
+a course's capacity and a book's copies are shared by every student.
+
+    router = ShardRouter("data", shards=4)
+    router.run("add-student", student_id="S001", name="Jane Doe", email="jane@meru.edu")
+    outcomes = router.run_many([("pay", {"student_id": "S001", "amount": 500}), ...])
+    report = router.clearance_report(50000)
+    router.close()
+
+run_many() keeps the order of a batch's operations: each run of consecutive
+shard operations is sent to each shard as one message and run there in one
+deferred-save block, so shards work in parallel and each pays one flush per
+run, and global operations run in the router between runs. Global reports
+(clearance, top performers, rankings, revenue) are scatter-gathered: every
+shard computes its part concurrently and the router merges them. Cascades that cross the split are carried by the
+router: enrollments update Student.courses on the student's shard, and
+removing a student withdraws them from courses and returns their loans.
+
+CLI (runs a JSON-lines command script, see services.commands):
+
+    python -m services.sharding script.jsonl --data-dir data --shards 4
+"""
+
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+from .container import ServiceContainer
+from .commands import read_script, timed_command
+
+# Commands that act on one student's data and run on that student's shard
+SHARDED_COMMANDS = {"add-student", "remove-student", "pay", "grade"}
+
+# Commands on shared course and library data, run by the router
+GLOBAL_COMMANDS = {"create-course", "enroll", "drop", "add-book", "borrow", "return"}
+
+
+def shard_for(student_id, shards):
+    """Get the shard index holding a student (stable across runs and processes)"""
+    return zlib.crc32(student_id.encode("utf-8")) % shards
+
+
+def _student(container, student_id):
+    """Get a student's record as a dict, or None"""
+    student = container.student_registry.students.get(student_id)
+    return student.to_dict() if student else None
+
+
+def _rank_counts(container, average):
+    """Count this shard's students above and below an average, and in total"""
+    index = container.analytics_engine.rank_index
+    return index.count_above(average), index.count_below(average), len(index)
+
+
+# Read and maintenance operations a shard answers for the router: name -> function(container, *args)
+SHARD_QUERIES = {
+    "student": _student,
+    "student_count": lambda c: len(c.student_registry.students),
+    "clearance": lambda c, required_amount: c.fee_tracker.generate_clearance_report(required_amount),
+    "total_revenue": lambda c: c.fee_tracker.get_total_revenue(),
+    "top_performers": lambda c, n: c.analytics_engine.get_top_performers(n),
+    "student_average": lambda c, student_id: (
+        c.analytics_engine.get_student_average(student_id)
+        if student_id in c.analytics_engine.student_totals else None),
+    "rank_counts": _rank_counts,
+    "apply_course_changes": lambda c, changes: c.student_registry.apply_course_changes(changes),
+}
+
+
+def _shard_worker(connection, data_dir, storage_format):
+    """Serve one shard's requests until told to stop (runs in a worker process)"""
+    os.makedirs(data_dir, exist_ok=True)
+    container = ServiceContainer(data_dir, storage_format)
+    while True:
+        kind, body = connection.recv()
+        if kind == "stop":
+            connection.send(("ok", None))
+            return
+        try:
+            if kind == "commands":
+                with container.deferred_saves():
+                    outcomes = [timed_command(container, op, params) for op, params in body]
+                reply = ("ok", outcomes)
+            else:  # "query"
+                name, args = body
+                reply = ("ok", SHARD_QUERIES[name](container, *args))
+        except Exception as e:
+            reply = ("error", str(e))
+        connection.send(reply)
+
+
+class ShardRouter:
+    """Dispatches operations to shard worker processes and merges global reports"""
+
+    def __init__(self, data_dir="data", shards=None, storage_format="json"):
+        self.data_dir = data_dir
+        self.shards = shards or os.cpu_count() or 1
+        # Courses and the library; student-side cascades are forwarded to the shards
+        self.container = ServiceContainer(data_dir, storage_format, cascades=False)
+        self.container.events.subscribe("enrolled", self._on_course_change)
+        self.container.events.subscribe("dropped", self._on_course_change)
+        self._course_changes = {}  # shard -> [(student_id, course_id, enrolled)] not yet sent
+
+        self.connections = []
+        self.processes = []
+        for shard in range(self.shards):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_shard_worker, args=(child, self.shard_dir(shard), storage_format),
+                name=f"shard-{shard}", daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def shard_dir(self, shard):
+        """Get the data directory of one shard"""
+        return os.path.join(self.data_dir, "shards", f"shard-{shard}")
+
+    def shard_for(self, student_id):
+        """Get the shard index holding a student"""
+        return shard_for(student_id, self.shards)
+
+    def _on_course_change(self, event, payload):
+        """Queue Student.courses updates for the students' shards (internal method)"""
+        course_id = payload["course_id"]
+        if event == "enrolled":
+            changes = [(payload["student_id"], course_id, True)] if payload["status"] == "enrolled" else []
+        else:
+            changes = [(payload["student_id"], course_id, False)]
+            changes.extend((student_id, course_id, True) for student_id in payload["promoted"])
+        for student_id, course_id, enrolled in changes:
+            self._course_changes.setdefault(self.shard_for(student_id), []).append(
+                (student_id, course_id, enrolled))
+
+    def _send(self, shard, kind, body):
+        """Send a request to a shard worker (internal method)"""
+        self.connections[shard].send((kind, body))
+
+    def _receive(self, shards):
+        """Wait for a reply from each of several shard workers; returns {shard: result} (internal method)
+
+        Every reply is read before raising for the first failure, so no
+        shard's reply is left in its pipe to be mistaken for the next one.
+        """
+        replies = {}
+        errors = []
+        for shard in shards:
+            status, value = self.connections[shard].recv()
+            if status == "error":
+                errors.append(f"Shard {shard} failed: {value}")
+            else:
+                replies[shard] = value
+        if errors:
+            raise Exception(errors[0])
+        return replies
+
+    def _scatter(self, name, *args, shards=None):
+        """Run a shard query on several shards at once; returns {shard: result} (internal method)"""
+        shards = range(self.shards) if shards is None else shards
+        for shard in shards:
+            self._send(shard, "query", (name, args))
+        return self._receive(shards)
+
+    def _flush_course_changes(self):
+        """Send queued Student.courses updates to their shards (internal method)"""
+        changes, self._course_changes = self._course_changes, {}
+        if changes:
+            for shard, shard_changes in changes.items():
+                self._send(shard, "query", ("apply_course_changes", (shard_changes,)))
+            self._receive(changes)
+
+    def run_many(self, operations):
+        """Run (op, params) operations; returns their outcome dicts in order
+
+        Operations take effect in script order. Each run of consecutive
+        shard operations is sent to the shards together and runs on them in
+        parallel; global operations run in the router between runs, so a
+        script that alternates the two pays a round trip per run. A grade's
+        result ranks the student within their shard; student_ranking() gives
+        the rank across every shard.
+        """
+        operations = list(operations)
+        outcomes = [None] * len(operations)
+        runs = []  # [(sharded, [(position, op, params)])], consecutive operations of one kind
+        for position, (op, params) in enumerate(operations):
+            if op in SHARDED_COMMANDS and params.get("student_id"):
+                sharded = True
+            elif op in GLOBAL_COMMANDS:
+                sharded = False
+            else:
+                outcomes[position] = {"op": op, "ok": False, "ms": 0.0,
+                                      "error": f"Command '{op}' is not available in sharded mode"}
+                continue
+            if not runs or runs[-1][0] != sharded:
+                runs.append((sharded, []))
+            runs[-1][1].append((position, op, params))
+
+        with self.container.deferred_saves():
+            for sharded, items in runs:
+                if sharded:
+                    # Earlier enrollments reach Student.courses before the shards go on
+                    self._flush_course_changes()
+                    self._run_on_shards(items, outcomes)
+                else:
+                    for position, op, params in items:
+                        outcomes[position] = timed_command(self.container, op, params)
+        self._flush_course_changes()
+        return outcomes
+
+    def _run_on_shards(self, items, outcomes):
+        """Run shard operations in parallel, filling in their outcomes (internal method)"""
+        per_shard = {}  # shard -> [(position, op, params)]
+        for position, op, params in items:
+            per_shard.setdefault(self.shard_for(params["student_id"]), []).append((position, op, params))
+        for shard, shard_items in per_shard.items():
+            self._send(shard, "commands", [(op, params) for _, op, params in shard_items])
+
+        replies = self._receive(per_shard)
+        for shard, shard_items in per_shard.items():
+            for (position, op, params), outcome in zip(shard_items, replies[shard]):
+                outcomes[position] = outcome
+                if op == "remove-student" and outcome["ok"]:
+                    # The student's courses and loans live on the router
+                    self.container.course_scheduler.withdraw_student(params["student_id"])
+                    self.container.library_system.return_all_books(params["student_id"])
+
+    def run(self, op, **params):
+        """Run one operation; returns its result or raises on failure"""
+        outcome = self.run_many([(op, params)])[0]
+        if not outcome["ok"]:
+            raise Exception(outcome["error"])
+        return outcome["result"]
+
+    def get_student(self, student_id):
+        """Get a student's record (as a dict) from their shard"""
+        shard = self.shard_for(student_id)
+        return self._scatter("student", student_id, shards=[shard])[shard]
+
+    def student_count(self):
+        """Number of students across every shard"""
+        return sum(self._scatter("student_count").values())
+
+    def total_revenue(self):
+        """Total payments across every shard"""
+        return sum(self._scatter("total_revenue").values())
+
+    def clearance_report(self, required_amount):
+        """Fee clearance report across every shard"""
+        cleared, pending = [], []
+        for report in self._scatter("clearance", required_amount).values():
+            cleared.extend(report["cleared_students"])
+            pending.extend(report["pending_students"])
+        students = len(cleared) + len(pending)
+        return {
+            "required_amount": required_amount,
+            "cleared_students": cleared,
+            "pending_students": pending,
+            "clearance_rate": len(cleared) / students if students else 0
+        }
+
+    def top_performers(self, n=5):
+        """Top n students by average across every shard"""
+        candidates = [p for performers in self._scatter("top_performers", n).values() for p in performers]
+        leaders = heapq.nlargest(n, candidates, key=lambda p: p["average_score"])
+        return [dict(p, rank=i + 1) for i, p in enumerate(leaders)]
+
+    def student_ranking(self, student_id):
+        """A student's rank among all students, counted on every shard"""
+        shard = self.shard_for(student_id)
+        average = self._scatter("student_average", student_id, shards=[shard])[shard]
+        if average is None:
+            return None
+        counts = self._scatter("rank_counts", average).values()
+        above = sum(c[0] for c in counts)
+        below = sum(c[1] for c in counts)
+        total = sum(c[2] for c in counts)
+        return {
+            "rank": above + 1,
+            "total_students": total,
+            "average_score": average,
+            "percentile": below / total * 100
+        }
+
+    def close(self):
+        """Stop the shard workers"""
+        for shard, connection in enumerate(self.connections):
+            try:
+                self._send(shard, "stop", None)
+                connection.recv()
+            except (EOFError, OSError):
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join(timeout=5)
+        self.connections, self.processes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __str__(self):
+        return f"ShardRouter({self.data_dir}, {self.shards} shards)"
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Run a JSON-lines command script against sharded data")
+    parser.add_argument("script")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--shards", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="operations sent to the shards at a time")
+    parser.add_argument("--verbose", action="store_true", help="print every outcome")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    succeeded = failed = 0
+    with ShardRouter(args.data_dir, args.shards) as router:
+        batch = []
+
+        def run_batch():
+            nonlocal succeeded, failed
+            for outcome in router.run_many(batch):
+                if outcome["ok"]:
+                    succeeded += 1
+                else:
+                    failed += 1
+                if args.verbose or not outcome["ok"]:
+                    print(json.dumps(outcome, default=str))
+            batch.clear()
+
+        for line_number, op, params in read_script(args.script):
+            if op is None:
+                failed += 1
+                print(json.dumps({"line": line_number, "ok": False, "error": params["error"]}))
+                continue
+            batch.append((op, params))
+            if len(batch) >= args.batch_size:
+                run_batch()
+        run_batch()
+        shards = router.shards
+
+    seconds = time.perf_counter() - started
+    print(f"✓ {succeeded:,} succeeded, {failed:,} failed on {shards} shard(s) in {seconds:.2f}s "
+          f"({(succeeded + failed) / seconds:,.0f} ops/s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,409 @@
+"""
+Point-in-time snapshots of a data directory, with journal replay on restore.
+
+A snapshot is a directory of hard links to the services' data files. Every
+save writes a new file and renames it over the old one (utils.helpers.
+atomic_open), so a linked file is never modified afterwards: a snapshot
+costs one link per file, and files unchanged between snapshots share
+storage with each other and with the live data.
+
+Between snapshots, a journal records the changed records carried by the
+services' change events (the full record after each change, or a
+deletion). Each snapshot starts a new journal segment, so restoring to a
+point in time links back the nearest earlier snapshot and replays only that
+snapshot's segment up to the target time. Recovery cost is bounded by the
+snapshot interval, not the size of the history.
+
+    history = SnapshotManager(container)       # starts journaling
+    history.snapshot()                          # or history.start(interval=3600)
+    history.restore("2026-10-19T09:30:00")
+
+Layout: <data_dir>/history/<snapshot id>/ holds the links and meta.json,
+and <data_dir>/history/<snapshot id>.journal.jsonl holds the changes made
+after it.
+
+CLI:
+
+    python -m services.snapshots --data-dir data snapshot
+    python -m services.snapshots --data-dir data list
+    python -m services.snapshots --data-dir data restore --to "2026-10-19 09:30"
+    python -m services.snapshots --data-dir data prune --keep-last 24
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from .container import SERVICE_FACTORIES, ARCHIVE_FILES, ServiceContainer
+from utils.helpers import load_data, save_data
+from utils.metrics import metrics
+
+HISTORY_DIR = "history"
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+def _student(c, p):
+    student = c.student_registry.students.get(p["student_id"])
+    return "student_registry", p["student_id"], student.to_dict() if student else None
+
+
+def _course(c, p):
+    course = c.course_scheduler.courses.get(p["course_id"])
+    return "course_scheduler", p["course_id"], course.to_dict() if course else None
+
+
+def _book(c, p):
+    book = c.library_system.books.get(p["isbn"])
+    return "library_system", p["isbn"], book.to_dict() if book else None
+
+
+def _transaction(c, p):
+    transaction = c.fee_tracker.transactions.get(p["transaction_id"])
+    return "fee_tracker", p["transaction_id"], transaction.to_dict() if transaction else None
+
+
+def _grades(c, p):
+    grades = c.analytics_engine.grades.get(p["student_id"])
+    records = [{'course_id': cid, 'score': score} for cid, score in grades] if grades else None
+    return "analytics_engine", p["student_id"], records
+
+
+# Event -> function(container, payload) giving (service, key, record after the change or None if deleted)
+JOURNAL_RECORDS = {
+    "student_added": _student,
+    "student_updated": _student,
+    "student_removed": _student,
+    "course_created": _course,
+    "enrolled": _course,
+    "dropped": _course,
+    "book_added": _book,
+    "book_borrowed": _book,
+    "book_returned": _book,
+    "payment_added": _transaction,
+    "grade_added": _grades,
+    "grades_removed": _grades,
+}
+
+# Events whose changes reach beyond the data files; a snapshot is taken instead of journaling
+# (once the transaction making the change has committed)
+CHECKPOINT_EVENTS = {"transactions_archived"}
+
+
+def parse_time(value):
+    """Parse an ISO date/time (local time) or a Unix timestamp into a Unix timestamp"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}'; use e.g. 2026-10-19T09:30:00")
+
+
+class SnapshotManager:
+    """Takes snapshots of a container's data files and journals changes between them"""
+
+    def __init__(self, container, keep_last=24, max_age=None, fsync=False):
+        self.container = container
+        self.history_dir = os.path.join(container.data_dir, HISTORY_DIR)
+        # Retention: always keep the newest keep_last snapshots, and any younger than max_age seconds
+        self.keep_last = keep_last
+        self.max_age = max_age
+        self.fsync = fsync  # fsync the journal after every entry
+        self.lock = threading.RLock()
+        self.journal = None
+        self.current = None  # snapshot whose journal segment is being written
+        self._seq = 0
+        self._timer = None
+        self._stopping = threading.Event()
+        os.makedirs(self.history_dir, exist_ok=True)
+
+        snapshots = self.snapshots()
+        if snapshots:
+            self._open_journal(snapshots[-1]["id"])
+        else:
+            self.snapshot(reason="base")  # for the journal to build on
+        container.events.subscribe("*", self._on_event)
+
+    def tracked_files(self):
+        """Get the data file names (inside the data directory) that snapshots cover"""
+        names = [os.path.basename(self.container.data_file(name)) for name in SERVICE_FACTORIES]
+        return names + list(ARCHIVE_FILES.values())
+
+    def snapshots(self):
+        """Get snapshot metadata, oldest first"""
+        snapshots = []
+        for entry in os.listdir(self.history_dir):
+            meta_file = os.path.join(self.history_dir, entry, "meta.json")
+            if os.path.exists(meta_file):
+                with open(meta_file, 'r', encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+        return sorted(snapshots, key=lambda s: s["time"])
+
+    def snapshot(self, reason="manual"):
+        """Take a consistent snapshot of every data file; returns its metadata
+
+        Call it with no writes in flight (start() takes a quiesce hook for
+        that); changes pending in a deferred_saves() block are flushed first,
+        but an open transaction's are left out until it commits.
+        In shared mode it holds the data directory lock, so other processes
+        sharing it can't write mid-snapshot.
+        """
+        with self._exclusive(), self.lock:
+            started = time.perf_counter()
+            if self.container._dirty and not self.container.in_transaction:
+                self.container.flush()
+            taken = time.time()
+            snapshot_id = time.strftime("%Y%m%dT%H%M%S", time.localtime(taken)) + f".{int(taken * 1e6) % 1000000:06d}"
+            target = os.path.join(self.history_dir, snapshot_id)
+            os.makedirs(target)
+            files = []
+            for name in self.tracked_files():
+                source = os.path.join(self.container.data_dir, name)
+                if os.path.exists(source):
+                    _link_or_copy(source, os.path.join(target, name))
+                    files.append(name)
+            meta = {"id": snapshot_id, "time": taken, "reason": reason, "files": files}
+            with open(os.path.join(target, "meta.json"), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2)
+
+            self._open_journal(snapshot_id)
+            self.prune()
+        if metrics.enabled:
+            metrics.timer("snapshots.take").observe((time.perf_counter() - started) * 1000)
+        return meta
+
+    def _exclusive(self):
+        """Hold off other writers: the data directory lock if other processes
+        share it, otherwise the container's write_lock (internal method)
+
+        exclusive() reloads services changed since they were loaded, which
+        outside shared mode would mistake this process's own saves for
+        another's. Either way write_lock is taken before self.lock, the
+        order a committing transaction takes them in.
+        """
+        return self.container.exclusive() if self.container.shared else self.container.write_lock
+
+    def _open_journal(self, snapshot_id):
+        """Start writing the journal segment that follows a snapshot (internal method)"""
+        if self.journal:
+            self.journal.close()
+        self.current = snapshot_id
+        self.journal = open(os.path.join(self.history_dir, snapshot_id + JOURNAL_SUFFIX), 'a', encoding='utf-8')
+        self._seq = 0
+
+    def _on_event(self, event, payload):
+        """Journal the records a change event touched (internal method)"""
+        if event in CHECKPOINT_EVENTS:
+            # Inside a transaction the change may still be undone; wait for its commit
+            if not self.container.in_transaction:
+                self.snapshot(reason=event)
+            return
+        if event == "committed":
+            checkpoints = [e for e, _ in payload["events"] if e in CHECKPOINT_EVENTS]
+            if checkpoints:
+                self.snapshot(reason=checkpoints[0])
+            return
+        if event == "rolled_back":
+            # Journal the undone records as they are again
+            changes = [(e, p) for e, p in payload["events"] if e in JOURNAL_RECORDS]
+        else:
+            changes = [(event, payload)] if event in JOURNAL_RECORDS else []
+        if not changes:
+            return
+        with self.lock:
+            for change_event, change_payload in changes:
+                service, key, record = JOURNAL_RECORDS[change_event](self.container, change_payload)
+                self._seq += 1
+                entry = {"seq": self._seq, "time": time.time(), "event": event,
+                         "service": service, "key": key, "record": record}
+                self.journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.journal.flush()
+            if self.fsync:
+                os.fsync(self.journal.fileno())
+
+    def restore(self, target_time=None):
+        """Rebuild the data files as they were at target_time (default: now)
+
+        Links back the newest snapshot taken at or before target_time and
+        replays its journal up to target_time. The container's services are
+        unloaded and reload from the restored files on next use. Returns a
+        summary of the snapshot used and the changes replayed.
+        """
+        started = time.perf_counter()
+        target = time.time() if target_time is None else parse_time(target_time)
+        with self._exclusive(), self.lock:
+            candidates = [s for s in self.snapshots() if s["time"] <= target]
+            if not candidates:
+                raise ValueError("No snapshot taken at or before that time")
+            base = candidates[-1]
+
+            self.container.close()
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+
+            data_dir = self.container.data_dir
+            snapshot_dir = os.path.join(self.history_dir, base["id"])
+            for name in self.tracked_files():
+                path = os.path.join(data_dir, name)
+                if os.path.exists(path):
+                    os.remove(path)
+                if name in base["files"]:
+                    _link_or_copy(os.path.join(snapshot_dir, name), path)
+
+            replayed = self._replay(base["id"], target)
+            # Journal what happens next on top of the restored state
+            meta = self.snapshot(reason="restore")
+
+        return {
+            "snapshot": base["id"],
+            "replayed": replayed,
+            "new_snapshot": meta["id"],
+            "seconds": time.perf_counter() - started
+        }
+
+    def _replay(self, snapshot_id, target):
+        """Apply a journal segment's changes up to target to the data files (internal method)"""
+        journal_file = os.path.join(self.history_dir, snapshot_id + JOURNAL_SUFFIX)
+        if not os.path.exists(journal_file):
+            return 0
+        files = {}  # service -> loaded data dict
+        replayed = 0
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn final line from a crash
+                if entry["time"] > target:
+                    break
+                service = entry["service"]
+                if service not in files:
+                    files[service] = load_data(self.container.data_file(service)) or {}
+                if entry["record"] is None:
+                    files[service].pop(entry["key"], None)
+                else:
+                    files[service][entry["key"]] = entry["record"]
+                replayed += 1
+        for service, data in files.items():
+            if not save_data(data, self.container.data_file(service)):
+                raise Exception(f"Failed to write restored {service} data")
+        return replayed
+
+    def prune(self):
+        """Apply the retention policy; returns the IDs of deleted snapshots"""
+        with self.lock:
+            snapshots = self.snapshots()
+            now = time.time()
+            deleted = []
+            for index, snapshot in enumerate(snapshots):
+                newest = len(snapshots) - index <= max(self.keep_last or 0, 1)
+                young = self.max_age is not None and now - snapshot["time"] <= self.max_age
+                if newest or young or snapshot["id"] == self.current:
+                    continue
+                shutil.rmtree(os.path.join(self.history_dir, snapshot["id"]), ignore_errors=True)
+                journal_file = os.path.join(self.history_dir, snapshot["id"] + JOURNAL_SUFFIX)
+                if os.path.exists(journal_file):
+                    os.remove(journal_file)
+                deleted.append(snapshot["id"])
+            return deleted
+
+    def start(self, interval, quiesce=None):
+        """Take a snapshot every interval seconds in a background thread
+
+        quiesce, if given, is a function returning a context manager that
+        holds off writers while the snapshot is taken (e.g. the API server's
+        service locks).
+        """
+        if self._timer is not None:
+            return
+        self._stopping.clear()
+
+        def run():
+            while not self._stopping.wait(interval):
+                if quiesce:
+                    with quiesce():
+                        self.snapshot(reason="periodic")
+                else:
+                    self.snapshot(reason="periodic")
+
+        self._timer = threading.Thread(target=run, name="snapshots", daemon=True)
+        self._timer.start()
+
+    def stop(self):
+        """Stop periodic snapshots and close the journal"""
+        if self._timer is not None:
+            self._stopping.set()
+            self._timer.join()
+            self._timer = None
+        with self.lock:
+            if self.journal:
+                self.journal.close()
+                self.journal = None
+
+    def __str__(self):
+        return f"SnapshotManager({self.history_dir}, current {self.current})"
+
+
+def _link_or_copy(source, target):
+    """Hard-link a file, copying it where links aren't supported"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Take, list, prune and restore data snapshots")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--storage-format", choices=["json", "binary"], default="json")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("snapshot", help="snapshot the data directory now")
+    subparsers.add_parser("list", help="list snapshots")
+    restore = subparsers.add_parser("restore", help="restore the data as of a time (default: latest)")
+    restore.add_argument("--to", dest="target", help="ISO date/time, e.g. 2026-10-19T09:30")
+    prune = subparsers.add_parser("prune", help="delete snapshots outside the retention policy")
+    prune.add_argument("--keep-last", type=int, default=24)
+    prune.add_argument("--max-age-days", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    container = ServiceContainer(args.data_dir, args.storage_format)
+    history = SnapshotManager(container, **({"keep_last": args.keep_last} if args.command == "prune" else {}))
+    try:
+        if args.command == "snapshot":
+            meta = history.snapshot()
+            print(f"✓ Snapshot {meta['id']} ({len(meta['files'])} files)")
+        elif args.command == "list":
+            for snapshot in history.snapshots():
+                journal_file = os.path.join(history.history_dir, snapshot["id"] + JOURNAL_SUFFIX)
+                changes = sum(1 for _ in open(journal_file, encoding='utf-8')) if os.path.exists(journal_file) else 0
+                print(f"{snapshot['id']}  {snapshot['reason']:<9} {len(snapshot['files'])} files, "
+                      f"{changes} journaled changes since")
+        elif args.command == "restore":
+            summary = history.restore(args.target)
+            print(f"✓ Restored from snapshot {summary['snapshot']} + {summary['replayed']} journaled "
+                  f"changes in {summary['seconds']:.3f}s")
+        else:
+            if args.max_age_days is not None:
+                history.max_age = args.max_age_days * 86400
+            deleted = history.prune()
+            print(f"✓ Deleted {len(deleted)} snapshot(s)")
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    finally:
+        history.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,23 @@
 import os
 from models.student import Student
-from utils.helpers import save_to_json, load_from_json
+from utils.helpers import save_data, load_data
 from utils.validators import validate_student_id
+from utils.metrics import timed
+from .transactions import SaveError, change
 
 class StudentRegistry:
-    def __init__(self, data_file="data/students.json"):
+    def __init__(self, data_file="data/students.json", autoload=True):
         self.students = {}  # Hash table: student_id -> Student object
         self.data_file = data_file
-        self._load_data()
+        self.events = None  # EventBus notified of saved changes, attached by ServiceContainer
+        self.undo_journal = None  # UndoJournal of an open transaction, attached by ServiceContainer
+        if autoload:
+            self._load_data()
 
+    @timed()
     def _load_data(self):
-        """Load student data from JSON file"""
-        data = load_from_json(self.data_file)
+        """Load student data from storage"""
+        data = load_data(self.data_file)
         if data:
             for student_data in data.values():
                 try:
@@ -21,13 +27,26 @@ class StudentRegistry:
                     print(f"Error loading student {student_data.get('student_id')}: {e}")
             print(f"✓ Loaded {len(self.students)} students from storage")
 
+    def _populate(self, students):
+        """Add already-validated Student objects (used by the parallel loader)"""
+        for student in students:
+            self.students[student.student_id] = student
+        print(f"✓ Loaded {len(self.students)} students from storage")
+
+    @timed()
     def _save_data(self):
-        """Save student data to JSON file"""
+        """Save student data to storage"""
         data = {sid: student.to_dict() for sid, student in self.students.items()}
-        if save_to_json(data, self.data_file):
+        if save_data(data, self.data_file):
             return True
         return False
 
+    def _emit(self, event, **payload):
+        """Publish a change event if an event bus is attached"""
+        if self.events:
+            self.events.publish(event, **payload)
+
+    @timed()
     def add_student(self, student_id, name, email, year=1):
         """Add a new student to the registry"""
         try:
@@ -38,63 +57,100 @@ class StudentRegistry:
             if student_id in self.students:
                 raise ValueError(f"Student {student_id} already exists")
 
-            # Create and store student
+            # Create, store and save the student
             student = Student(student_id, name, email, year)
-            self.students[student_id] = student
+            with change(self, "Failed to save student data") as undo:
+                self.students[student_id] = student
+                undo(self.students.pop, student_id)
 
-            # Save to persistent storage
-            if self._save_data():
-                return student
-            else:
-                # Rollback if save fails
-                del self.students[student_id]
-                raise Exception("Failed to save student data")
+            self._emit("student_added", student_id=student_id)
+            return student
 
         except Exception as e:
             raise Exception(f"Failed to add student: {e}")
 
+    @timed()
     def get_student(self, student_id):
         """Get student by ID - O(1) lookup"""
         if not validate_student_id(student_id):
             raise ValueError("Invalid student ID format")
         return self.students.get(student_id)
 
+    @timed()
     def remove_student(self, student_id):
         """Remove student from registry"""
         try:
             if student_id not in self.students:
                 raise ValueError(f"Student {student_id} not found")
 
-            student = self.students.pop(student_id)
+            with change(self, "Failed to save data after removal") as undo:
+                student = self.students.pop(student_id)
+                undo(self.students.__setitem__, student_id, student)
 
-            if self._save_data():
-                return student
-            else:
-                # Rollback if save fails
-                self.students[student_id] = student
-                raise Exception("Failed to save data after removal")
+            self._emit("student_removed", student_id=student_id)
+            return student
 
         except Exception as e:
             raise Exception(f"Failed to remove student: {e}")
 
+    @timed()
     def update_student_email(self, student_id, new_email):
         """Update student email"""
         student = self.get_student(student_id)
         if student:
-            old_email = student.email
-            student.email = new_email
             try:
-                student._validate_inputs()  # Re-validate
-                if self._save_data():
-                    return True
-                else:
-                    student.email = old_email  # Rollback
-                    return False
-            except ValueError as e:
-                student.email = old_email  # Rollback
-                raise e
+                with change(self, "Failed to save student data") as undo:
+                    undo(setattr, student, "email", student.email)
+                    student.email = new_email
+                    student._validate_inputs()  # Re-validate
+            except SaveError:
+                return False
+            self._emit("student_updated", student_id=student_id)
+            return True
         return False
 
+    @timed()
+    def apply_course_changes(self, changes):
+        """Keep students' course lists in step with the course scheduler
+
+        changes is a list of (student_id, course_id, enrolled) tuples; unknown
+        students are skipped. Saves once; returns the number of students changed.
+        """
+        changed = {}  # student_ids changed, in order
+        with change(self, "Failed to save student course changes") as undo:
+            for student_id, course_id, enrolled in changes:
+                student = self.students.get(student_id)
+                if student is None:
+                    continue
+                courses = list(student.courses)
+                if student.add_course(course_id) if enrolled else student.drop_course(course_id):
+                    undo(setattr, student, "courses", courses)
+                    changed[student_id] = True
+
+        for student_id in changed:
+            self._emit("student_updated", student_id=student_id)
+        return len(changed)
+
+    @timed()
+    def apply_payments(self, payments):
+        """Add (student_id, amount) payments to students' fees paid, saving once
+
+        Unknown students are skipped; returns the number of payments applied.
+        """
+        applied = []
+        with change(self, "Failed to save student payment totals") as undo:
+            for student_id, amount in payments:
+                student = self.students.get(student_id)
+                if student is not None:
+                    undo(setattr, student, "fees_paid", student.fees_paid)
+                    student.add_payment(amount)
+                    applied.append((student, amount))
+
+        for student_id in dict.fromkeys(student.student_id for student, _ in applied):
+            self._emit("student_updated", student_id=student_id)
+        return len(applied)
+
+    @timed()
     def search_students(self, name_filter=""):
         """Search students by name (case-insensitive)"""
         if not name_filter:
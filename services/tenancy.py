@@ -0,0 +1,244 @@
+"""
+Multi-campus tenancy: one process hosting many campuses' data.
+
+Each campus (tenant) has its own data root, <root>/<campus>, holding the
+usual data files. TenantManager opens a campus's ServiceContainer on first
+use (its services then load lazily as usual) and keeps at most max_open
+containers open, unloading the least recently used idle campus to cap
+memory. Containers in use (see use()) are never unloaded.
+
+    tenants = TenantManager("data/campuses", max_open=8)
+    with tenants.use("main") as container:
+        container.student_registry.add_student("S001", "Jane Doe", "jane@meru.edu")
+    print(tenants.summary_report()["totals"])
+
+Cross-campus reports visit every campus; campuses that aren't open are
+opened just for the report and closed again, so a report doesn't push the
+busy campuses out of memory.
+
+CLI:
+
+    python -m services.tenancy --root data/campuses create main
+    python -m services.tenancy --root data/campuses report
+"""
+
+import argparse
+import heapq
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from .container import ServiceContainer
+from utils.metrics import metrics
+
+CAMPUS_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+
+def campus_summary(container):
+    """Headline figures for one campus"""
+    engine = container.analytics_engine
+    return {
+        "students": len(container.student_registry.students),
+        "courses": len(container.course_scheduler.courses),
+        "books": len(container.library_system),
+        "transactions": len(container.fee_tracker),
+        "revenue": container.fee_tracker.get_total_revenue(),
+        "grades": engine.overall_count,
+        "average_score": engine.get_overall_average(),
+    }
+
+
+class TenantManager:
+    """Opens campus containers on demand and unloads idle ones (LRU)"""
+
+    def __init__(self, root="data/campuses", max_open=8, storage_format="json", container_factory=None):
+        self.root = root
+        self.max_open = max_open
+        # Builds a campus container from its data directory, e.g. to give each its own QueryCache
+        self.container_factory = container_factory or (lambda data_dir: ServiceContainer(data_dir, storage_format))
+        self.open = OrderedDict()  # campus -> container, least recently used first
+        self.pins = {}  # campus -> number of callers currently using it
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def campus_dir(self, campus):
+        """Get a campus's data directory"""
+        if not isinstance(campus, str) or not CAMPUS_NAME.match(campus):
+            raise ValueError("Campus name must be letters, digits, '-' or '_' (up to 64 characters)")
+        return os.path.join(self.root, campus)
+
+    def campuses(self):
+        """Get the names of every campus"""
+        return sorted(name for name in os.listdir(self.root)
+                      if CAMPUS_NAME.match(name) and os.path.isdir(os.path.join(self.root, name)))
+
+    def exists(self, campus):
+        """Check whether a campus exists"""
+        return os.path.isdir(self.campus_dir(campus))
+
+    def create_campus(self, campus):
+        """Create an empty campus"""
+        data_dir = self.campus_dir(campus)
+        if os.path.exists(data_dir):
+            raise ValueError(f"Campus {campus} already exists")
+        os.makedirs(data_dir)
+        return data_dir
+
+    def get(self, campus):
+        """Get a campus's container, opening it if needed
+
+        Prefer use() in concurrent code: a container from get() can be
+        unloaded once other campuses push it out of the LRU.
+        """
+        with self.lock:
+            container = self._open(campus)
+            self._evict()
+        return container
+
+    @contextmanager
+    def use(self, campus):
+        """Use a campus's container, keeping it open until the block exits"""
+        with self.lock:
+            container = self._open(campus)
+            self._pin(campus)
+        try:
+            yield container
+        finally:
+            with self.lock:
+                self._unpin(campus)
+                self._evict()
+
+    def _pin(self, campus):
+        """Keep a campus open while it is in use (internal method, lock held)"""
+        self.pins[campus] = self.pins.get(campus, 0) + 1
+
+    def _unpin(self, campus):
+        """Release a _pin (internal method, lock held)"""
+        self.pins[campus] -= 1
+        if not self.pins[campus]:
+            del self.pins[campus]
+
+    def _open(self, campus):
+        """Get or open a container and mark it most recently used (internal method, lock held)"""
+        container = self.open.get(campus)
+        if container is None:
+            if not self.exists(campus):
+                raise ValueError(f"Campus {campus} not found")
+            container = self.container_factory(self.campus_dir(campus))
+            self.open[campus] = container
+            if metrics.enabled:
+                metrics.counter("tenants.opened").inc()
+        self.open.move_to_end(campus)
+        return container
+
+    def _evict(self):
+        """Unload least recently used idle campuses beyond max_open (internal method, lock held)"""
+        for campus in list(self.open):
+            if len(self.open) <= self.max_open:
+                break
+            if campus not in self.pins:
+                self.open.pop(campus).close()
+                if metrics.enabled:
+                    metrics.counter("tenants.evicted").inc()
+
+    def unload(self, campus):
+        """Unload a campus if it is open and idle; returns whether it was unloaded"""
+        with self.lock:
+            if campus in self.open and campus not in self.pins:
+                self.open.pop(campus).close()
+                return True
+        return False
+
+    def open_campuses(self):
+        """Get the open campuses, least recently used first"""
+        with self.lock:
+            return list(self.open)
+
+    def aggregate(self, func, campuses=None):
+        """Run func(container) on every campus; returns {campus: result}
+
+        Campuses that aren't open are opened just for the call and closed
+        again, leaving the LRU untouched.
+        """
+        results = {}
+        for campus in campuses or self.campuses():
+            with self.lock:
+                container = self.open.get(campus)
+                if container is not None:
+                    self._pin(campus)
+            if container is not None:
+                try:
+                    results[campus] = func(container)
+                finally:
+                    with self.lock:
+                        self._unpin(campus)
+                continue
+            container = self.container_factory(self.campus_dir(campus))
+            try:
+                results[campus] = func(container)
+            finally:
+                container.close()
+        return results
+
+    def summary_report(self):
+        """Headline figures per campus and totalled across campuses"""
+        campuses = self.aggregate(campus_summary)
+        totals = {key: sum(summary[key] for summary in campuses.values())
+                  for key in ("students", "courses", "books", "transactions", "revenue", "grades")}
+        graded = [(s["average_score"], s["grades"]) for s in campuses.values() if s["grades"]]
+        totals["average_score"] = sum(a * n for a, n in graded) / totals["grades"] if graded else 0.0
+        return {"campuses": campuses, "totals": totals}
+
+    def top_performers(self, n=5):
+        """Top n students by average across every campus"""
+        performers = self.aggregate(lambda c: c.analytics_engine.get_top_performers(n))
+        candidates = [dict(p, campus=campus) for campus, top in performers.items() for p in top]
+        leaders = heapq.nlargest(n, candidates, key=lambda p: p["average_score"])
+        return [dict(p, rank=i + 1) for i, p in enumerate(leaders)]
+
+    def close(self):
+        """Unload every campus"""
+        with self.lock:
+            for container in self.open.values():
+                container.close()
+            self.open.clear()
+
+    def __str__(self):
+        return f"TenantManager({self.root}, {len(self.open)}/{self.max_open} open)"
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Manage campuses hosted in one data root")
+    parser.add_argument("--root", default="data/campuses")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="list campuses")
+    create = subparsers.add_parser("create", help="create an empty campus")
+    create.add_argument("campus")
+    subparsers.add_parser("report", help="print headline figures for every campus")
+    top = subparsers.add_parser("top", help="print the top students across campuses")
+    top.add_argument("-n", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tenants = TenantManager(args.root)
+    try:
+        if args.command == "list":
+            for campus in tenants.campuses():
+                print(campus)
+        elif args.command == "create":
+            print(f"✓ Created {tenants.create_campus(args.campus)}")
+        elif args.command == "report":
+            print(json.dumps(tenants.summary_report(), indent=2))
+        else:
+            print(json.dumps(tenants.top_performers(args.n), indent=2, default=str))
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Undo journal and atomic commits for changes that span services.
+
+Every service change runs inside change(): the mutation records how to
+undo each step it takes, then the service saves. If the mutation raises or
+the save fails, the recorded steps are undone newest first, so the
+in-memory state is exactly what it was before the change.
+
+ServiceContainer.transaction() groups several changes, across services and
+including the cascades they trigger, into one unit:
+
+    with container.transaction():
+        container.course_scheduler.enroll_student("CS101", "S001")
+        container.fee_tracker.add_payment("S001", 45000, "CS101 course fee")
+
+Inside the block the services share one undo journal and their saves are
+deferred. When the block exits, every changed service is written in one
+commit (see commit_files); if the block raises or the commit fails, the
+whole journal is undone and nothing reaches disk.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from utils.helpers import atomic_open
+from utils.metrics import metrics
+
+COMMIT_FILE = ".commit.json"  # record of a multi-file commit in progress
+
+
+class SaveError(Exception):
+    """A change was undone because its service failed to save"""
+
+
+class Rollback(Exception):
+    """Raise inside ServiceContainer.transaction() to undo it without an error"""
+
+
+class UndoJournal:
+    """Steps that undo in-memory changes, replayed newest first"""
+
+    def __init__(self):
+        self.entries = []  # (function, args) that undo one step each
+
+    def record(self, undo, *args):
+        """Record undo(*args) as the way to reverse the step just taken"""
+        self.entries.append((undo, args))
+
+    def mark(self):
+        """Get a position to roll back to"""
+        return len(self.entries)
+
+    def rollback(self, mark=0):
+        """Undo every step recorded after mark, newest first; returns the number undone"""
+        undone = 0
+        while len(self.entries) > mark:
+            undo, args = self.entries.pop()
+            undo(*args)
+            undone += 1
+        if undone and metrics.enabled:
+            metrics.counter("transactions.steps_undone").inc(undone)
+        return undone
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        return f"UndoJournal({len(self.entries)} steps)"
+
+
+@contextmanager
+def change(service, failure):
+    """Apply one service change: yields the function that records its undo steps
+
+    The service saves when the block exits, unless the block recorded no
+    steps (nothing changed). If the block raises or the save fails (raising
+    SaveError with the failure message), the change's steps are undone.
+    Inside a transaction the service's journal is the transaction's, so the
+    steps stay recorded for a later rollback.
+    """
+    journal = service.undo_journal if service.undo_journal is not None else UndoJournal()
+    mark = journal.mark()
+    try:
+        yield journal.record
+        if journal.mark() == mark:
+            return
+        saved = service._save_data()
+    except BaseException:
+        journal.rollback(mark)
+        raise
+    if not saved:
+        journal.rollback(mark)
+        raise SaveError(failure)
+
+
+def staged_path(path):
+    """Get the file a commit writes before renaming it over path (keeps the extension)"""
+    base, extension = os.path.splitext(path)
+    return f"{base}.staged{extension}"
+
+
+def commit_files(data_dir, writes):
+    """Write several files so that either all of them change or none do
+
+    writes maps each target path to a function(path) that writes the new
+    version to path and returns whether it succeeded. Every new version is
+    written to a staged file first; only once all are written is a commit
+    record saved and the staged files renamed over their targets. A commit
+    interrupted during the renames is finished by recover_commit().
+    Returns True, or False (leaving every target untouched) if a write failed.
+    """
+    staged = {}
+    try:
+        for path, write in writes.items():
+            if not write(staged_path(path)):
+                raise SaveError(f"Failed to write {path}")
+            staged[path] = staged_path(path)
+    except Exception:
+        for staged_file in staged.values():
+            os.remove(staged_file)
+        return False
+
+    record = os.path.join(data_dir, COMMIT_FILE)
+    with atomic_open(record, 'w', encoding='utf-8') as f:
+        json.dump(staged, f)
+    for path, staged_file in staged.items():
+        os.replace(staged_file, path)
+    os.remove(record)
+    if metrics.enabled:
+        metrics.histogram("transactions.files_committed").observe(len(staged))
+    return True
+
+
+def recover_commit(data_dir):
+    """Finish a commit interrupted after its record was written; returns whether one was found"""
+    record = os.path.join(data_dir, COMMIT_FILE)
+    if not os.path.exists(record):
+        return False
+    with open(record, 'r', encoding='utf-8') as f:
+        staged = json.load(f)
+    for path, staged_file in staged.items():
+        if os.path.exists(staged_file):
+            os.replace(staged_file, path)
+    os.remove(record)
+    return True
@@ -7,10 +7,13 @@ from services.analytics_engine import AnalyticsEngine
 class TestAnalyticsEngine(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures"""
-        self.analytics = AnalyticsEngine()
-        # Clear any existing data
-        self.analytics.grades.clear()
-        self.analytics.course_grades.clear()
+        # Start without any existing data
+        self.analytics = AnalyticsEngine("data/test_grades.json", autoload=False)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        if os.path.exists("data/test_grades.json"):
+            os.remove("data/test_grades.json")
 
     def test_add_grade(self):
         """Test adding a grade"""
@@ -56,5 +59,96 @@ class TestAnalyticsEngine(unittest.TestCase):
         self.assertEqual(top_students[0]["student_id"], "S003")  # Highest score
         self.assertEqual(top_students[1]["student_id"], "S002")  # Second highest
 
+    def test_top_performers_after_average_drops(self):
+        """Test leaderboard stays exact when a leader's average falls"""
+        for i in range(1, 13):
+            self.analytics.add_grade(f"S{i:03d}", "CS101", 50 + i)
+
+        # S012 (62) drops to 31, below every other student
+        self.analytics.add_grade("S012", "MATH201", 0)
+
+        top_performers = self.analytics.get_top_performers(10)
+        self.assertEqual([p["student_id"] for p in top_performers],
+                         [f"S{i:03d}" for i in range(11, 1, -1)])
+
+    def test_student_ranking(self):
+        """Test rank and percentile track average changes"""
+        self.analytics.add_grade("S001", "CS101", 70)
+        self.analytics.add_grade("S002", "CS101", 90)
+        self.analytics.add_grade("S003", "CS101", 80)
+
+        ranking = self.analytics.get_student_ranking("S003")
+        self.assertEqual(ranking["rank"], 2)
+        self.assertEqual(ranking["total_students"], 3)
+        self.assertAlmostEqual(ranking["percentile"], 100 / 3)
+
+        # Raising S001's average to 85 moves them above S003
+        self.analytics.add_grade("S001", "MATH201", 100)
+        self.assertEqual(self.analytics.get_student_ranking("S001")["rank"], 2)
+        self.assertEqual(self.analytics.get_student_ranking("S003")["rank"], 3)
+        self.assertIsNone(self.analytics.get_student_ranking("S999"))
+
+    def test_grade_statistics(self):
+        """Test columnar statistics, distribution and percentiles"""
+        self.analytics.add_grade("S001", "CS101", 60)
+        self.analytics.add_grade("S002", "CS101", 80)
+        self.analytics.add_grade("S001", "MATH201", 100)
+
+        course_stats = self.analytics.get_course_statistics()
+        self.assertEqual(course_stats["CS101"]["count"], 2)
+        self.assertAlmostEqual(course_stats["CS101"]["mean"], 70.0)
+        self.assertAlmostEqual(course_stats["CS101"]["std"], 10.0)
+        self.assertAlmostEqual(self.analytics.get_student_statistics()["S001"]["mean"], 80.0)
+        for course_id, stats in course_stats.items():
+            one = self.analytics.get_course_stats(course_id)
+            self.assertEqual(one["count"], stats["count"])
+            self.assertAlmostEqual(one["mean"], stats["mean"])
+            self.assertAlmostEqual(one["std"], stats["std"])
+        self.assertIsNone(self.analytics.get_course_stats("CS999"))
+
+        distribution = self.analytics.get_grade_distribution(bins=5)
+        self.assertEqual([b["count"] for b in distribution], [0, 0, 0, 1, 2])
+
+        percentiles = self.analytics.get_score_percentiles((50,), "CS101")
+        self.assertAlmostEqual(percentiles[50], 70.0)
+
+    def test_performance_report_refreshes_dirty_sections(self):
+        """Test the materialized report only recomputes changed sections"""
+        self.analytics.add_grade("S001", "CS101", 80)
+        self.analytics.add_grade("S002", "MATH201", 70)
+        first = self.analytics.generate_performance_report()
+        math_section = first["course_statistics"]["MATH201"]
+
+        self.analytics.add_grade("S003", "CS101", 90)
+        report = self.analytics.generate_performance_report()
+
+        self.assertIs(report["course_statistics"]["MATH201"], math_section)
+        self.assertEqual(report["course_statistics"]["CS101"]["average_score"], 85.0)
+        self.assertEqual(report["course_statistics"]["CS101"]["total_grades"], 2)
+        self.assertEqual(report["top_performers"][0]["student_id"], "S003")
+        self.assertAlmostEqual(report["overall_average"], 80.0)
+
+    def test_top_performers_are_copies(self):
+        """Test changing returned top performers leaves the engine and cached report alone"""
+        self.analytics.add_grade("S001", "CS101", 80)
+        self.analytics.get_top_performers(1)[0]["grades"].append(("FAKE", 0))
+        self.analytics.generate_performance_report()["top_performers"][0]["grades"].clear()
+
+        self.assertEqual(self.analytics.get_student_grades("S001"), [("CS101", 80)])
+        report = self.analytics.generate_performance_report()
+        self.assertEqual(report["top_performers"][0]["grades"], [("CS101", 80)])
+
+    def test_grades_persist(self):
+        """Test grades and averages survive a reload"""
+        self.analytics.add_grade("S001", "CS101", 70)
+        self.analytics.add_grade("S001", "MATH201", 90)
+        self.analytics.add_grade("S002", "CS101", 60)
+
+        reloaded = AnalyticsEngine("data/test_grades.json")
+        self.assertEqual(reloaded.get_student_grades("S001"), [("CS101", 70), ("MATH201", 90)])
+        self.assertEqual(reloaded.get_student_average("S001"), 80.0)
+        self.assertEqual(reloaded.get_course_average("CS101"), 65.0)
+        self.assertAlmostEqual(reloaded.get_overall_average(), 220 / 3)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import http.client
+import json
+import os
+import shutil
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from api.server import create_server
+
+TEST_DIR = "data/test_api"
+
+class TestAPIServer(unittest.TestCase):
+    def setUp(self):
+        """Start a server on a free port"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.server = create_server(ServiceContainer(TEST_DIR), port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.connection = http.client.HTTPConnection(*self.server.server_address[:2], timeout=10)
+
+    def tearDown(self):
+        """Stop the server and clean up"""
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def request(self, method, path, body=None):
+        """Send a request on the shared keep-alive connection"""
+        data = json.dumps(body) if body is not None else None
+        self.connection.request(method, path, body=data)
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read()), response
+
+    def test_student_and_payment_flow(self):
+        """Test writes and reads over one keep-alive connection"""
+        status, student, response = self.request(
+            "POST", "/students", {"student_id": "S001", "name": "Jane Doe", "email": "jane@meru.edu"})
+        self.assertEqual(status, 201)
+        self.assertIn("X-Response-Time", response.headers)
+
+        status, _, _ = self.request("POST", "/payments", {"student_id": "S001", "amount": 45000})
+        self.assertEqual(status, 201)
+        status, student, _ = self.request("GET", "/students/S001")
+        self.assertEqual((status, student["fees_paid"]), (200, 45000))
+        status, payments, _ = self.request("GET", "/students/S001/payments")
+        self.assertEqual(len(payments), 1)
+
+    def test_errors(self):
+        """Test missing resources, bad input and unknown routes"""
+        self.assertEqual(self.request("GET", "/students/S404")[0], 404)
+        self.assertEqual(self.request("POST", "/students", {"student_id": "bad"})[0], 400)
+        self.assertEqual(self.request("GET", "/nowhere")[0], 404)
+        self.assertEqual(self.request("DELETE", "/books")[0], 405)
+        self.assertEqual(self.request("GET", "/health")[0], 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import asyncio
+import os
+import shutil
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from services.async_facade import AsyncServiceFacade
+
+TEST_DIR = "data/test_async"
+
+class TestAsyncServiceFacade(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_concurrent_writes_share_a_flush(self):
+        """Test concurrent payments are coalesced into few file writes"""
+        async def scenario():
+            async with AsyncServiceFacade(ServiceContainer(TEST_DIR)) as facade:
+                payments = await asyncio.gather(*[
+                    facade.fee_tracker.add_payment(f"S{i:03d}", 1000 + i) for i in range(50)
+                ])
+                total = await facade.fee_tracker.get_total_revenue()
+                return payments, total, facade.flushes["fee_tracker"]
+
+        payments, total, flushes = asyncio.run(scenario())
+        self.assertEqual(len({tx.transaction_id for tx in payments}), 50)
+        self.assertEqual(total, sum(1000 + i for i in range(50)))
+        self.assertLessEqual(flushes, 2)
+        self.assertEqual(len(ServiceContainer(TEST_DIR).fee_tracker), 50)
+
+    def test_commands_and_errors(self):
+        """Test commands span services and failures surface to the caller"""
+        async def scenario():
+            async with AsyncServiceFacade(ServiceContainer(TEST_DIR)) as facade:
+                await facade.call("add-student", student_id="S001", name="Jane Doe", email="jane@meru.edu")
+                await facade.call("pay", student_id="S001", amount=5000)
+                with self.assertRaises(Exception):
+                    await facade.student_registry.add_student("S001", "Again", "again@meru.edu")
+                return await facade.student_registry.get_student("S001")
+
+        student = asyncio.run(scenario())
+        self.assertEqual(student.fees_paid, 5000)
+        self.assertEqual(ServiceContainer(TEST_DIR).student_registry.get_student("S001").fees_paid, 5000)
+
+    def test_every_mutation_is_flushed(self):
+        """Test mutations such as archiving, and changes left dirty, reach disk"""
+        async def scenario():
+            async with AsyncServiceFacade(ServiceContainer(TEST_DIR)) as facade:
+                await facade.fee_tracker.add_payment("S001", 1000)
+                moved = await facade.fee_tracker.archive_transactions(
+                    os.path.join(TEST_DIR, "transactions.rec"), "9999-12-31")
+                # A change made on the service directly is left dirty until aclose()
+                facade.container.fee_tracker.add_payment("S002", 2000)
+                self.assertIn("fee_tracker", facade._dirty)
+                return moved
+
+        self.assertEqual(asyncio.run(scenario()), 1)
+        reloaded = ServiceContainer(TEST_DIR).fee_tracker
+        self.assertEqual([tx.student_id for tx in reloaded.transactions.values()], ["S002"])
+        self.assertEqual(reloaded.get_total_revenue(), 3000)
+
+    def test_blocking_operations_run_alone(self):
+        """Test imports and archiving run off the loop while other operations wait for them"""
+        with open(os.path.join(TEST_DIR, "payments.csv"), "w", encoding="utf-8") as f:
+            f.write("student_id,amount\n" + "".join(f"S{i:03d},{100 + i}\n" for i in range(200)))
+        events = []
+
+        async def scenario():
+            container = ServiceContainer(TEST_DIR)
+            container.events.subscribe("*", lambda event, payload: events.append(
+                (event, threading.current_thread() is threading.main_thread())))
+            async with AsyncServiceFacade(container) as facade:
+                imported = asyncio.ensure_future(
+                    facade.call("import-payments", path=os.path.join(TEST_DIR, "payments.csv")))
+                await asyncio.sleep(0)
+                await asyncio.gather(facade.analytics_engine.add_grade("S001", "CS101", 90),
+                                     facade.fee_tracker.archive_transactions(
+                                         os.path.join(TEST_DIR, "transactions.rec"), "9999-12-31"))
+                await imported
+                return await facade.analytics_engine.get_student_grades("S001")
+
+        self.assertEqual(len(asyncio.run(scenario())), 1)
+        names = [event for event, _ in events]
+        self.assertLess(names.index("committed"), names.index("grade_added"))
+        self.assertIn(("transactions_archived", False), events)
+        self.assertEqual(ServiceContainer(TEST_DIR).fee_tracker.get_total_revenue(),
+                         sum(100 + i for i in range(200)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import shutil
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.helpers import save_data
+from utils.snapshot import DATA_FILE_STEMS, encode_snapshot, decode_snapshot, convert, convert_directory
+from services.container import SERVICE_FACTORIES, GENERATION_FILE
+from services.student_registry import StudentRegistry
+
+class TestBinaryStorage(unittest.TestCase):
+    def tearDown(self):
+        """Clean up after tests"""
+        for filename in ("data/test_students.bin", "data/test_students_converted.json"):
+            if os.path.exists(filename):
+                os.remove(filename)
+        shutil.rmtree("data/test_convert", ignore_errors=True)
+
+    def test_round_trip(self):
+        """Test encoding and decoding preserves data"""
+        data = {"S001": {"name": "John Doe", "year": 2, "fees_paid": 1500.5, "courses": ["CS101"]}}
+        self.assertEqual(decode_snapshot(encode_snapshot(data)), data)
+
+    def test_rejects_foreign_data(self):
+        """Test non-snapshot bytes are rejected"""
+        with self.assertRaises(ValueError):
+            decode_snapshot(b'{"not": "a snapshot"}')
+
+    def test_service_with_binary_storage(self):
+        """Test a service persists to and reloads from a binary file"""
+        registry = StudentRegistry("data/test_students.bin")
+        registry.students.clear()
+        registry.add_student("S001", "John Doe", "john@meru.edu", 2)
+
+        reloaded = StudentRegistry("data/test_students.bin")
+        self.assertEqual(reloaded.get_student("S001").name, "John Doe")
+
+        convert("data/test_students.bin", "data/test_students_converted.json")
+        self.assertEqual(StudentRegistry("data/test_students_converted.json").get_student_count(), 1)
+
+    def test_convert_directory_skips_other_files(self):
+        """Test directory conversion only touches the services' data files"""
+        os.makedirs("data/test_convert", exist_ok=True)
+        save_data({"S001": {"name": "John Doe"}}, "data/test_convert/students.json")
+        save_data({"fee_tracker": 3}, os.path.join("data/test_convert", GENERATION_FILE))
+        save_data({"theme": "dark"}, "data/test_convert/settings.json")
+
+        converted = convert_directory("data/test_convert", "binary")
+        self.assertEqual(converted, [("students.json", "students.bin", 1)])
+        self.assertEqual(sorted(os.listdir("data/test_convert")),
+                         sorted([GENERATION_FILE, "settings.json", "students.bin", "students.json"]))
+        self.assertEqual(set(DATA_FILE_STEMS),
+                         {os.path.splitext(filename)[0] for _, filename in SERVICE_FACTORIES.values()})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import os
+import shutil
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from utils.events import EventBus
+
+TEST_DIR = "data/test_cascades"
+
+class TestEventBus(unittest.TestCase):
+    def test_sync_and_batched_delivery(self):
+        """Test synchronous handlers see each event and batched ones see batches"""
+        bus = EventBus()
+        seen, batches = [], []
+        bus.subscribe("enrolled", lambda event, payload: seen.append(payload["student_id"]))
+        bus.subscribe("*", batches.append, batched=True)
+
+        bus.publish("enrolled", student_id="S001")
+        with bus.batch():
+            bus.publish("enrolled", student_id="S002")
+            bus.publish("dropped", student_id="S001")
+            self.assertEqual(len(batches), 1)
+        self.assertEqual(seen, ["S001", "S002"])
+        self.assertEqual([len(batch) for batch in batches], [1, 2])
+
+    def test_background_dispatcher(self):
+        """Test the dispatcher thread delivers a burst as one batch"""
+        bus = EventBus()
+        batches = []
+        bus.subscribe("payment_added", batches.append, batched=True)
+        bus.start(interval=0.05)
+        for i in range(10):
+            bus.publish("payment_added", student_id=f"S{i:03d}", amount=100)
+        deadline = time.time() + 5
+        while not batches and time.time() < deadline:
+            time.sleep(0.01)
+        bus.stop()
+        self.assertEqual(sum(len(batch) for batch in batches), 10)
+        self.assertLess(len(batches), 10)
+
+class TestCascades(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.container = ServiceContainer(TEST_DIR)
+        registry = self.container.student_registry
+        for i in range(1, 4):
+            registry.add_student(f"S00{i}", f"Student {i}", f"s{i}@meru.edu")
+        self.container.course_scheduler.create_course("CS101", "Intro", 1)
+        self.container.library_system.add_book("978-0132350884", "Clean Code", "Robert Martin", 2)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_enrollments_and_payments_update_students(self):
+        """Test Student.courses and fees_paid follow the other services"""
+        scheduler = self.container.course_scheduler
+        registry = self.container.student_registry
+        scheduler.enroll_student("CS101", "S001")
+        scheduler.enroll_student("CS101", "S002")  # waitlisted
+        self.assertEqual(registry.get_student("S001").courses, ["CS101"])
+        self.assertEqual(registry.get_student("S002").courses, [])
+
+        scheduler.drop_student("CS101", "S001")
+        self.assertEqual(registry.get_student("S001").courses, [])
+        self.assertEqual(registry.get_student("S002").courses, ["CS101"])
+
+        self.container.fee_tracker.add_payments([{"student_id": "S003", "amount": 500},
+                                                 {"student_id": "S003", "amount": 250}])
+        self.assertEqual(ServiceContainer(TEST_DIR).student_registry.get_student("S003").fees_paid, 750)
+
+    def test_remove_student_cascades(self):
+        """Test removing a student clears their enrollments, loans and grades"""
+        self.container.course_scheduler.enroll_student("CS101", "S001")
+        self.container.course_scheduler.enroll_student("CS101", "S002")
+        self.container.library_system.borrow_book("978-0132350884", "S001")
+        self.container.analytics_engine.add_grade("S001", "CS101", 90)
+        self.container.analytics_engine.add_grade("S002", "CS101", 70)
+
+        self.container.student_registry.remove_student("S001")
+
+        reloaded = ServiceContainer(TEST_DIR)
+        self.assertEqual(reloaded.course_scheduler.get_course_status("CS101")["enrolled_students"], ["S002"])
+        self.assertEqual(reloaded.student_registry.get_student("S002").courses, ["CS101"])
+        self.assertEqual(reloaded.library_system.get_book_status("978-0132350884")["available_copies"], 2)
+        self.assertEqual(reloaded.library_system.get_student_loans("S001"), {})
+        self.assertEqual(reloaded.analytics_engine.get_student_grades("S001"), [])
+        self.assertEqual(reloaded.analytics_engine.get_course_average("CS101"), 70)
+
+    def test_deferred_block_saves_cascades_once(self):
+        """Test cascades inside deferred_saves() are applied together before the flush"""
+        self.container.course_scheduler.create_course("CS102", "Data Structures", 10)
+        with self.container.deferred_saves():
+            for student_id in ("S001", "S002", "S003"):
+                self.container.course_scheduler.enroll_student("CS102", student_id)
+            self.assertEqual(self.container.student_registry.get_student("S001").courses, [])
+        self.assertEqual(self.container.last_flush, {"course_scheduler": True, "student_registry": True})
+        self.assertEqual(ServiceContainer(TEST_DIR).student_registry.get_student("S003").courses, ["CS102"])
+
+    def test_failed_cascade_undoes_origin(self):
+        """Test a change whose cascade fails is undone and never saved"""
+        def fail(changes):
+            raise Exception("registry unavailable")
+        self.container.student_registry.apply_course_changes = fail
+
+        with self.assertRaises(Exception):
+            self.container.course_scheduler.enroll_student("CS101", "S001")
+
+        self.assertEqual(self.container.course_scheduler.get_course_status("CS101")["enrolled_students"], [])
+        self.assertEqual(self.container.student_registry.get_student("S001").courses, [])
+        reloaded = ServiceContainer(TEST_DIR)
+        self.assertEqual(reloaded.course_scheduler.get_course_status("CS101")["enrolled_students"], [])
+
+    def test_dispatcher_cascades_join_transaction(self):
+        """Test a mutation's cascades are applied in its transaction when a background dispatcher runs"""
+        self.container.events.start(interval=0.05)
+        try:
+            self.container.course_scheduler.enroll_student("CS101", "S001")
+            self.assertEqual(self.container.student_registry.get_student("S001").courses, ["CS101"])
+        finally:
+            self.container.events.stop()
+        self.assertEqual(ServiceContainer(TEST_DIR).student_registry.get_student("S001").courses, ["CS101"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from services.commands import run_command, run_script
+from utils.profiling import ActionProfiler
+
+TEST_DIR = "data/test_commands"
+
+class TestCommands(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.container = ServiceContainer(TEST_DIR)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_deferred_saves_flush_once(self):
+        """Test saves inside a deferred block are written on exit"""
+        students_file = os.path.join(TEST_DIR, "students.json")
+        with self.container.deferred_saves():
+            run_command(self.container, "add-student", student_id="S001", name="Jane Doe",
+                        email="jane@meru.edu")
+            run_command(self.container, "add-student", student_id="S002", name="John Doe",
+                        email="john@meru.edu", year="3")
+            self.assertFalse(os.path.exists(students_file))
+        self.assertTrue(os.path.exists(students_file))
+        self.assertEqual(self.container.last_flush, {"student_registry": True})
+        self.assertEqual(ServiceContainer(TEST_DIR).student_registry.get_student("S002").year, 3)
+
+    def test_run_script(self):
+        """Test a script runs every operation and reports failures per line"""
+        script = os.path.join(TEST_DIR, "ops.jsonl")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "create-course", "course_id": "CS101", "name": "Intro", "capacity": 1}) + "\n")
+            f.write(json.dumps({"op": "enroll", "course_id": "CS101", "student_id": "S001"}) + "\n")
+            f.write(json.dumps({"op": "enroll", "course_id": "CS999", "student_id": "S001"}) + "\n")
+            f.write(json.dumps({"op": "pay", "student_id": "S001", "amount": 1000, "tip": 5}) + "\n")
+
+        outcomes = []
+        summary = run_script(self.container, script, on_outcome=outcomes.append)
+        self.assertEqual((summary["succeeded"], summary["failed"]), (2, 2))
+        self.assertEqual([outcome["line"] for outcome in outcomes if not outcome["ok"]], [3, 4])
+        reloaded = ServiceContainer(TEST_DIR).course_scheduler
+        self.assertEqual(reloaded.get_course_status("CS101")["enrolled_count"], 1)
+
+    def test_profiled_script(self):
+        """Test a profiler gets one action per script operation"""
+        script = os.path.join(TEST_DIR, "ops.jsonl")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "create-course", "course_id": "CS101", "name": "Intro", "capacity": 1}) + "\n")
+            f.write(json.dumps({"op": "enroll", "course_id": "CS999", "student_id": "S001"}) + "\n")
+        profiler = ActionProfiler(os.path.join(TEST_DIR, "profiles"))
+
+        summary = run_script(self.container, script, profiler=profiler)
+        self.assertEqual((summary["succeeded"], summary["failed"]), (1, 1))
+        self.assertEqual([record["action"] for record in profiler.records],
+                         ["create-course line 1", "enroll line 2"])
+        self.assertIsNotNone(profiler.records[1]["error"])
+
+if __name__ == '__main__':
+    unittest.main()
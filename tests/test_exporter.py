@@ -0,0 +1,59 @@
+import unittest
+import csv
+import json
+import os
+import shutil
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from services.exporter import export, write_rows
+
+TEST_DIR = "data/test_export"
+
+class TestExporter(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.container = ServiceContainer(TEST_DIR)
+        self.container.fee_tracker.add_payment("S001", 30000, "Tuition")
+        self.container.fee_tracker.add_payment("S002", 50000, "Tuition")
+        self.container.fee_tracker.add_payment("S001", 20000, "Hostel")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_transactions_csv(self):
+        """Test transactions stream to CSV in amount order"""
+        path = os.path.join(TEST_DIR, "ledger.csv")
+        summary = export(self.container, "transactions", path, sort_by_amount=True)
+        self.assertEqual(summary["rows"], 3)
+        with open(path, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([float(row["amount"]) for row in rows], [20000, 30000, 50000])
+
+    def test_clearance_jsonl(self):
+        """Test the clearance report streams to JSON lines"""
+        path = os.path.join(TEST_DIR, "clearance.jsonl")
+        export(self.container, "clearance", path, required_amount=40000)
+        with open(path, encoding="utf-8") as f:
+            rows = {row["student_id"]: row for row in map(json.loads, f)}
+        self.assertEqual(rows["S001"]["status"], "cleared")
+        self.assertEqual(rows["S002"]["total_paid"], 50000)
+
+    def test_rows_are_consumed_lazily(self):
+        """Test rows are written as a generator produces them"""
+        def rows():
+            for i in range(1000):
+                yield {"n": i}
+        self.assertEqual(write_rows(rows(), os.path.join(TEST_DIR, "n.csv"), ["n"]), 1000)
+
+    def test_rejects_unknown_export(self):
+        """Test unknown export names and formats are rejected"""
+        with self.assertRaises(ValueError):
+            export(self.container, "salaries", os.path.join(TEST_DIR, "x.csv"))
+        with self.assertRaises(ValueError):
+            export(self.container, "students", os.path.join(TEST_DIR, "x.xlsx"))
+
+if __name__ == '__main__':
+    unittest.main()
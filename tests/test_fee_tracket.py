@@ -54,6 +54,21 @@ class TestFeeTracker(unittest.TestCase):
         amounts = [tx.amount for tx in sorted_tx]
         self.assertEqual(amounts, [30000, 40000, 50000])  # Should be sorted ascending
 
+    def test_removals_keep_bst_order(self):
+        """Test undone and removed payments leave the BST in amount order"""
+        added = [self.tracker.add_payment(f"S00{i}", amount)
+                 for i, amount in enumerate([30000, 50000, 40000, 50000, 30000, 45000])]
+        self.tracker._save_data = lambda: False
+        with self.assertRaises(Exception):
+            self.tracker.add_payments([{"student_id": "S009", "amount": amount}
+                                       for amount in (50000, 10000, 30000)])
+        self.assertEqual([tx.amount for tx in self.tracker.get_sorted_transactions()],
+                         [30000, 30000, 40000, 45000, 50000, 50000])
+
+        self.tracker._unindex_transactions([added[0], added[1], added[2]])
+        self.assertEqual([tx.transaction_id for tx in self.tracker.get_sorted_transactions()],
+                         [added[4].transaction_id, added[5].transaction_id, added[3].transaction_id])
+
     def test_clearance_report(self):
         """Test fee clearance report"""
         self.tracker.add_payment("S001", 45000, "Tuition")
@@ -0,0 +1,91 @@
+import unittest
+import io
+import json
+import os
+import re
+import shutil
+import sys
+from contextlib import redirect_stdout
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from data.generator import SCALES, data_files, format_course_id, format_student_id, generate_dataset
+
+TEST_DIR = "data/test_generator"
+
+class TestGenerator(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def read_files(self, output_dir):
+        files = {}
+        for name, path in data_files(output_dir).items():
+            with open(path, "rb") as f:
+                files[name] = f.read()
+        return files
+
+    def test_same_seed_same_bytes(self):
+        """Test a seed always produces byte-identical files, and another seed different ones"""
+        for name, seed in (("first", 7), ("second", 7), ("other", 8)):
+            generate_dataset(os.path.join(TEST_DIR, name), "demo", seed=seed)
+
+        first = self.read_files(os.path.join(TEST_DIR, "first"))
+        self.assertEqual(first, self.read_files(os.path.join(TEST_DIR, "second")))
+        self.assertNotEqual(first["transactions"], self.read_files(os.path.join(TEST_DIR, "other"))["transactions"])
+
+    def test_ids_at_every_scale(self):
+        """Test student and course IDs are unique and well-formed at each size tier"""
+        for scale, settings in SCALES.items():
+            with self.subTest(scale=scale):
+                students = settings["students"]
+                width = max(4, len(str(students)))
+                first, last = format_student_id(1, students), format_student_id(students, students)
+                self.assertRegex(first, rf"^S\d{{{width}}}$")
+                self.assertEqual(len(first), len(last))
+
+                course_ids = [format_course_id(i) for i in range(settings["courses"])]
+                self.assertEqual(len(set(course_ids)), len(course_ids))
+
+        course_ids = [format_course_id(i) for i in range(10_000)]
+        self.assertEqual(len(set(course_ids)), len(course_ids))
+        self.assertTrue(all(re.match(r"^[A-Z]+[1-4]\d\d(-\d+)?$", code) for code in course_ids))
+
+    def test_counts_match_files(self):
+        """Test the summary counts match the written records"""
+        for scale in ("demo", "small"):
+            with self.subTest(scale=scale):
+                output_dir = os.path.join(TEST_DIR, scale)
+                summary = generate_dataset(output_dir, scale, seed=3)
+                files = {name: json.loads(data) for name, data in self.read_files(output_dir).items()}
+
+                self.assertEqual(len(files["students"]), SCALES[scale]["students"])
+                self.assertEqual(len(files["courses"]), SCALES[scale]["courses"])
+                self.assertEqual(len(files["books"]), SCALES[scale]["books"])
+                self.assertEqual(len(files["transactions"]), summary["payments"])
+                self.assertEqual(sum(len(grades) for grades in files["grades"].values()), summary["grades"])
+                self.assertEqual(sum(len(c["enrolled_students"]) for c in files["courses"].values()),
+                                 summary["enrollments"])
+                self.assertEqual(list(files["students"])[-1],
+                                 format_student_id(SCALES[scale]["students"], SCALES[scale]["students"]))
+
+    def test_output_loads_into_every_service(self):
+        """Test every service loads the generated files without rejecting a record"""
+        summary = generate_dataset(TEST_DIR, "demo", seed=11)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            container = ServiceContainer(TEST_DIR)
+            container.preload(background=False)
+
+        self.assertNotIn("Error", output.getvalue())
+        self.assertEqual(len(container.student_registry), summary["students"])
+        self.assertEqual(len(container.course_scheduler), summary["courses"])
+        self.assertEqual(len(container.fee_tracker), summary["payments"])
+        self.assertEqual(len(container.library_system), summary["books"])
+        self.assertEqual(container.analytics_engine.overall_count, summary["grades"])
+
+if __name__ == '__main__':
+    unittest.main()
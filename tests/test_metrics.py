@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import metrics, timed, Histogram
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.was_enabled = metrics.enabled
+        metrics.enabled = True
+        metrics.reset()
+
+    def tearDown(self):
+        """Restore registry state"""
+        metrics.enabled = self.was_enabled
+        metrics.reset()
+
+    def test_timed_records_calls_and_errors(self):
+        """Test decorator records latency and error counts"""
+        @timed("test.operation")
+        def operation(fail=False):
+            if fail:
+                raise ValueError("boom")
+            return 42
+
+        self.assertEqual(operation(), 42)
+        with self.assertRaises(ValueError):
+            operation(fail=True)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["test.operation"]["count"], 2)
+        self.assertEqual(snapshot["test.operation.errors"]["value"], 1)
+
+    def test_disabled_registry_records_nothing(self):
+        """Test no metrics are collected while disabled"""
+        @timed("test.disabled")
+        def operation():
+            return "ok"
+
+        metrics.enabled = False
+        self.assertEqual(operation(), "ok")
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_histogram_percentiles(self):
+        """Test histogram summary statistics"""
+        histogram = Histogram("test.values")
+        for value in range(1, 101):
+            histogram.observe(value)
+
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["p50"], 50)
+        self.assertEqual(summary["p99"], 99)
+        self.assertEqual(summary["max"], 100)
+
+    def test_concurrent_updates_are_not_lost(self):
+        """Test counters and histograms updated from many threads keep every update"""
+        counter = metrics.counter("test.requests")
+        timer = metrics.timer("test.latency")
+
+        def handle_requests():
+            for _ in range(2000):
+                counter.inc()
+                timer.observe(1.0)
+
+        threads = [threading.Thread(target=handle_requests) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        summary = metrics.snapshot()
+        self.assertEqual(summary["test.requests"]["value"], 16000)
+        self.assertEqual(summary["test.latency"]["count"], 16000)
+        self.assertEqual(summary["test.latency"]["total"], 16000.0)
+
+    def test_timer_summary_is_consistent_while_observed(self):
+        """Test a timer summary taken mid-update has a total matching its count"""
+        timer = metrics.timer("test.consistent")
+        done = threading.Event()
+
+        def observe():
+            while not done.is_set():
+                timer.observe(1.0)
+
+        thread = threading.Thread(target=observe)
+        thread.start()
+        try:
+            for _ in range(500):
+                summary = timer.summary()
+                self.assertEqual(summary["total"], float(summary["count"]))
+        finally:
+            done.set()
+            thread.join()
+
+if __name__ == '__main__':
+    unittest.main()
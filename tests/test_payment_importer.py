@@ -0,0 +1,114 @@
+import unittest
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.fee_tracker import FeeTracker
+from services.payment_importer import import_payments
+
+TEST_FILES = ("data/test_transactions.json", "data/test_payments.csv", "data/test_payments.jsonl",
+              "data/test_payments.csv.rejects.jsonl", "data/test_payments.jsonl.rejects.jsonl")
+
+class TestPaymentImporter(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tracker = FeeTracker("data/test_transactions.json")
+        self.tracker.transactions.clear()
+        self.tracker.root = None
+
+    def tearDown(self):
+        """Clean up after tests"""
+        for filename in TEST_FILES:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_csv_import_with_rejects(self):
+        """Test a bank statement imports in batches and bad rows are rejected"""
+        with open("data/test_payments.csv", "w", encoding="utf-8") as f:
+            f.write("Account,Credit,Narration,Value_Date,Ref\n")
+            f.write('S001,"45,000.00",Tuition,15/01/2024,BNK001\n')
+            f.write("S002,30000,Tuition,2024-01-16,BNK002\n")
+            f.write("S003,-5,Refund,2024-01-16,BNK003\n")
+            f.write("S004,20000,Tuition,2024-01-17,BNK001\n")
+            f.write(",1000,Unknown,2024-01-17,BNK004\n")
+            f.write("S005,1000,Hostel,2024-01-18,BNK005\n")
+
+        summary = import_payments("data/test_payments.csv", self.tracker, batch_size=2)
+        self.assertEqual(summary["imported"], 3)
+        self.assertEqual(summary["rejected"], 3)
+        self.assertEqual(summary["batches"], 2)
+        self.assertEqual(self.tracker.get_total_revenue(), 76000)
+
+        with open(summary["reject_file"], encoding="utf-8") as f:
+            reasons = [json.loads(line)["reason"] for line in f]
+        self.assertIn("Duplicate reference BNK001", reasons)
+
+        reloaded = FeeTracker("data/test_transactions.json")
+        self.assertEqual(len(reloaded), 3)
+        self.assertEqual(reloaded.get_student_transactions("S001")[0].date, "2024-01-15")
+
+    def test_failed_batch_can_resume(self):
+        """Test a failed batch stops the import with a resume point, and batches save once"""
+        with open("data/test_payments.csv", "w", encoding="utf-8") as f:
+            f.write("student_id,amount\n")
+            for i in range(1, 6):
+                f.write(f"S00{i},{i * 1000}\n")
+        saves = []
+        self.tracker._save_data = lambda: saves.append(1) or FeeTracker._save_data(self.tracker)
+        add_payments = self.tracker.add_payments
+        calls = []
+
+        def fail_second_batch(payments):
+            calls.append(len(payments))
+            if len(calls) == 2:
+                raise Exception("Failed to add payments: disk full")
+            return add_payments(payments)
+        self.tracker.add_payments = fail_second_batch
+
+        summary = import_payments("data/test_payments.csv", self.tracker, batch_size=2)
+        self.assertEqual((summary["imported"], summary["batches"]), (2, 1))
+        self.assertEqual((summary["failed_batch"], summary["resume_line"]), (2, 4))
+        self.assertIn("disk full", summary["error"])
+        self.assertEqual(len(FeeTracker("data/test_transactions.json")), 2)
+
+        del self.tracker.add_payments
+        resumed = import_payments("data/test_payments.csv", self.tracker, batch_size=2,
+                                  resume_line=summary["resume_line"])
+        self.assertEqual((resumed["imported"], resumed["batches"]), (3, 2))
+        self.assertNotIn("failed_batch", resumed)
+        self.assertEqual(saves, [1, 1])
+        self.assertEqual(FeeTracker("data/test_transactions.json").get_total_revenue(), 15000)
+
+    def test_reimport_is_idempotent(self):
+        """Test importing the same JSON-lines file twice records payments once"""
+        with open("data/test_payments.jsonl", "w", encoding="utf-8") as f:
+            f.write(json.dumps({"student_id": "S001", "amount": 5000, "reference": "M-001"}) + "\n")
+            f.write("{not json}\n")
+            f.write(json.dumps({"student_id": "S002", "amount": 7000, "reference": "M-002"}) + "\n")
+
+        first = import_payments("data/test_payments.jsonl", self.tracker)
+        second = import_payments("data/test_payments.jsonl", FeeTracker("data/test_transactions.json"))
+        self.assertEqual((first["imported"], first["rejected"]), (2, 1))
+        self.assertEqual((second["imported"], second["rejected"]), (0, 3))
+
+    def test_non_finite_amounts_are_rejected(self):
+        """Test nan and inf amounts are rejected without stopping the import"""
+        with open("data/test_payments.csv", "w", encoding="utf-8") as f:
+            f.write("student_id,amount,reference\n")
+            f.write("S001,nan,R-001\n")
+            f.write("S002,inf,R-002\n")
+            f.write("S003,2500,R-003\n")
+        with open("data/test_payments.jsonl", "w", encoding="utf-8") as f:
+            f.write('{"student_id": "S004", "amount": NaN, "reference": "R-004"}\n')
+            f.write('{"student_id": "S005", "amount": Infinity, "reference": "R-005"}\n')
+            f.write('{"student_id": "S006", "amount": 1500, "reference": "R-006"}\n')
+
+        csv_summary = import_payments("data/test_payments.csv", self.tracker)
+        jsonl_summary = import_payments("data/test_payments.jsonl", self.tracker)
+        self.assertEqual((csv_summary["imported"], csv_summary["rejected"]), (1, 2))
+        self.assertEqual((jsonl_summary["imported"], jsonl_summary["rejected"]), (1, 2))
+        self.assertEqual(self.tracker.get_total_revenue(), 4000)
+        self.assertEqual(FeeTracker("data/test_transactions.json").get_total_revenue(), 4000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import pstats
+import shutil
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.profiling import ActionProfiler
+
+TEST_DIR = "data/test_profiles"
+
+def build_rows(count):
+    return [{"id": i, "name": f"row {i}"} for i in range(count)]
+
+class TestActionProfiler(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.profiler = ActionProfiler(TEST_DIR, top_functions=10, top_allocations=5)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_profile_writes_reports(self):
+        """Test a profiled action returns its result and leaves cProfile and tracemalloc output"""
+        rows = self.profiler.profile("Build rows", build_rows, 5000)
+        self.assertEqual(len(rows), 5000)
+
+        record = self.profiler.records[0]
+        self.assertEqual(record["action"], "Build rows")
+        self.assertTrue(record["profile"].endswith("0001_Build_rows.prof"))
+        self.assertGreater(record["peak_kib"], 0)
+        stats = pstats.Stats(record["profile"])
+        self.assertTrue(any(function == "build_rows" for _, _, function in stats.stats))
+
+        with open(record["report"], encoding="utf-8") as f:
+            report = f.read()
+        self.assertIn("=== Top functions (cumulative time) ===", report)
+        self.assertIn("build_rows", report)
+        allocations = report.split("=== Top allocations (net growth by line) ===")[1]
+        self.assertIn("test_profiling.py", allocations)
+
+    def test_failed_action_and_summary(self):
+        """Test a raising action is still reported and the summary ranks every action"""
+        with self.assertRaises(ZeroDivisionError):
+            self.profiler.profile("Divide", lambda: 1 / 0)
+        self.profiler.profile("Build rows", build_rows, 100)
+
+        self.assertIn("ZeroDivisionError", self.profiler.records[0]["error"])
+        path = self.profiler.write_summary()
+        with open(path, encoding="utf-8") as f:
+            summary = f.read()
+        self.assertIn("Profiled actions: 2", summary)
+        self.assertTrue(os.path.exists(os.path.join(TEST_DIR, "summary.json")))
+
+if __name__ == '__main__':
+    unittest.main()
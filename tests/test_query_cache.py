@@ -0,0 +1,85 @@
+import unittest
+import os
+import shutil
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from services.query_cache import QueryCache
+from utils.cache import TTLCache
+
+TEST_DIR = "data/test_query_cache"
+
+class TestTTLCache(unittest.TestCase):
+    def test_lru_ttl_and_tags(self):
+        """Test eviction order, expiry and tag invalidation"""
+        now = [0.0]
+        cache = TTLCache(max_entries=2, ttl=10, clock=lambda: now[0])
+        cache.put("a", 1, [("x",)])
+        cache.put("b", 2, [("y",)])
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3, [("x",)])  # evicts "b", the least recently used
+        self.assertIsNone(cache.get("b"))
+
+        self.assertEqual(cache.invalidate(("x",)), 2)
+        self.assertEqual(len(cache), 0)
+
+        cache.put("d", 4)
+        now[0] = 10
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.cache = QueryCache(ttl=60)
+        self.container = ServiceContainer(TEST_DIR, query_cache=self.cache)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_course_status_invalidated_by_enrollment(self):
+        """Test cached course status is refreshed only for the course that changed"""
+        scheduler = self.container.course_scheduler
+        scheduler.create_course("CS101", "Intro", 1)
+        scheduler.create_course("CS102", "Data Structures", 5)
+        scheduler.get_course_status("CS101")
+        other = scheduler.get_course_status("CS102")
+        self.assertIs(scheduler.get_course_status("CS102"), other)
+
+        scheduler.enroll_student("CS101", "S001")
+        scheduler.enroll_student("CS101", "S002")
+        status = scheduler.get_course_status("CS101")
+        self.assertEqual((status["enrolled_count"], status["waitlist_count"]), (1, 1))
+        self.assertIs(scheduler.get_course_status("CS102"), other)
+
+        scheduler.drop_student("CS101", "S001")
+        self.assertEqual(scheduler.get_course_status("CS101")["enrolled_students"], ["S002"])
+
+    def test_payments_books_and_rankings(self):
+        """Test each cached query sees the mutations of its owning service"""
+        fees = self.container.fee_tracker
+        self.assertEqual(fees.get_student_transactions("S001"), [])
+        fees.add_payment("S001", 1000)
+        self.assertEqual(len(fees.get_student_transactions("S001")), 1)
+
+        library = self.container.library_system
+        self.assertIsNone(library.get_book_status("978-0132350884"))
+        library.add_book("978-0132350884", "Clean Code", "Robert Martin", 1)
+        library.borrow_book("978-0132350884", "S001")
+        self.assertEqual(library.get_book_status("978-0132350884")["available_copies"], 0)
+
+        engine = self.container.analytics_engine
+        engine.add_grade("S001", "CS101", 90)
+        self.assertEqual(engine.get_student_ranking("S001")["rank"], 1)
+        engine.add_grade("S002", "CS101", 95)
+        self.assertEqual(engine.get_student_ranking("S001")["rank"], 2)
+        self.assertEqual(engine.generate_performance_report()["total_students_with_grades"], 2)
+
+        stats = self.cache.stats()
+        self.assertGreater(stats["misses"], 0)
+        self.assertEqual(stats["entries"], 4)
+
+if __name__ == '__main__':
+    unittest.main()
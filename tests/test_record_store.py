@@ -0,0 +1,126 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.record_store import MappedRecordStore, build_record_file
+from models.book import Book
+from services.library_system import LibrarySystem
+from services.fee_tracker import FeeTracker
+
+TEST_FILES = ("data/test_records.rec", "data/test_books.json", "data/test_books.rec",
+              "data/test_transactions.json", "data/test_transactions.rec")
+
+class TestRecordStore(unittest.TestCase):
+    def tearDown(self):
+        """Clean up after tests"""
+        for filename in TEST_FILES:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_lookup_and_lru(self):
+        """Test records decode on demand and the LRU stays bounded"""
+        records = [(f"978{i:010d}", {"isbn": f"978{i:010d}", "title": f"Book {i}",
+                                      "author": "Author", "total_copies": 2}) for i in range(20)]
+        build_record_file("data/test_records.rec", records)
+
+        store = MappedRecordStore("data/test_records.rec", Book.from_dict, cache_size=5)
+        self.assertEqual(len(store), 20)
+        self.assertEqual(store.keys()[0], "9780000000000")
+        book = store.get("9780000000007")
+        self.assertEqual(book.title, "Book 7")
+        self.assertIs(store.get("9780000000007"), book)
+        self.assertIsNone(store.get("missing"))
+
+        for isbn, _ in records:
+            store.get(isbn)
+        self.assertEqual(len(store.cache), 5)
+        store.close()
+
+    def test_rejects_foreign_file(self):
+        """Test non-record files are rejected"""
+        with open("data/test_records.rec", "wb") as f:
+            f.write(b'{"not": "a record file"}')
+        with self.assertRaises(ValueError):
+            MappedRecordStore("data/test_records.rec")
+
+    def test_library_archive(self):
+        """Test archived books are served, searched and promoted when borrowed"""
+        build_record_file("data/test_books.rec", [
+            ("9780000000001", Book("9780000000001", "Archived Physics", "Korir", 1).to_dict())
+        ])
+        library = LibrarySystem("data/test_books.json", archive_file="data/test_books.rec")
+        library.add_book("9780000000002", "Live Biology", "Mwangi", 1)
+
+        self.assertEqual(len(library), 2)
+        self.assertEqual(library.get_book("9780000000001").title, "Archived Physics")
+        self.assertEqual(len(library.search_books("physics")), 1)
+        with self.assertRaises(Exception):
+            library.add_book("9780000000001", "Duplicate", "Someone", 1)
+
+        self.assertTrue(library.borrow_book("9780000000001", "S001")["success"])
+        reloaded = LibrarySystem("data/test_books.json", archive_file="data/test_books.rec")
+        self.assertEqual(reloaded.get_book("9780000000001").available_copies, 0)
+        self.assertEqual(len(reloaded), 2)
+
+    def test_archived_loans(self):
+        """Test loans of archived books are indexed, and a failed change leaves the book archived"""
+        archived = Book("9780000000001", "Archived Physics", "Korir", 2)
+        archived.borrow_book("S001")
+        build_record_file("data/test_books.rec", [(archived.isbn, archived.to_dict())])
+        library = LibrarySystem("data/test_books.json", archive_file="data/test_books.rec")
+
+        library._save_data = lambda: False
+        self.assertFalse(library.borrow_book("9780000000001", "S002")["success"])
+        self.assertNotIn("9780000000001", library.books)
+        self.assertEqual(library.get_student_loans("S002"), {})
+
+        del library._save_data
+        self.assertEqual(library.get_student_loans("S001"), {"9780000000001": 1})
+        self.assertEqual(library.return_all_books("S001"), {"9780000000001": 1})
+        self.assertEqual(library.get_student_loans("S001"), {})
+        reloaded = LibrarySystem("data/test_books.json", archive_file="data/test_books.rec")
+        self.assertEqual(reloaded.get_book("9780000000001").available_copies, 2)
+
+    def test_fee_archive(self):
+        """Test archived transactions stay visible to lookups and reports"""
+        tracker = FeeTracker("data/test_transactions.json")
+        tracker.transactions.clear()
+        tracker.root = None
+        old = tracker.add_payment("S001", 3000)
+        old.date = "2020-01-15"
+        tracker.add_payment("S001", 1000)
+        tracker.add_payment("S002", 2000)
+
+        self.assertEqual(tracker.archive_transactions("data/test_transactions.rec", "2021-01-01"), 1)
+        self.assertEqual(len(tracker.transactions), 2)
+
+        reloaded = FeeTracker("data/test_transactions.json", archive_file="data/test_transactions.rec")
+        self.assertEqual(len(reloaded), 3)
+        self.assertEqual(reloaded.get_transaction(old.transaction_id).amount, 3000)
+        self.assertEqual(reloaded.get_total_revenue(), 6000)
+        self.assertEqual([tx.amount for tx in reloaded.get_sorted_transactions()], [1000, 2000, 3000])
+        self.assertEqual(len(reloaded.get_student_transactions("S001")), 2)
+        report = reloaded.generate_clearance_report(4000)
+        self.assertEqual(report["cleared_students"], [{"student_id": "S001", "total_paid": 4000}])
+
+        new = reloaded.add_payment("S003", 500)
+        self.assertNotEqual(new.transaction_id, old.transaction_id)
+
+    def test_unordered_fee_archive(self):
+        """Test an archive not written in amount order still merges in order"""
+        records = [(f"T{i:04d}", {"transaction_id": f"T{i:04d}", "student_id": f"S00{i % 2}",
+                                  "amount": amount, "date": "2020-01-15"})
+                   for i, amount in enumerate([500, 100, 300])]
+        build_record_file("data/test_transactions.rec", records)
+
+        tracker = FeeTracker("data/test_transactions.json", archive_file="data/test_transactions.rec")
+        tracker.transactions.clear()
+        tracker.root = None
+        tracker.add_payment("S001", 200)
+        self.assertEqual([tx.amount for tx in tracker.get_sorted_transactions()], [100, 200, 300, 500])
+        self.assertEqual(sorted(tx.amount for tx in tracker.get_student_transactions("S000")), [300, 500])
+        self.assertEqual(sorted(tx.amount for tx in tracker.get_student_transactions("S001")), [100, 200])
+        self.assertEqual(tracker.get_total_revenue(), 1100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from services.library_system import LibrarySystem
+from services.parallel_loader import _load_part, load_files
+from data.generator import generate_dataset
+
+class TestServiceContainer(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.data_dir = tempfile.mkdtemp()
+        self.container = ServiceContainer(self.data_dir)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_services_load_on_first_access(self):
+        """Test only the services that are used get loaded"""
+        self.assertEqual(self.container.loaded_services(), [])
+
+        library = self.container.library_system
+        self.assertIsInstance(library, LibrarySystem)
+        self.assertEqual(library.data_file, os.path.join(self.data_dir, "books.json"))
+        self.assertEqual(self.container.loaded_services(), ["library_system"])
+        self.assertIs(self.container.library_system, library)
+
+    def test_background_preload(self):
+        """Test preloading loads every service once"""
+        self.container.preload()
+        self.container.wait_for_preload()
+        self.assertEqual(len(self.container.loaded_services()), 5)
+
+    def test_parallel_load_matches_lazy_load(self):
+        """Test the parallel loader builds the same state as lazy loading"""
+        generate_dataset(self.data_dir, "demo", seed=7)
+        timings = self.container.load_parallel(use_processes=False)
+        lazy = ServiceContainer(self.data_dir)
+
+        self.assertEqual(len(self.container.student_registry), len(lazy.student_registry))
+        self.assertEqual(len(self.container.fee_tracker), len(lazy.fee_tracker))
+        self.assertEqual([tx.transaction_id for tx in self.container.fee_tracker.get_sorted_transactions()],
+                         [tx.transaction_id for tx in lazy.fee_tracker.get_sorted_transactions()])
+        self.assertEqual(self.container.analytics_engine.get_overall_average(),
+                         lazy.analytics_engine.get_overall_average())
+        self.assertEqual(timings["student_registry"]["records"], 100)
+        self.assertGreater(timings["wall_seconds"], timings["fee_tracker"]["populate_seconds"])
+
+    def test_process_workers_build_their_own_parts(self):
+        """Test byte ranges of a file loaded in worker processes add up to the whole file"""
+        generate_dataset(self.data_dir, "demo", seed=7)
+        path = os.path.join(self.data_dir, "transactions.json")
+        size = os.path.getsize(path)
+        offsets = [0, 1, size // 3, size // 2, size]
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(_load_part, "fee_tracker", path, start, stop)
+                       for start, stop in zip(offsets, offsets[1:])]
+            parts = [future.result() for future in futures]
+        whole, errors = load_files({"fee_tracker": path}, use_processes=False)[0]["fee_tracker"]
+
+        self.assertEqual([tx.transaction_id for objects, *_ in parts for tx in objects],
+                         [tx.transaction_id for tx in whole])
+        self.assertEqual(sum(records for _, _, records, _, _ in parts), len(whole))
+        self.assertEqual(errors, [])
+
+class TestSharedDataDirectory(unittest.TestCase):
+    def setUp(self):
+        """Set up two containers sharing one data directory, like two terminals"""
+        self.data_dir = tempfile.mkdtemp()
+        self.first = ServiceContainer(self.data_dir, shared=True)
+        self.second = ServiceContainer(self.data_dir, shared=True)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_writers_see_each_others_changes(self):
+        """Test a write on stale data reloads first instead of overwriting"""
+        self.first.student_registry.add_student("S001", "Jane Doe", "jane@meru.edu")
+        self.assertEqual(len(self.second.student_registry), 1)
+        self.first.student_registry.add_student("S002", "John Smith", "john@meru.edu")
+        self.second.student_registry.add_student("S003", "Mary Jane", "mary@meru.edu")
+
+        self.assertEqual(len(ServiceContainer(self.data_dir).student_registry), 3)
+        self.assertEqual(self.second.refresh(), [])
+        self.assertEqual(self.first.refresh(), ["student_registry"])
+        self.assertEqual(len(self.first.student_registry), 3)
+
+    def test_refresh_reloads_only_changed_services(self):
+        """Test readers reload just the services another process saved"""
+        self.second.student_registry.get_student("S001")
+        self.assertEqual(len(self.second.course_scheduler), 0)
+        self.first.course_scheduler.create_course("CS101", "Intro", 30)
+
+        self.assertEqual(self.second.refresh(), ["course_scheduler"])
+        self.assertTrue(self.second.is_loaded("student_registry"))
+        self.assertEqual(len(self.second.course_scheduler), 1)
+
+    def test_writers_wait_for_the_lock(self):
+        """Test a write blocks while another process holds the lock"""
+        writer = threading.Thread(target=self.second.student_registry.add_student,
+                                  args=("S001", "Jane Doe", "jane@meru.edu"))
+        with self.first.exclusive():
+            writer.start()
+            time.sleep(0.1)
+            self.assertTrue(writer.is_alive())
+            self.assertFalse(os.path.exists(os.path.join(self.data_dir, "students.json")))
+        writer.join(5)
+        self.assertEqual(len(self.first.student_registry), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import os
+import shutil
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.sharding import ShardRouter, shard_for
+
+TEST_DIR = "data/test_sharding"
+
+class TestShardRouter(unittest.TestCase):
+    def setUp(self):
+        """Start a two-shard router with a few students"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.router = ShardRouter(TEST_DIR, shards=2)
+        self.students = [f"S{i:03d}" for i in range(1, 9)]
+        outcomes = self.router.run_many(
+            [("add-student", {"student_id": sid, "name": f"Student {sid}", "email": f"{sid.lower()}@meru.edu"})
+             for sid in self.students])
+        self.assertTrue(all(outcome["ok"] for outcome in outcomes))
+
+    def tearDown(self):
+        """Stop the workers and clean up"""
+        self.router.close()
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_students_are_partitioned(self):
+        """Test every student lives on exactly the shard its ID hashes to"""
+        self.assertEqual({shard_for(sid, 2) for sid in self.students}, {0, 1})
+        self.assertEqual(self.router.student_count(), len(self.students))
+        self.assertEqual(self.router.get_student("S003")["name"], "Student S003")
+        self.assertTrue(os.path.exists(os.path.join(self.router.shard_dir(shard_for("S003", 2)), "students.json")))
+
+    def test_scatter_gather_reports(self):
+        """Test global reports merge every shard's part"""
+        self.router.run_many([("pay", {"student_id": sid, "amount": 100 * (i + 1)})
+                              for i, sid in enumerate(self.students)]
+                             + [("grade", {"student_id": sid, "course_id": "CS101", "score": 60 + i})
+                                for i, sid in enumerate(self.students)])
+
+        self.assertEqual(self.router.total_revenue(), sum(100 * (i + 1) for i in range(8)))
+        report = self.router.clearance_report(500)
+        self.assertEqual(len(report["cleared_students"]), 4)
+        self.assertEqual(self.router.get_student("S008")["fees_paid"], 800)
+        self.assertEqual([p["student_id"] for p in self.router.top_performers(2)], ["S008", "S007"])
+        self.assertEqual(self.router.student_ranking("S006")["rank"], 3)
+
+    def test_cross_shard_cascades(self):
+        """Test enrollments and removals reach the students' shards"""
+        self.router.run("create-course", course_id="CS101", name="Intro", capacity=1)
+        self.router.run("enroll", course_id="CS101", student_id="S001")
+        self.router.run("enroll", course_id="CS101", student_id="S002")
+        self.assertEqual(self.router.get_student("S001")["courses"], ["CS101"])
+
+        self.router.run("remove-student", student_id="S001")
+        self.assertIsNone(self.router.get_student("S001"))
+        self.assertEqual(self.router.get_student("S002")["courses"], ["CS101"])
+        self.assertFalse(self.router.run_many([("export", {})])[0]["ok"])
+
+    def test_batch_keeps_script_order(self):
+        """Test a global operation sees the shard operations before it in the batch"""
+        self.router.run("create-course", course_id="CS101", name="Intro", capacity=1)
+        outcomes = self.router.run_many([
+            ("enroll", {"course_id": "CS101", "student_id": "S001"}),
+            ("remove-student", {"student_id": "S001"}),
+            ("enroll", {"course_id": "CS101", "student_id": "S002"}),
+        ])
+        self.assertEqual(outcomes[2]["result"]["status"], "enrolled")
+        self.assertEqual(self.router.get_student("S002")["courses"], ["CS101"])
+
+    def test_failed_scatter_reads_every_reply(self):
+        """Test a query failing on every shard leaves no reply behind for the next one"""
+        with self.assertRaises(Exception):
+            self.router._scatter("top_performers", "not a number")
+        self.assertEqual(self.router.student_count(), len(self.students))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import os
+import shutil
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from services.snapshots import SnapshotManager
+from services.transactions import Rollback
+
+TEST_DIR = "data/test_snapshots"
+
+class TestSnapshotManager(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.container = ServiceContainer(TEST_DIR)
+        self.container.student_registry.add_student("S001", "Jane Doe", "jane@meru.edu")
+        self.container.course_scheduler.create_course("CS101", "Intro", 2)
+        self.history = SnapshotManager(self.container, keep_last=2)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.history.stop()
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_unchanged_files_are_shared(self):
+        """Test snapshots hard-link data files instead of copying them"""
+        self.container.fee_tracker.add_payment("S001", 500)
+        meta = self.history.snapshot()
+        courses = os.path.join(TEST_DIR, "courses.json")
+        linked = os.path.join(self.history.history_dir, meta["id"], "courses.json")
+        self.assertEqual(os.stat(courses).st_ino, os.stat(linked).st_ino)
+        self.assertIn("transactions.json", meta["files"])
+
+        self.container.course_scheduler.enroll_student("CS101", "S001")
+        self.assertNotEqual(os.stat(courses).st_ino, os.stat(linked).st_ino)
+
+    def test_snapshot_keeps_loaded_services(self):
+        """Test a snapshot doesn't mistake this process's saves for another's and reload"""
+        registry = self.container.student_registry
+        self.container.student_registry.add_student("S002", "John Roe", "john@meru.edu")
+        self.history.snapshot()
+        self.assertIs(self.container.student_registry, registry)
+
+    def test_restore_to_point_in_time(self):
+        """Test restore replays the journal only up to the target time"""
+        self.container.course_scheduler.enroll_student("CS101", "S001")
+        self.container.fee_tracker.add_payment("S001", 500)
+        time.sleep(0.01)
+        checkpoint = time.time()
+        time.sleep(0.01)
+        self.container.student_registry.add_student("S002", "John Roe", "john@meru.edu")
+        self.container.course_scheduler.enroll_student("CS101", "S002")
+        self.container.student_registry.remove_student("S001")
+
+        summary = self.history.restore(checkpoint)
+        self.assertGreater(summary["replayed"], 0)
+
+        restored = ServiceContainer(TEST_DIR)
+        self.assertIsNone(restored.student_registry.get_student("S002"))
+        student = restored.student_registry.get_student("S001")
+        self.assertEqual((student.courses, student.fees_paid), (["CS101"], 500))
+        self.assertEqual(restored.course_scheduler.get_course_status("CS101")["enrolled_students"], ["S001"])
+
+        # The live container reloads the restored state too
+        self.assertIsNone(self.container.student_registry.get_student("S002"))
+
+    def test_checkpoint_waits_for_commit(self):
+        """Test archiving in a transaction snapshots only once it commits, and a rollback reaches no file"""
+        self.container.fee_tracker.add_payment("S001", 500)
+        archive_file = os.path.join(TEST_DIR, "archive.rec")
+        taken = len(self.history.snapshots())
+
+        with self.container.transaction():
+            self.container.fee_tracker.archive_transactions(archive_file, "9999-12-31")
+            self.container.fee_tracker.add_payment("S001", 700)
+            raise Rollback()
+        self.assertEqual(len(self.history.snapshots()), taken)
+        reloaded = ServiceContainer(TEST_DIR).fee_tracker
+        self.assertEqual(sorted(tx.amount for tx in reloaded.transactions.values()), [500])
+        with self.assertRaises(RuntimeError):
+            with self.container.transaction():
+                self.container.fee_tracker.add_payment("S001", 700)
+                self.container.flush()
+
+        with self.container.transaction():
+            self.container.fee_tracker.archive_transactions(archive_file, "9999-12-31")
+        self.assertEqual(self.history.snapshots()[-1]["reason"], "transactions_archived")
+        self.assertEqual(len(ServiceContainer(TEST_DIR).fee_tracker.transactions), 0)
+
+    def test_retention(self):
+        """Test old snapshots and their journals are pruned"""
+        for _ in range(4):
+            self.history.snapshot()
+        snapshots = self.history.snapshots()
+        self.assertEqual(len(snapshots), 2)
+        journals = [f for f in os.listdir(self.history.history_dir) if f.endswith(".journal.jsonl")]
+        self.assertEqual(len(journals), 2)
+
+if __name__ == '__main__':
+    unittest.main()
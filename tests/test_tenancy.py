@@ -0,0 +1,85 @@
+import unittest
+import http.client
+import json
+import os
+import shutil
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.tenancy import TenantManager
+from api.server import create_server
+
+TEST_DIR = "data/test_tenancy"
+
+class TestTenantManager(unittest.TestCase):
+    def setUp(self):
+        """Create three campuses, keeping at most two open"""
+        self.tenants = TenantManager(TEST_DIR, max_open=2)
+        for campus in ("main", "north", "south"):
+            self.tenants.create_campus(campus)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.tenants.close()
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def test_campuses_are_isolated(self):
+        """Test each campus has its own data directory"""
+        with self.tenants.use("main") as container:
+            container.student_registry.add_student("S001", "Jane Doe", "jane@meru.edu")
+        with self.tenants.use("north") as container:
+            self.assertIsNone(container.student_registry.get_student("S001"))
+        self.assertTrue(os.path.exists(os.path.join(TEST_DIR, "main", "students.json")))
+        self.assertEqual(self.tenants.campuses(), ["main", "north", "south"])
+        with self.assertRaises(ValueError):
+            self.tenants.get("../main")
+        with self.assertRaises(ValueError):
+            self.tenants.get("west")
+
+    def test_idle_campuses_are_unloaded(self):
+        """Test the least recently used idle campus is unloaded, never one in use"""
+        with self.tenants.use("main"):
+            self.tenants.get("north")
+            self.tenants.get("south")
+            self.assertEqual(self.tenants.open_campuses(), ["main", "south"])
+        self.tenants.get("north")
+        self.assertEqual(self.tenants.open_campuses(), ["south", "north"])
+
+    def test_cross_campus_reports(self):
+        """Test reports cover every campus without disturbing the open ones"""
+        for i, campus in enumerate(("main", "north", "south")):
+            with self.tenants.use(campus) as container:
+                container.fee_tracker.add_payment("S001", 1000 * (i + 1))
+                container.analytics_engine.add_grade("S001", "CS101", 70 + i * 10)
+        open_before = self.tenants.open_campuses()
+
+        report = self.tenants.summary_report()
+        self.assertEqual(report["totals"]["revenue"], 6000)
+        self.assertEqual(report["totals"]["average_score"], 80)
+        self.assertEqual(self.tenants.top_performers(1)[0]["campus"], "south")
+        self.assertEqual(self.tenants.open_campuses(), open_before)
+
+    def test_api_serves_each_campus(self):
+        """Test one server routes /campuses/<campus>/... to that campus"""
+        server = create_server(port=0, tenants=self.tenants)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        connection = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+        try:
+            def request(method, path, body=None):
+                connection.request(method, path, body=json.dumps(body) if body else None)
+                response = connection.getresponse()
+                return response.status, json.loads(response.read())
+
+            student = {"student_id": "S001", "name": "Jane Doe", "email": "jane@meru.edu"}
+            self.assertEqual(request("POST", "/campuses/north/students", student)[0], 201)
+            self.assertEqual(request("GET", "/campuses/north/students/S001")[0], 200)
+            self.assertEqual(request("GET", "/campuses/south/students/S001")[0], 404)
+            self.assertEqual(request("GET", "/campuses/west/students/S001")[0], 404)
+            self.assertEqual(request("GET", "/students/S001")[0], 404)
+        finally:
+            connection.close()
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.container import ServiceContainer
+from services.course_scheduler import CourseScheduler
+from services.transactions import COMMIT_FILE, Rollback, SaveError, staged_path
+
+TEST_DIR = "data/test_transactions"
+
+class TestTransactions(unittest.TestCase):
+    def setUp(self):
+        """Set up two students in a one-place course, S002 waitlisted"""
+        os.makedirs(TEST_DIR, exist_ok=True)
+        self.container = ServiceContainer(TEST_DIR)
+        self.container.student_registry.add_student("S001", "Jane Doe", "jane@meru.edu")
+        self.container.student_registry.add_student("S002", "John Smith", "john@meru.edu")
+        self.container.course_scheduler.create_course("CS101", "Intro", 1)
+        self.container.course_scheduler.enroll_student("CS101", "S001")
+        self.container.course_scheduler.enroll_student("CS101", "S002")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def read(self, name):
+        with open(os.path.join(TEST_DIR, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_commit_writes_every_service_together(self):
+        """Test a transaction's changes and cascades are saved in one commit"""
+        with self.container.transaction():
+            self.container.course_scheduler.drop_student("CS101", "S001")
+            self.container.fee_tracker.add_payment("S002", 45000, "CS101 course fee")
+            self.assertEqual(self.read("courses.json")["CS101"]["enrolled_students"], ["S001"])
+
+        self.assertEqual(self.container.last_flush,
+                         {"course_scheduler": True, "fee_tracker": True, "student_registry": True})
+        self.assertEqual(self.read("courses.json")["CS101"]["enrolled_students"], ["S002"])
+        self.assertEqual(self.read("students.json")["S002"]["courses"], ["CS101"])
+        self.assertEqual(self.read("students.json")["S002"]["fees_paid"], 45000)
+        self.assertFalse(os.path.exists(os.path.join(TEST_DIR, COMMIT_FILE)))
+
+    def test_failure_undoes_every_service(self):
+        """Test an exception undoes changes in every service, including cascades"""
+        rolled_back = []
+        self.container.events.subscribe("rolled_back", lambda event, payload: rolled_back.append(payload))
+        students_before = self.read("students.json")
+
+        with self.assertRaises(ValueError):
+            with self.container.transaction():
+                self.container.course_scheduler.drop_student("CS101", "S001")
+                self.container.fee_tracker.add_payment("S002", 45000)
+                self.container.student_registry.remove_student("S001")
+                raise ValueError("cancelled")
+
+        status = self.container.course_scheduler.get_course_status("CS101")
+        self.assertEqual((status["enrolled_students"], status["waitlist"]), (["S001"], ["S002"]))
+        self.assertEqual(self.container.student_registry.get_student("S001").courses, ["CS101"])
+        self.assertEqual(self.container.fee_tracker.get_total_revenue(), 0)
+        self.assertEqual(self.read("students.json"), students_before)
+        self.assertFalse(os.path.exists(os.path.join(TEST_DIR, "transactions.json")))
+        self.assertEqual([event for event, _ in rolled_back[0]["events"]][:3],
+                         ["dropped", "payment_added", "student_removed"])
+
+        with self.container.transaction():
+            self.container.analytics_engine.add_grade("S001", "CS101", 90)
+            raise Rollback()
+        self.assertEqual(self.container.analytics_engine.overall_count, 0)
+
+    def test_commit_failure_changes_nothing(self):
+        """Test a commit that can't write one file leaves every file and service unchanged"""
+        os.makedirs(staged_path(os.path.join(TEST_DIR, "students.json")))  # can't be written
+        courses_before = self.read("courses.json")
+
+        with self.assertRaises(SaveError):
+            with self.container.transaction():
+                self.container.course_scheduler.drop_student("CS101", "S001")
+
+        self.assertEqual(self.read("courses.json"), courses_before)
+        self.assertEqual(self.container.course_scheduler.get_course_status("CS101")["enrolled_count"], 1)
+        self.assertFalse(os.path.exists(staged_path(os.path.join(TEST_DIR, "courses.json"))))
+
+    def test_interrupted_commit_is_finished(self):
+        """Test a commit record left by a crash is completed when the data is next opened"""
+        target = os.path.join(TEST_DIR, "courses.json")
+        with open(staged_path(target), "w", encoding="utf-8") as f:
+            json.dump({}, f)
+        with open(os.path.join(TEST_DIR, COMMIT_FILE), "w", encoding="utf-8") as f:
+            json.dump({target: staged_path(target)}, f)
+
+        self.assertEqual(len(ServiceContainer(TEST_DIR).course_scheduler), 0)
+        self.assertFalse(os.path.exists(os.path.join(TEST_DIR, COMMIT_FILE)))
+
+    def test_failed_save_undoes_change(self):
+        """Test a service outside a transaction undoes a change it can't save"""
+        scheduler = CourseScheduler(os.path.join(TEST_DIR, "courses.json"))
+        scheduler._save_data = lambda: False
+        with self.assertRaises(Exception):
+            scheduler.drop_student("CS101", "S001")
+        status = scheduler.get_course_status("CS101")
+        self.assertEqual((status["enrolled_students"], status["waitlist"]), (["S001"], ["S002"]))
+
+    def test_other_threads_wait_for_transaction(self):
+        """Test another thread's change waits for an open transaction instead of being undone with it"""
+        started, finish = threading.Event(), threading.Event()
+
+        def roll_back():
+            with self.container.transaction():
+                self.container.library_system.add_book("978-0132350884", "Clean Code", "Robert Martin", 2)
+                started.set()
+                finish.wait(5)
+                raise Rollback()
+
+        results = []
+        first = threading.Thread(target=roll_back)
+        second = threading.Thread(target=lambda: results.append(
+            self.container.analytics_engine.add_grade("S001", "CS101", 90)))
+        first.start()
+        started.wait(5)
+        second.start()
+        second.join(0.2)
+        self.assertTrue(second.is_alive())  # waiting for the transaction
+        finish.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(results, [True])
+        self.assertEqual(len(self.container.library_system.books), 0)
+        self.assertEqual(self.container.analytics_engine.overall_count, 1)
+        self.assertEqual(self.read("grades.json")["S001"], [{"course_id": "CS101", "score": 90}])
+
+if __name__ == '__main__':
+    unittest.main()
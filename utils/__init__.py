@@ -2,10 +2,16 @@ from .validators import (
     validate_email, validate_year, validate_capacity,
     validate_isbn, validate_amount, validate_date
 )
-from .helpers import save_to_json, load_from_json, generate_id
+from .helpers import save_to_json, load_from_json, save_data, load_data, generate_id
+from .rank_index import ScoreRankIndex
+from .top_k import TopK, top_n
+from .grade_store import ColumnarGradeStore
+from .metrics import metrics, timed
 
 __all__ = [
     'validate_email', 'validate_year', 'validate_capacity',
     'validate_isbn', 'validate_amount', 'validate_date',
-    'save_to_json', 'load_from_json', 'generate_id'
+    'save_to_json', 'load_from_json', 'save_data', 'load_data', 'generate_id',
+    'ScoreRankIndex', 'TopK', 'top_n', 'ColumnarGradeStore',
+    'metrics', 'timed'
 ]
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from .metrics import metrics
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries also expire after ttl seconds
+
+    Each entry can carry tags (hashable tuples such as ("course", "CS101"))
+    so a change can drop exactly the entries that depend on it.
+    """
+
+    def __init__(self, max_entries=1024, ttl=30.0, name="cache", clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.name = name
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (expires_at, value, tags), least recently used first
+        self.tag_index = {}  # tag -> set of keys
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a cached value, or default if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                hit = False
+            else:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                hit = True
+        if metrics.enabled:
+            metrics.counter(f"{self.name}.{'hits' if hit else 'misses'}").inc()
+        return entry[1] if hit else default
+
+    def put(self, key, value, tags=()):
+        """Cache a value under key, tagged with what it depends on"""
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (self.clock() + self.ttl, value, tuple(tags))
+            for tag in tags:
+                self.tag_index.setdefault(tag, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate(self, tag):
+        """Drop every entry carrying tag; returns the number dropped"""
+        with self.lock:
+            keys = self.tag_index.pop(tag, ())
+            for key in list(keys):
+                self._remove(key)
+        if keys and metrics.enabled:
+            metrics.counter(f"{self.name}.invalidations").inc(len(keys))
+        return len(keys)
+
+    def clear(self):
+        """Drop every entry"""
+        with self.lock:
+            self.entries.clear()
+            self.tag_index.clear()
+
+    def _remove(self, key):
+        """Remove one entry and its tag references (internal method, lock held)"""
+        _, _, tags = self.entries.pop(key)
+        for tag in tags:
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+
+    def stats(self):
+        """Get hit/miss counts and the current size"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        return f"TTLCache({len(self.entries)}/{self.max_entries} entries, ttl {self.ttl}s)"
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from .metrics import metrics
+
+ANY_EVENT = "*"  # subscribe to this to receive every event
+
+
+class EventBus:
+    """In-process publish/subscribe for service mutation events
+
+    Services publish an event after a change is saved, with a payload of
+    plain values naming what changed (e.g. course_id, student_id), so events
+    can be logged and replayed. Handlers are delivered to in one of two ways:
+
+    - synchronous handlers are called as handler(event, payload) inside publish()
+    - batched handlers are called as handler([(event, payload), ...]) with
+      every event queued since their last delivery: at the end of publish()
+      by default, when the outermost batch() block exits, or from a
+      background dispatcher thread once start() has been called
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(list)  # event name -> synchronous handlers
+        self.batched_subscribers = defaultdict(list)  # event name -> batched handlers
+        self.pending = []  # (event, payload) awaiting batched delivery
+        self.lock = threading.RLock()
+        self._batching = 0  # nesting depth of batch() blocks
+        self._delivering = False
+        self._dispatcher = None
+        self._wakeup = threading.Event()
+        self._stopping = False
+
+    def subscribe(self, event, handler, batched=False):
+        """Deliver event (or any event, for "*") to handler, synchronously or in batches"""
+        (self.batched_subscribers if batched else self.subscribers)[event].append(handler)
+
+    def unsubscribe(self, event, handler):
+        """Stop calling a handler"""
+        for subscribers in (self.subscribers, self.batched_subscribers):
+            if handler in subscribers.get(event, []):
+                subscribers[event].remove(handler)
+
+    def publish(self, event, **payload):
+        """Deliver an event to its synchronous subscribers and queue it for batched ones"""
+        if metrics.enabled:
+            metrics.counter(f"events.{event}").inc()
+        for handler in self.subscribers.get(event, []) + self.subscribers.get(ANY_EVENT, []):
+            handler(event, payload)
+
+        if event in self.batched_subscribers or ANY_EVENT in self.batched_subscribers:
+            with self.lock:
+                self.pending.append((event, payload))
+                immediate = not self._batching and self._dispatcher is None
+            if immediate:
+                self.deliver_pending()
+            elif self._dispatcher is not None:
+                self._wakeup.set()
+
+    @contextmanager
+    def batch(self):
+        """Hold batched deliveries until the outermost block exits, then deliver them together"""
+        with self.lock:
+            self._batching += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self._batching -= 1
+                deliver = not self._batching and self._dispatcher is None
+            if deliver:
+                self.deliver_pending()
+
+    def deliver_pending(self):
+        """Deliver queued events to batched subscribers; returns the number delivered
+
+        Events published by a handler during delivery are delivered in a
+        following round of the same call.
+        """
+        delivered = 0
+        with self.lock:
+            if self._delivering:
+                return 0  # a handler published; the running delivery loop picks it up
+            self._delivering = True
+        try:
+            while True:
+                with self.lock:
+                    events, self.pending = self.pending, []
+                if not events:
+                    return delivered
+                for handler, handler_events in self._group_by_handler(events):
+                    handler(handler_events)
+                delivered += len(events)
+                if metrics.enabled:
+                    metrics.histogram("events.batch_size").observe(len(events))
+        finally:
+            with self.lock:
+                self._delivering = False
+
+    def _group_by_handler(self, events):
+        """Pair each batched handler with the events it subscribes to, in publish order"""
+        groups = {}
+        for event, payload in events:
+            for handler in self.batched_subscribers.get(event, []) + self.batched_subscribers.get(ANY_EVENT, []):
+                groups.setdefault(handler, []).append((event, payload))
+        return groups.items()
+
+    def start(self, interval=0.05):
+        """Deliver batched events asynchronously from a background thread
+
+        The dispatcher waits interval seconds after an event so that bursts
+        are delivered as one batch.
+        """
+        if self._dispatcher is not None:
+            return
+        self._stopping = False
+
+        def run():
+            while not self._stopping:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                if not self._stopping:
+                    time.sleep(interval)  # let the rest of a burst queue up
+                self.deliver_pending()
+
+        self._dispatcher = threading.Thread(target=run, name="event-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self):
+        """Stop the background dispatcher, delivering anything still queued"""
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        dispatcher.join()
+        self._dispatcher = None
+        self.deliver_pending()
+
+    def __str__(self):
+        handlers = sum(len(h) for h in self.subscribers.values())
+        batched = sum(len(h) for h in self.batched_subscribers.values())
+        return f"EventBus({handlers} handlers, {batched} batched, {len(self.pending)} pending)"
@@ -0,0 +1,80 @@
+import threading
+import time
+from .metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: lock the file's first byte with msvcrt instead
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Advisory exclusive lock on a lock file, shared by every process using it.
+
+    Reentrant within a process: nested acquires by the same thread only
+    count depth, and the file lock is released when the outermost one is.
+    Advisory means only code that takes the lock is excluded, so every
+    writer of the protected files must use it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self):
+        """Take the lock, waiting for other processes to release it; returns True on the outermost acquire"""
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth > 1:
+            return False
+        started = time.perf_counter()
+        try:
+            self._file = open(self.path, 'a+')
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        except BaseException:
+            if self._file:
+                self._file.close()
+                self._file = None
+            self._depth -= 1
+            self._thread_lock.release()
+            raise
+        if metrics.enabled:
+            metrics.timer("file_lock.wait").observe((time.perf_counter() - started) * 1000)
+        return True
+
+    def release(self):
+        """Release one acquire; the file lock is freed with the outermost one"""
+        try:
+            self._depth -= 1
+            if not self._depth:
+                if fcntl:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+                self._file.close()
+                self._file = None
+        finally:
+            self._thread_lock.release()
+
+    @property
+    def depth(self):
+        """Nesting depth of the current holder (0 when not held)"""
+        return self._depth
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def __str__(self):
+        return f"FileLock({self.path}, {'held' if self._depth else 'free'})"
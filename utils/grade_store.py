@@ -0,0 +1,234 @@
+from array import array
+from collections.abc import Mapping
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to pure Python
+    np = None
+
+
+class GradeView(Mapping):
+    """Read-only {id: [(other id, score), ...]} view of a ColumnarGradeStore,
+    by student or by course; each lookup builds a new list from the rows"""
+
+    def __init__(self, rows, grades):
+        self._rows = rows  # id -> row numbers
+        self._grades = grades  # id -> list of (other id, score)
+
+    def __getitem__(self, key):
+        if key not in self._rows:
+            raise KeyError(key)
+        return self._grades(key)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+
+class ColumnarGradeStore:
+    """Column-oriented grade storage for vectorized analytics.
+
+    Each grade is one row across three parallel columns (student index,
+    course index, score). Student and course IDs are interned into dense
+    integer indexes so group-by statistics can use NumPy's bincount when
+    NumPy is installed, and plain loops over compact arrays otherwise.
+    Row numbers are also indexed per student and per course, so one
+    student's or course's grades are read without scanning the columns;
+    by_student and by_course expose them as mappings.
+    """
+
+    def __init__(self):
+        self.student_index = {}  # student_id -> dense index
+        self.student_keys = []  # dense index -> student_id
+        self.course_index = {}  # course_id -> dense index
+        self.course_keys = []  # dense index -> course_id
+
+        self.student_col = array('l')
+        self.course_col = array('l')
+        self.score_col = array('d')
+
+        self.student_rows = {}  # student_id -> row numbers, in insertion order
+        self.course_rows = {}  # course_id -> row numbers, in insertion order
+        self.by_student = GradeView(self.student_rows, self.student_grades)
+        self.by_course = GradeView(self.course_rows, self.course_grades)
+
+    @staticmethod
+    def _intern(key, index, keys):
+        """Get the dense index for a key, assigning one if new"""
+        position = index.get(key)
+        if position is None:
+            position = len(keys)
+            index[key] = position
+            keys.append(key)
+        return position
+
+    def append(self, student_id, course_id, score):
+        """Append one grade row"""
+        row = len(self.score_col)
+        self.student_col.append(self._intern(student_id, self.student_index, self.student_keys))
+        self.course_col.append(self._intern(course_id, self.course_index, self.course_keys))
+        self.score_col.append(float(score))
+        self.student_rows.setdefault(student_id, []).append(row)
+        self.course_rows.setdefault(course_id, []).append(row)
+
+    def pop(self):
+        """Remove the most recently appended row (used for rollback)"""
+        student_id = self.student_keys[self.student_col.pop()]
+        course_id = self.course_keys[self.course_col.pop()]
+        self.score_col.pop()
+        for rows, key in ((self.student_rows, student_id), (self.course_rows, course_id)):
+            rows[key].pop()
+            if not rows[key]:
+                del rows[key]
+
+    def remove_student(self, student_id):
+        """Remove every row for a student; returns the number of rows removed"""
+        removed = self.student_rows.get(student_id)
+        if not removed:
+            return 0
+        position = self.student_index[student_id]
+        keep = [i for i, student in enumerate(self.student_col) if student != position]
+        self.student_col = array('l', (self.student_col[i] for i in keep))
+        self.course_col = array('l', (self.course_col[i] for i in keep))
+        self.score_col = array('d', (self.score_col[i] for i in keep))
+        self._index_rows()
+        return len(removed)
+
+    def _index_rows(self):
+        """Rebuild the per-student and per-course row numbers after rows move (internal method)
+
+        The dicts are refilled in place, since the views hold them.
+        """
+        for rows, column, keys in ((self.student_rows, self.student_col, self.student_keys),
+                                   (self.course_rows, self.course_col, self.course_keys)):
+            rows.clear()
+            for row, position in enumerate(column):
+                rows.setdefault(keys[position], []).append(row)
+
+    def student_grades(self, student_id):
+        """Get a student's grades as (course_id, score) tuples"""
+        return [(self.course_keys[self.course_col[row]], self.score_col[row])
+                for row in self.student_rows.get(student_id, ())]
+
+    def course_grades(self, course_id):
+        """Get a course's grades as (student_id, score) tuples"""
+        return [(self.student_keys[self.student_col[row]], self.score_col[row])
+                for row in self.course_rows.get(course_id, ())]
+
+    def _scores(self, course_id=None):
+        """Get scores, optionally restricted to one course (read from its rows only)"""
+        if course_id is None:
+            scores = self.score_col
+        else:
+            scores = [self.score_col[row] for row in self.course_rows.get(course_id, ())]
+        return np.array(scores, dtype=float) if np is not None else list(scores)
+
+    def statistics(self, course_id):
+        """Get count, mean and population std deviation of one course's scores, or None if it has none"""
+        scores = self._scores(course_id)
+        count = len(scores)
+        if not count:
+            return None
+        if np is not None:
+            return {"count": count, "mean": float(scores.mean()), "std": float(scores.std())}
+        mean = sum(scores) / count
+        return {"count": count, "mean": mean,
+                "std": math.sqrt(sum((score - mean) ** 2 for score in scores) / count)}
+
+    def group_statistics(self, by="student"):
+        """Get count, mean and population std deviation per student or course"""
+        if by == "student":
+            column, keys = self.student_col, self.student_keys
+        elif by == "course":
+            column, keys = self.course_col, self.course_keys
+        else:
+            raise ValueError("Group must be 'student' or 'course'")
+
+        if not self.score_col:
+            return {}
+
+        if np is not None:
+            groups = np.array(column, dtype=np.int64)
+            scores = np.array(self.score_col, dtype=float)
+            counts = np.bincount(groups, minlength=len(keys))
+            sums = np.bincount(groups, weights=scores, minlength=len(keys))
+            squares = np.bincount(groups, weights=scores * scores, minlength=len(keys))
+            present = counts > 0
+            means = np.zeros(len(keys))
+            means[present] = sums[present] / counts[present]
+            variances = np.zeros(len(keys))
+            variances[present] = squares[present] / counts[present] - means[present] ** 2
+            stds = np.sqrt(np.clip(variances, 0, None))
+            return {
+                keys[i]: {"count": int(counts[i]), "mean": float(means[i]), "std": float(stds[i])}
+                for i in np.flatnonzero(present)
+            }
+
+        counts = [0] * len(keys)
+        sums = [0.0] * len(keys)
+        squares = [0.0] * len(keys)
+        for group, score in zip(column, self.score_col):
+            counts[group] += 1
+            sums[group] += score
+            squares[group] += score * score
+
+        stats = {}
+        for i, count in enumerate(counts):
+            if count:
+                mean = sums[i] / count
+                stats[keys[i]] = {
+                    "count": count,
+                    "mean": mean,
+                    "std": math.sqrt(max(squares[i] / count - mean * mean, 0.0))
+                }
+        return stats
+
+    def histogram(self, bins=10, score_range=(0, 100), course_id=None):
+        """Count scores in equal-width bins; returns (counts, bin_edges)"""
+        low, high = score_range
+        scores = self._scores(course_id)
+
+        if np is not None:
+            counts, edges = np.histogram(scores, bins=bins, range=(low, high))
+            return [int(c) for c in counts], [float(e) for e in edges]
+
+        width = (high - low) / bins
+        edges = [low + i * width for i in range(bins + 1)]
+        counts = [0] * bins
+        for score in scores:
+            if low <= score <= high:
+                # Last bin is closed on the right, matching numpy.histogram
+                counts[min(int((score - low) / width), bins - 1)] += 1
+        return counts, edges
+
+    def percentiles(self, percents=(25, 50, 75), course_id=None):
+        """Get score percentiles using linear interpolation"""
+        scores = self._scores(course_id)
+        if len(scores) == 0:
+            return {}
+
+        if np is not None:
+            values = np.percentile(scores, list(percents))
+            return {p: float(v) for p, v in zip(percents, values)}
+
+        ordered = sorted(scores)
+        result = {}
+        for p in percents:
+            position = (len(ordered) - 1) * p / 100
+            lower = math.floor(position)
+            upper = min(lower + 1, len(ordered) - 1)
+            result[p] = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+        return result
+
+    def __len__(self):
+        return len(self.score_col)
+
+    def __str__(self):
+        backend = "numpy" if np is not None else "python"
+        return f"ColumnarGradeStore({len(self)} rows, {len(self.student_keys)} students, {len(self.course_keys)} courses, {backend})"
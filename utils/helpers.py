@@ -1,11 +1,32 @@
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime
+from .metrics import metrics
+from .snapshot import is_binary_file, save_to_binary, load_from_binary
+
+@contextmanager
+def atomic_open(filename, mode='w', encoding=None):
+    """Open a temporary file that replaces filename once written and synced to disk
+
+    Readers see either the old or the new file, never a partial write.
+    """
+    temp_file = f"{filename}.tmp"
+    try:
+        with open(temp_file, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, filename)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
 
 def save_to_json(data, filename):
     """Save data to JSON file"""
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
+        with atomic_open(filename, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         return True
     except Exception as e:
@@ -23,6 +44,19 @@ def load_from_json(filename):
         print(f"Error loading from {filename}: {e}")
         return None
 
+def save_data(data, filename):
+    """Save data in the format implied by the file extension (.bin/.snap = binary, else JSON)"""
+    saved = save_to_binary(data, filename) if is_binary_file(filename) else save_to_json(data, filename)
+    if saved and metrics.enabled:
+        metrics.histogram("storage.bytes_written").observe(os.path.getsize(filename))
+    return saved
+
+def load_data(filename):
+    """Load data in the format implied by the file extension (.bin/.snap = binary, else JSON)"""
+    if metrics.enabled and os.path.exists(filename):
+        metrics.histogram("storage.bytes_read").observe(os.path.getsize(filename))
+    return load_from_binary(filename) if is_binary_file(filename) else load_from_json(filename)
+
 def generate_id(prefix, existing_ids, length=4):
     """Generate a unique ID with given prefix"""
     if not existing_ids:
@@ -0,0 +1,193 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+SAMPLE_WINDOW = 2048  # most recent observations kept per histogram for percentiles
+
+
+class Counter:
+    """Monotonic event counter, safe to update from several threads"""
+
+    def __init__(self, name):
+        self.name = name
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Increase the counter"""
+        with self.lock:
+            self.value += amount
+
+    def summary(self):
+        return {"type": "counter", "value": self.value}
+
+
+class Histogram:
+    """Distribution of observed values with percentile summaries.
+
+    Count, total, min and max cover every observation; percentiles are taken
+    from a sliding window of the most recent observations to bound memory.
+    Safe to update from several threads (e.g. the API server's handlers).
+    """
+
+    def __init__(self, name, window=SAMPLE_WINDOW):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        """Record one observation"""
+        with self.lock:
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+            self.samples.append(value)
+
+    def percentile(self, percent):
+        """Get a percentile of the recent observations (nearest-rank)"""
+        with self.lock:
+            ordered = sorted(self.samples)
+        return _nearest_rank(ordered, percent)
+
+    def summary(self):
+        with self.lock:
+            count, total, low, high = self.count, self.total, self.min, self.max
+            ordered = sorted(self.samples)
+        return self._summarize(count, total, low, high, ordered)
+
+    def _summarize(self, count, total, low, high, ordered):
+        """Build a summary from values read together under the lock (internal method)"""
+        return {
+            "type": "histogram",
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "min": low or 0.0,
+            "max": high or 0.0,
+            "p50": _nearest_rank(ordered, 50),
+            "p90": _nearest_rank(ordered, 90),
+            "p99": _nearest_rank(ordered, 99)
+        }
+
+
+def _nearest_rank(ordered, percent):
+    """Get a percentile of sorted values by nearest rank (0.0 if there are none)"""
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Timer(Histogram):
+    """Histogram of durations in milliseconds"""
+
+    def time(self):
+        """Context manager that records the duration of its block"""
+        return _TimerContext(self)
+
+    def _summarize(self, count, total, low, high, ordered):
+        data = super()._summarize(count, total, low, high, ordered)
+        data["type"] = "timer"
+        data["total"] = total
+        return data
+
+
+class _TimerContext:
+    def __init__(self, timer):
+        self.timer = timer
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.observe((time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class MetricsRegistry:
+    """Named counters, timers and histograms shared across services"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _get(self, name, metric_class):
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.setdefault(name, metric_class(name))
+        return metric
+
+    def counter(self, name):
+        """Get or create a counter"""
+        return self._get(name, Counter)
+
+    def histogram(self, name):
+        """Get or create a histogram"""
+        return self._get(name, Histogram)
+
+    def timer(self, name):
+        """Get or create a timer (milliseconds)"""
+        return self._get(name, Timer)
+
+    def snapshot(self):
+        """Get a summary of every metric, sorted by name"""
+        with self.lock:
+            current = dict(self.metrics)
+        return {name: current[name].summary() for name in sorted(current)}
+
+    def reset(self):
+        """Drop all recorded metrics"""
+        with self.lock:
+            self.metrics.clear()
+
+    def dump(self, filename):
+        """Write the metrics snapshot to a JSON file"""
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({"enabled": self.enabled, "metrics": self.snapshot()}, f, indent=2)
+        return filename
+
+
+# Process-wide registry; off by default, set SMS_METRICS=1 to enable collection
+metrics = MetricsRegistry(enabled=os.environ.get("SMS_METRICS", "0") != "0")
+
+
+def timed(name=None):
+    """Decorator recording call latency and errors under name (default: qualname)
+
+    When the registry is disabled the wrapper is a single attribute check.
+    """
+    def decorator(func):
+        metric_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                metrics.counter(f"{metric_name}.errors").inc()
+                raise
+            finally:
+                metrics.timer(metric_name).observe((time.perf_counter() - started) * 1000)
+
+        return wrapper
+
+    return decorator
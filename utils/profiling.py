@@ -0,0 +1,124 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import time
+import tracemalloc
+
+
+class ActionProfiler:
+    """Profile individual actions with cProfile and tracemalloc.
+
+    Each profiled action writes two files to output_dir:
+      NNNN_<action>.prof  - raw cProfile data (open with pstats or snakeviz)
+      NNNN_<action>.txt   - top functions by cumulative time and top allocations
+    and write_summary() ranks the slowest actions and functions across the run.
+    """
+
+    def __init__(self, output_dir="profiles", top_functions=25, top_allocations=15):
+        self.output_dir = output_dir
+        self.top_functions = top_functions
+        self.top_allocations = top_allocations
+        self.records = []  # one summary dict per profiled action
+        self.active = False
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _base_path(self, name):
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or "action"
+        return os.path.join(self.output_dir, f"{len(self.records) + 1:04d}_{safe_name}")
+
+    def profile(self, name, func, *args, **kwargs):
+        """Run func under the profilers and return its result"""
+        if self.active:
+            # Nested actions are covered by the outer profile
+            return func(*args, **kwargs)
+
+        self.active = True
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        error = None
+        try:
+            profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+        except BaseException as e:
+            error = repr(e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            self.active = False
+            self._write_reports(name, profiler, before, after, elapsed, peak, error)
+
+    def _write_reports(self, name, profiler, before, after, elapsed, peak, error):
+        """Write the .prof dump and text report for one action"""
+        base = self._base_path(name)
+        profiler.dump_stats(f"{base}.prof")
+
+        stats_text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stats_text)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_functions)
+
+        allocations = after.compare_to(before, "lineno")[:self.top_allocations]
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(f"Action: {name}\n")
+            f.write(f"Wall time: {elapsed * 1000:.2f} ms\n")
+            f.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n")
+            if error:
+                f.write(f"Raised: {error}\n")
+            f.write("\n=== Top functions (cumulative time) ===\n")
+            f.write(stats_text.getvalue())
+            f.write("\n=== Top allocations (net growth by line) ===\n")
+            for stat in allocations:
+                f.write(f"{stat}\n")
+
+        self.records.append({
+            "action": name,
+            "seconds": elapsed,
+            "peak_kib": peak / 1024,
+            "error": error,
+            "profile": f"{base}.prof",
+            "report": f"{base}.txt"
+        })
+
+    def slowest_actions(self, n=10):
+        """Get the n slowest profiled actions"""
+        return sorted(self.records, key=lambda r: r["seconds"], reverse=True)[:n]
+
+    def write_summary(self, n=10):
+        """Write summary.txt/summary.json ranking the slowest actions and calls"""
+        if not self.records:
+            return None
+
+        slowest = self.slowest_actions(n)
+        with open(os.path.join(self.output_dir, "summary.json"), 'w', encoding='utf-8') as f:
+            json.dump({"actions": self.records, "slowest": slowest}, f, indent=2)
+
+        combined = io.StringIO()
+        stats = pstats.Stats(*[r["profile"] for r in self.records], stream=combined)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top_functions)
+
+        path = os.path.join(self.output_dir, "summary.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Profiled actions: {len(self.records)}\n\n")
+            f.write("=== Slowest actions ===\n")
+            for record in slowest:
+                f.write(f"{record['seconds'] * 1000:>10.2f} ms  {record['peak_kib']:>10.1f} KiB peak  "
+                        f"{record['action']}\n")
+            f.write("\n=== Slowest calls across all actions (internal time) ===\n")
+            f.write(combined.getvalue())
+        return path
@@ -0,0 +1,90 @@
+class ScoreRankIndex:
+    """Order-statistic index over scores using a Fenwick (binary indexed) tree.
+
+    Scores in [0, max_score] are quantized into fixed-width buckets
+    (10 ** -precision wide). Each key (e.g. a student ID) occupies one bucket,
+    so updating a key's score and counting keys above/below a score are both
+    O(log b) where b is the number of buckets.
+    """
+
+    def __init__(self, max_score=100, precision=2):
+        self.scale = 10 ** precision
+        self.size = int(max_score * self.scale) + 1
+        self.tree = [0] * (self.size + 1)  # 1-based Fenwick array
+        self.buckets = {}  # key -> bucket index
+
+    def _bucket(self, score):
+        """Map a score to its bucket index"""
+        bucket = int(round(score * self.scale))
+        return min(max(bucket, 0), self.size - 1)
+
+    def _add(self, bucket, delta):
+        """Add delta to a bucket count"""
+        i = bucket + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def _prefix_count(self, bucket):
+        """Count keys in buckets 0..bucket (inclusive)"""
+        total = 0
+        i = bucket + 1
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def update(self, key, score):
+        """Insert key or move it to a new score"""
+        new_bucket = self._bucket(score)
+        old_bucket = self.buckets.get(key)
+        if old_bucket == new_bucket:
+            return
+        if old_bucket is not None:
+            self._add(old_bucket, -1)
+        self._add(new_bucket, 1)
+        self.buckets[key] = new_bucket
+
+    def remove(self, key):
+        """Remove key from the index"""
+        bucket = self.buckets.pop(key, None)
+        if bucket is not None:
+            self._add(bucket, -1)
+
+    def count_above(self, score):
+        """Count keys with a strictly higher score"""
+        return len(self.buckets) - self._prefix_count(self._bucket(score))
+
+    def count_below(self, score):
+        """Count keys with a strictly lower score"""
+        bucket = self._bucket(score)
+        return self._prefix_count(bucket - 1) if bucket > 0 else 0
+
+    def rank(self, key):
+        """Get 1-based rank of key (ties share a rank), or None if absent"""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return None
+        return len(self.buckets) - self._prefix_count(bucket) + 1
+
+    def percentile(self, key):
+        """Get percentage of keys scoring strictly below key, or None if absent"""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return None
+        below = self._prefix_count(bucket - 1) if bucket > 0 else 0
+        return below / len(self.buckets) * 100
+
+    def clear(self):
+        """Remove all keys"""
+        self.tree = [0] * (self.size + 1)
+        self.buckets.clear()
+
+    def __contains__(self, key):
+        return key in self.buckets
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def __str__(self):
+        return f"ScoreRankIndex({len(self.buckets)} keys, {self.size} buckets)"
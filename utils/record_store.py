@@ -0,0 +1,180 @@
+"""
+Read-only, memory-mapped record files with lazy decoding.
+
+A record file holds many records in one file so large read-mostly datasets
+(book catalogues, historical ledgers) can be served without materializing
+every record as a Python object at startup:
+
+    header  | magic b"SMSRECS\\0" | version (uint16) | record count (uint32) | index offset (uint64)
+    records | marshal-encoded dicts, back to back, in build order
+    index   | per record: key length (uint16) | key (utf-8) | offset (uint64) | length (uint32)
+
+Only the key index is read eagerly; a record is decoded when requested and
+kept in a small LRU of hot objects. Build a record file with:
+
+    python -m utils.record_store data/books.json data/books.rec
+    python -m utils.record_store data/transactions.json data/transactions.rec --sort-by amount
+"""
+
+import argparse
+import marshal
+import mmap
+import os
+import struct
+import sys
+from collections import OrderedDict
+from .helpers import atomic_open
+from .metrics import metrics
+
+MAGIC = b"SMSRECS\0"
+FORMAT_VERSION = 1
+MARSHAL_VERSION = 4
+HEADER = struct.Struct("<8sHIQ")
+INDEX_ENTRY = struct.Struct("<QI")
+KEY_LENGTH = struct.Struct("<H")
+
+
+def build_record_file(filename, records):
+    """Write (key, record dict) pairs to a record file in the given order
+
+    Returns the number of records written.
+    """
+    index = []
+    with atomic_open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0))
+        for key, record in records:
+            payload = marshal.dumps(record, MARSHAL_VERSION)
+            index.append((key, f.tell(), len(payload)))
+            f.write(payload)
+
+        index_offset = f.tell()
+        for key, offset, length in index:
+            encoded = key.encode('utf-8')
+            f.write(KEY_LENGTH.pack(len(encoded)))
+            f.write(encoded)
+            f.write(INDEX_ENTRY.pack(offset, length))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(index), index_offset))
+    return len(index)
+
+
+class MappedRecordStore:
+    """Read-only record file served through mmap with an LRU of decoded objects"""
+
+    def __init__(self, filename, decode=None, cache_size=1024, name=None):
+        self.filename = filename
+        self.decode = decode or (lambda record: record)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # key -> decoded object, most recently used last
+        self.name = name or os.path.basename(filename)
+        self.index = {}  # key -> (offset, length)
+        self.order = []  # keys in file order
+
+        self.file = open(filename, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            self.file.close()
+            raise ValueError(f"{filename} is not a record file")
+        self._read_index()
+
+    def _read_index(self):
+        """Read the key index (internal method)"""
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{self.filename} is truncated")
+        magic, version, count, index_offset = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"{self.filename} is not a record file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported record file version {version}")
+
+        position = index_offset
+        for _ in range(count):
+            (key_length,) = KEY_LENGTH.unpack_from(self.map, position)
+            position += KEY_LENGTH.size
+            key = self.map[position:position + key_length].decode('utf-8')
+            position += key_length
+            self.index[key] = INDEX_ENTRY.unpack_from(self.map, position)
+            self.order.append(key)
+            position += INDEX_ENTRY.size
+
+    def get_record(self, key):
+        """Decode the raw record dict for key, or None (not cached)"""
+        location = self.index.get(key)
+        if location is None:
+            return None
+        offset, length = location
+        return marshal.loads(self.map[offset:offset + length])
+
+    def get(self, key):
+        """Get the decoded object for key, or None"""
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            if metrics.enabled:
+                metrics.counter(f"record_store.{self.name}.hits").inc()
+            return cached
+
+        record = self.get_record(key)
+        if record is None:
+            return None
+        if metrics.enabled:
+            metrics.counter(f"record_store.{self.name}.misses").inc()
+
+        obj = self.decode(record)
+        self.cache[key] = obj
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return obj
+
+    def iter_records(self):
+        """Yield (key, raw record dict) in file order without caching"""
+        for key in self.order:
+            yield key, self.get_record(key)
+
+    def keys(self):
+        """Get all keys in file order"""
+        return list(self.order)
+
+    def close(self):
+        """Release the memory map"""
+        self.cache.clear()
+        self.map.close()
+        self.file.close()
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __str__(self):
+        return f"MappedRecordStore({self.filename}, {len(self.index)} records, {len(self.cache)} cached)"
+
+
+def main(argv=None):
+    """Command-line entry point: build a record file from a JSON or binary data file"""
+    from .helpers import load_data
+
+    parser = argparse.ArgumentParser(description="Build a memory-mapped record file")
+    parser.add_argument("source", help="JSON or binary data file")
+    parser.add_argument("target", help="record file to write")
+    parser.add_argument("--sort-by", help="record field to order the file by (e.g. amount)")
+    args = parser.parse_args(argv)
+
+    data = load_data(args.source)
+    if data is None:
+        print(f"✗ Could not read {args.source}")
+        return 1
+    items = list(data.items())
+    if args.sort_by:
+        items.sort(key=lambda item: item[1][args.sort_by])
+    count = build_record_file(args.target, items)
+    print(f"✓ Wrote {count:,} records to {args.target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import heapq
+from bisect import insort
+
+
+class TopK:
+    """Bounded leaderboard holding the k best (score, key) entries.
+
+    Entries are kept best-first as (-score, key) tuples, so ties are broken
+    by ascending key just like a heap of (-score, key). Reads of up to k
+    entries are O(k); inserts are O(k) for the small k used by leaderboards.
+
+    When a listed key's score drops out of the top k, an unlisted key may
+    deserve its slot, so the board is marked stale and must be rebuilt from
+    the full data with rebuild() before the next read.
+    """
+
+    def __init__(self, k=10):
+        self.k = k
+        self.entries = []  # sorted best-first list of (-score, key)
+        self.positions = {}  # key -> current entry (for keyed updates)
+        self.stale = False
+
+    def push(self, key, score):
+        """Add an entry that never changes (duplicate keys allowed)"""
+        if self.stale:
+            return
+        entry = (-score, key)
+        if len(self.entries) < self.k:
+            insort(self.entries, entry)
+        elif entry < self.entries[-1]:
+            insort(self.entries, entry)
+            self.entries.pop()
+
+    def update(self, key, score):
+        """Set the score for a key whose score may go up or down"""
+        if self.stale:
+            return
+        entry = (-score, key)
+        old_entry = self.positions.pop(key, None)
+
+        if old_entry is not None:
+            boundary = self.entries[-1]
+            self.entries.remove(old_entry)
+            if len(self.entries) + 1 == self.k and entry > boundary:
+                # Key fell below the old k-th entry; an unlisted key may now rank higher
+                self.stale = True
+                return
+            insort(self.entries, entry)
+            self.positions[key] = entry
+        elif len(self.entries) < self.k:
+            insort(self.entries, entry)
+            self.positions[key] = entry
+        elif entry < self.entries[-1]:
+            insort(self.entries, entry)
+            self.positions[key] = entry
+            evicted = self.entries.pop()
+            self.positions.pop(evicted[1], None)
+
+    def invalidate(self):
+        """Mark the board as needing a rebuild"""
+        self.stale = True
+
+    def rebuild(self, scored_keys):
+        """Rebuild from an iterable of (key, score) pairs - O(n log k)"""
+        self.entries = heapq.nsmallest(self.k, ((-score, key) for key, score in scored_keys))
+        self.positions = {key: (neg_score, key) for neg_score, key in self.entries}
+        self.stale = False
+
+    def top(self, n=None):
+        """Get up to n best entries as (key, score) pairs"""
+        n = self.k if n is None else n
+        return [(key, -neg_score) for neg_score, key in self.entries[:n]]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        return f"TopK(k={self.k}, {len(self.entries)} entries{', stale' if self.stale else ''})"
+
+
+def top_n(scored_keys, n):
+    """Partial selection of the n best (key, score) pairs - O(m log n)"""
+    best = heapq.nsmallest(n, ((-score, key) for key, score in scored_keys))
+    return [(key, -neg_score) for neg_score, key in best]